@@ -7,6 +7,7 @@ datas = collect_data_files("customtkinter")
 datas += [
     ("moneypenny.ico", "."),
     ("moneypenny icon.png", "."),
+    ("common_words.txt", "."),
 ]
 
 a = Analysis(
@@ -14,7 +15,9 @@ a = Analysis(
     pathex=[],
     binaries=[],
     datas=datas,
-    hiddenimports=["gui"],
+    # httpcore imports its HTTP/2 connection and h2 only when HTTP/2 is
+    # enabled, which the analysis cannot see.
+    hiddenimports=["gui", "server", "httpcore._async.http2", "h2"],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
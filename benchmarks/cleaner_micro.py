@@ -0,0 +1,186 @@
+"""
+MoneyPenny Cleaner Microbenchmarks
+Times TranscriptCleaner's local text processing (should_clean, edge line-break
+extraction, quote spacing, newline normalization) on multi-kilobyte
+transcripts, against the earlier per-cue and per-character implementations
+kept below as references, and checks that both produce identical output.
+
+    python benchmarks/cleaner_micro.py
+    python benchmarks/cleaner_micro.py --sizes 2000,20000 --number 50
+"""
+
+import argparse
+import random
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from voice_to_text import TranscriptCleaner  # noqa: E402
+
+WORDS = (
+    "the team shipped release notes before friday and we should follow up "
+    "with finance about the budget for next quarter"
+).split()
+SPOKEN = (
+    "comma", "period", "quote", "new line", "New Paragraph", "newline",
+    "question mark", "exclamation  point", "semicolon", "full stop", "slash",
+)
+NOISE = (",", ".", '"', ' " ', "  ", "\n", "\n\n\n", "(", ")", ":", "?")
+
+
+# --- Reference implementations (before the single-pass versions) ---
+
+def reference_should_clean(cleaner: TranscriptCleaner, transcript: str) -> bool:
+    raw = transcript.strip()
+    mode = cleaner.settings.get("cleanup_mode", "commands")
+    if not raw or mode == "off":
+        return False
+    if mode == "always":
+        return True
+    normalized = raw.casefold()
+    for punctuation in '.,!?;:"()[]{}':
+        normalized = normalized.replace(punctuation, " ")
+    normalized = " " + " ".join(normalized.split()) + " "
+    return any(f" {cue} " in normalized for cue in cleaner.COMMAND_CUES)
+
+
+def reference_extract_line_break_commands(text: str) -> tuple:
+    core = text.strip()
+    leading, trailing = "", ""
+    while True:
+        matched = False
+        low = core.casefold()
+        for phrase, break_chars in TranscriptCleaner._EDGE_BREAKS:
+            if low.startswith(phrase):
+                leading += break_chars
+                core = core[len(phrase):].lstrip(" \t,.;:")
+                matched = True
+                break
+        if not matched:
+            break
+    while True:
+        matched = False
+        low = core.casefold()
+        for phrase, break_chars in TranscriptCleaner._EDGE_BREAKS:
+            if low.endswith(phrase):
+                trailing = break_chars + trailing
+                core = core[: len(core) - len(phrase)].rstrip(" \t,.;:")
+                matched = True
+                break
+        if not matched:
+            break
+    return leading, core.strip(), trailing
+
+
+def reference_tighten_quote_spacing(text: str) -> str:
+    chars = list(text)
+    is_opening = True
+    for index, char in enumerate(chars):
+        if char != '"':
+            continue
+        if is_opening:
+            cursor = index + 1
+            while cursor < len(chars) and chars[cursor] == " ":
+                chars[cursor] = ""
+                cursor += 1
+        else:
+            cursor = index - 1
+            while cursor >= 0 and chars[cursor] == " ":
+                chars[cursor] = ""
+                cursor -= 1
+        is_opening = not is_opening
+    return "".join(chars)
+
+
+def reference_normalize_model_breaks(cleaned: str) -> str:
+    result = []
+    in_break = False
+    for char in cleaned:
+        if char == "\n":
+            if not in_break:
+                result.append("\n")
+            in_break = True
+        else:
+            result.append(char)
+            in_break = False
+    return "".join(result)
+
+
+# --- Inputs ---
+
+def make_transcript(size: int, seed: int, cues: bool = True) -> str:
+    """Dictation-like text of about size characters.
+
+    With cues=False, no command cue appears, so should_clean has to scan
+    the whole text (its worst case).
+    """
+    rng = random.Random(seed)
+    parts = []
+    length = 0
+    while length < size:
+        roll = rng.random()
+        if cues and roll < 0.08:
+            part = rng.choice(SPOKEN)
+        elif roll < 0.2:
+            part = rng.choice(NOISE)
+        else:
+            part = rng.choice(WORDS)
+        parts.append(part)
+        length += len(part) + 1
+    text = " ".join(parts)
+    if cues:
+        text = f"new line {text} new paragraph. newline"
+    return text
+
+
+class _Settings:
+    def __init__(self, mode: str):
+        self.mode = mode
+
+    def get(self, key, default=None):
+        return self.mode if key == "cleanup_mode" else default
+
+
+def cases(cleaner: TranscriptCleaner) -> dict:
+    """{name: (current, reference)} callables taking one transcript."""
+    return {
+        "should_clean": (cleaner.should_clean, lambda t: reference_should_clean(cleaner, t)),
+        "extract_line_breaks": (cleaner._extract_line_break_commands,
+                                reference_extract_line_break_commands),
+        "tighten_quote_spacing": (cleaner._tighten_quote_spacing,
+                                  reference_tighten_quote_spacing),
+        "normalize_model_breaks": (lambda t: cleaner._normalize_model_breaks(t, t),
+                                   reference_normalize_model_breaks),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TranscriptCleaner microbenchmarks")
+    parser.add_argument("--sizes", default="2000,8000,32000", help="transcript sizes in characters")
+    parser.add_argument("--number", type=int, default=200, help="calls per timing")
+    args = parser.parse_args()
+
+    cleaner = TranscriptCleaner(_Settings("commands"))
+    print(f"{'function':<36}{'chars':>8}{'reference us':>15}{'current us':>13}{'speedup':>9}")
+    for size in (int(value) for value in args.sizes.split(",")):
+        inputs = {
+            "with cues": make_transcript(size, seed=size),
+            "no cues": make_transcript(size, seed=size, cues=False),
+        }
+        for name, (current, reference) in cases(cleaner).items():
+            for label, text in inputs.items():
+                if current(text) != reference(text):
+                    raise SystemExit(f"{name} output differs from the reference ({label}, {size})")
+                old = min(timeit.repeat(lambda: reference(text), number=args.number, repeat=3))
+                new = min(timeit.repeat(lambda: current(text), number=args.number, repeat=3))
+                print(
+                    f"{name + ' (' + label + ')':<36}{len(text):>8}"
+                    f"{old / args.number * 1e6:>15.1f}{new / args.number * 1e6:>13.1f}"
+                    f"{old / new:>8.1f}x"
+                )
+
+
+if __name__ == "__main__":
+    main()
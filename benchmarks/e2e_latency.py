@@ -0,0 +1,215 @@
+"""
+MoneyPenny End-to-End Latency Benchmark
+Replays a corpus of WAV/FLAC recordings through MoneyPennyApp's dictation
+pipeline (batcher, transcriber, cleanup, typing) without a microphone, window,
+or real keyboard, against a local fake Groq/OpenRouter server, and reports
+throughput and per-stage latency percentiles for each mode.
+
+    python benchmarks/e2e_latency.py --corpus recordings/ --modes groq,groq+cleanup
+    python benchmarks/e2e_latency.py --interval 0 --error-rate 0.05 --json results.json
+
+Without --corpus, synthetic speech-like clips from 1.5 to 30 seconds are used
+(fine for cloud modes; local mode needs real speech to produce text). The
+run uses a temporary app folder, so your settings and history are untouched.
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+# Must be set before voice_to_text is imported: app paths are resolved then.
+os.environ.setdefault("MONEYPENNY_APP_DIR", tempfile.mkdtemp(prefix="moneypenny-bench-"))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np  # noqa: E402
+
+import voice_to_text  # noqa: E402
+from fake_provider import FakeProvider  # noqa: E402
+from voice_to_text import CHUNK, RATE, BATCH_AUDIO_SUFFIXES, MoneyPennyApp, load_audio_frames  # noqa: E402
+
+MODES = {
+    "groq": {"transcription_mode": "cloud", "cloud_provider": "groq", "cleanup_mode": "off"},
+    "groq+cleanup": {"transcription_mode": "cloud", "cloud_provider": "groq", "cleanup_mode": "always"},
+    "openrouter": {"transcription_mode": "cloud", "cloud_provider": "openrouter", "cleanup_mode": "off"},
+    "local": {"transcription_mode": "local", "cleanup_mode": "off"},
+}
+BENCH_SETTINGS = {
+    "groq_api_key": "benchmark",
+    "openrouter_api_key": "benchmark",
+    "offline_queue": False,
+    "hands_free": False,
+}
+SYNTHETIC_SECONDS = (1.5, 3.0, 6.0, 12.0, 30.0)
+
+
+class FakeKeyboard:
+    """pynput Controller stand-in that records what would have been typed."""
+
+    def __init__(self):
+        self.typed = []
+
+    def type(self, text: str):
+        self.typed.append(text)
+
+    def press(self, key):
+        pass
+
+    def release(self, key):
+        pass
+
+    @contextmanager
+    def pressed(self, *keys):
+        yield
+
+
+def synthetic_clip(seconds: float, seed: int) -> list:
+    """Speech-like audio: noise bursts (syllables) separated by short pauses."""
+    rng = np.random.default_rng(seed)
+    samples = np.zeros(int(seconds * RATE), dtype=np.float32)
+    position = int(0.2 * RATE)
+    while position < len(samples):
+        burst = int(rng.uniform(0.12, 0.35) * RATE)
+        samples[position:position + burst] = rng.normal(0, 4000, len(samples[position:position + burst]))
+        position += burst + int(rng.uniform(0.05, 0.6) * RATE)
+    pcm = np.clip(samples, -32768, 32767).astype(np.int16).tobytes()
+    step = CHUNK * 2
+    return [pcm[i:i + step] for i in range(0, len(pcm), step)]
+
+
+def load_corpus(directory: Path = None) -> list:
+    """Return [(name, frames)] from directory, or synthetic clips."""
+    if directory is None:
+        return [(f"synthetic-{seconds:g}s", synthetic_clip(seconds, index))
+                for index, seconds in enumerate(SYNTHETIC_SECONDS)]
+    paths = sorted(p for p in directory.rglob("*") if p.suffix.lower() in BATCH_AUDIO_SUFFIXES)
+    if not paths:
+        raise SystemExit(f"No .wav or .flac files in {directory}")
+    return [(path.name, load_audio_frames(path.read_bytes())) for path in paths]
+
+
+def run_mode(app: MoneyPennyApp, mode: str, corpus: list, repeat: int, interval) -> dict:
+    """Dictate every clip repeat times in one mode; return its report."""
+    for key, value in MODES[mode].items():
+        app.settings.set(key, value)
+    if mode == "local" and app.transcriber.model is None:
+        app.transcriber.load_model()
+    app.history.clear()
+
+    clips = [frames for _, frames in corpus] * repeat
+    started = time.perf_counter()
+    for frames in clips:
+        app.start_recording()
+        with app.frames_lock:
+            app.audio_frames.extend(frames)
+        app.stop_recording()
+        if interval is None:
+            app.dictations.join()  # one dictation at a time
+        elif interval:
+            time.sleep(interval)
+    app.dictations.join()
+    wall = time.perf_counter() - started
+
+    # History records a dictation before typing it; only completed typing
+    # adds the total span.
+    typed = sum("total_ms" in entry.get("spans", {}) for entry in app.history.get_entries())
+    audio_seconds = sum(len(frames) for frames in clips) * CHUNK / RATE
+    return {
+        "mode": mode,
+        "dictations": len(clips),
+        "typed": typed,
+        "failed_or_empty": len(clips) - typed,
+        "wall_seconds": round(wall, 2),
+        "dictations_per_minute": round(len(clips) / wall * 60, 1),
+        "audio_seconds_per_second": round(audio_seconds / wall, 2),
+        "latency_ms": app.history.latency_percentiles(window=len(clips)),
+    }
+
+
+def gate_failures(reports: list, max_p95_ms: float) -> list:
+    """Why each failing mode fails the --max-p95-ms gate (empty if all pass).
+
+    A mode fails when its total p95 exceeds max_p95_ms, and also when any
+    dictation was not typed or no total latency was recorded: a run that
+    types nothing has no latency to regress and must not pass.
+    """
+    failures = []
+    for report in reports:
+        total = report["latency_ms"].get("total_ms")
+        if report["typed"] < report["dictations"]:
+            failures.append(f"{report['mode']}: {report['typed']}/{report['dictations']} typed")
+        elif total is None:
+            failures.append(f"{report['mode']}: no total latency recorded")
+        elif total["p95"] > max_p95_ms:
+            failures.append(f"{report['mode']}: total p95 {total['p95']:.0f} ms > {max_p95_ms:g} ms")
+    return failures
+
+
+def print_report(report: dict):
+    print(
+        f"\n== {report['mode']}: {report['typed']}/{report['dictations']} typed, "
+        f"{report['wall_seconds']}s wall, {report['dictations_per_minute']} dictations/min, "
+        f"{report['audio_seconds_per_second']}x real time"
+    )
+    print(f"  {'stage':<16}{'p50':>9}{'p95':>9}{'p99':>9}")
+    for stage, stats in report["latency_ms"].items():
+        print(f"  {stage[:-3]:<16}{stats['p50']:>9.1f}{stats['p95']:>9.1f}{stats['p99']:>9.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MoneyPenny end-to-end latency benchmark")
+    parser.add_argument("--corpus", type=Path, help="folder of .wav/.flac recordings (default: synthetic)")
+    parser.add_argument("--modes", default="groq,groq+cleanup,openrouter",
+                        help=f"comma-separated, from: {', '.join(MODES)}")
+    parser.add_argument("--repeat", type=int, default=3, help="times to replay the corpus per mode")
+    parser.add_argument("--interval", type=float, default=None,
+                        help="seconds between releases (default: wait for each dictation; 0 = burst)")
+    parser.add_argument("--latency-ms", type=float, default=150.0, help="fake provider base latency")
+    parser.add_argument("--jitter-ms", type=float, default=40.0, help="fake provider latency std dev")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests failing with 503")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", type=Path, help="also write the reports to this file")
+    parser.add_argument("--max-p95-ms", type=float,
+                        help="exit with status 1 if any mode's total p95 exceeds this")
+    args = parser.parse_args()
+
+    modes = [mode.strip() for mode in args.modes.split(",") if mode.strip()]
+    unknown = [mode for mode in modes if mode not in MODES]
+    if unknown:
+        parser.error(f"unknown mode(s): {', '.join(unknown)}")
+
+    provider = FakeProvider(args.latency_ms, args.jitter_ms, args.error_rate, seed=args.seed).start()
+    voice_to_text.PROVIDER_API_URLS.update(provider.api_urls())
+    corpus = load_corpus(args.corpus)
+    app = MoneyPennyApp()
+    app.keyboard_controller = FakeKeyboard()
+    # No real keyboard either: no modifier is ever held (keyboard.is_pressed
+    # needs a desktop session, and root on Linux).
+    app._wait_for_modifiers_release = lambda max_wait_seconds=0.5: True
+    for key, value in BENCH_SETTINGS.items():
+        app.settings.set(key, value)
+
+    reports = []
+    try:
+        for mode in modes:
+            reports.append(run_mode(app, mode, corpus, args.repeat, args.interval))
+            print_report(reports[-1])
+    finally:
+        provider.shutdown()
+    print(f"\nFake provider: {provider.counts}")
+
+    if args.json:
+        args.json.write_text(json.dumps(reports, indent=2), encoding="utf-8")
+    if args.max_p95_ms is not None:
+        failures = gate_failures(reports, args.max_p95_ms)
+        if failures:
+            print("Latency gate failed:\n  " + "\n  ".join(failures))
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+MoneyPenny Benchmark Provider
+Local stand-in for the Groq and OpenRouter APIs. Serves the OpenAI-compatible
+transcription and chat completion endpoints MoneyPenny calls, with
+configurable latency, jitter, and error rate, so end-to-end benchmarks run
+offline and repeatably.
+"""
+
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Uploads are 16 kHz mono 16-bit WAV files.
+WAV_BYTES_PER_SECOND = 32000
+WORDS_PER_SECOND = 2.5
+WORDS = (
+    "the quarterly numbers look better than expected so please send the "
+    "summary to the team before friday and copy the finance channel"
+).split()
+RAW_TRANSCRIPT = re.compile(r"<<<RAW_TRANSCRIPTION\n(.*)\nRAW_TRANSCRIPTION", re.S)
+
+
+class FakeProvider:
+    """Threaded HTTP server that answers like Groq and OpenRouter.
+
+    Each request sleeps latency_ms plus per_audio_second_ms for every
+    second of uploaded audio, plus Gaussian jitter (jitter_ms standard
+    deviation). A fraction error_rate of requests fail with HTTP 503,
+    which MoneyPenny retries once. Transcripts are filler words whose
+    count follows the audio length; cleanup echoes the raw transcript.
+
+    Point the app at it with PROVIDER_API_URLS = fake.api_urls().
+    """
+
+    def __init__(self, latency_ms: float = 150.0, jitter_ms: float = 40.0,
+                 error_rate: float = 0.0, per_audio_second_ms: float = 8.0,
+                 seed: int = 0, host: str = "127.0.0.1", port: int = 0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.per_audio_second_ms = per_audio_second_ms
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.counts = {"transcriptions": 0, "chat": 0, "errors": 0}
+        self.httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self.httpd.daemon_threads = True
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def api_urls(self) -> dict:
+        """PROVIDER_API_URLS entries that route both providers here."""
+        return {"groq": f"{self.url}/openai/v1", "openrouter": f"{self.url}/api/v1"}
+
+    def start(self):
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        return self
+
+    def shutdown(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def _plan(self, kind: str, audio_seconds: float = 0.0) -> tuple:
+        """Return (delay seconds, failed) for one request and count it."""
+        with self.lock:
+            jitter = self.random.gauss(0.0, self.jitter_ms) if self.jitter_ms else 0.0
+            failed = self.random.random() < self.error_rate
+            self.counts[kind] += 1
+            if failed:
+                self.counts["errors"] += 1
+        delay_ms = self.latency_ms + self.per_audio_second_ms * audio_seconds + jitter
+        return max(0.0, delay_ms) / 1000, failed
+
+    def _handler_class(self):
+        provider = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                path = self.path.split("?", 1)[0]
+                if path.endswith("/audio/transcriptions"):
+                    audio_seconds = len(body) / WAV_BYTES_PER_SECOND
+                    delay, failed = provider._plan("transcriptions", audio_seconds)
+                    count = max(1, round(audio_seconds * WORDS_PER_SECOND))
+                    payload = {"text": " ".join(WORDS[i % len(WORDS)] for i in range(count))}
+                elif path.endswith("/chat/completions"):
+                    delay, failed = provider._plan("chat")
+                    prompt = json.loads(body)["messages"][-1]["content"]
+                    match = RAW_TRANSCRIPT.search(prompt)
+                    cleaned = match.group(1) if match else prompt
+                    payload = {"choices": [{"message": {"role": "assistant", "content": cleaned}}]}
+                else:
+                    self._send_json(404, {"error": {"message": "Not found"}})
+                    return
+                time.sleep(delay)
+                if failed:
+                    self._send_json(503, {"error": {"message": "Service unavailable (simulated)"}})
+                    return
+                self._send_json(200, payload, {"openai-processing-ms": f"{delay * 1000:.0f}"})
+
+            def _send_json(self, status: int, payload: dict, headers: dict = None):
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+        return Handler
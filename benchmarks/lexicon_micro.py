@@ -0,0 +1,89 @@
+"""
+MoneyPenny Lexicon Correction Microbenchmark
+Times Lexicon.correct, the local pass that rewrites misheard lexicon terms
+before cleanup, on synthetic lexicons of thousands of terms, and checks that
+every planted near miss in the transcript is corrected and that ordinary
+words are never turned into real-word names such as "Swift" or "Mason".
+
+    python benchmarks/lexicon_micro.py
+    python benchmarks/lexicon_micro.py --sizes 1000,50000 --number 50
+"""
+
+import argparse
+import random
+import string
+import sys
+import tempfile
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from voice_to_text import Lexicon  # noqa: E402
+
+WORDS = (
+    "the team shipped release notes before friday and we should follow up "
+    "with finance about the budget for next quarter hold shift to login "
+    "the parser will strip a closure for a mason"
+).split()
+# Real-word names that the ordinary words above must never turn into.
+REAL_NAMES = ("Swift", "Logan", "Parker", "Stripe", "Clojure", "Mason")
+# (lexicon term, how the recognizer heard it)
+PLANTED = (
+    ("MoneyPenny", "Money penny"),
+    ("Kubernetes", "Kubernetis"),
+    ("Acme Cloud", "acme clowd"),
+    ("Terraform", "terraphorm"),
+)
+
+
+def make_terms(count: int, seed: int) -> list:
+    """Random capitalized names, one and two words, plus the planted terms."""
+    rng = random.Random(seed)
+    terms = []
+    for _ in range(count - len(REAL_NAMES) - len(PLANTED)):
+        words = [
+            "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 10))).capitalize()
+            for _ in range(rng.choice((1, 1, 1, 2)))
+        ]
+        terms.append(" ".join(words))
+    return terms + list(REAL_NAMES) + [term for term, _ in PLANTED]
+
+
+def make_transcript(words: int, seed: int) -> str:
+    rng = random.Random(seed)
+    parts = [rng.choice(WORDS) for _ in range(words)]
+    for _, heard in PLANTED:
+        parts.insert(rng.randrange(len(parts)), heard)
+    return " ".join(parts) + "."
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Lexicon correction microbenchmark")
+    parser.add_argument("--sizes", default="100,1000,10000,50000", help="lexicon sizes in terms")
+    parser.add_argument("--words", type=int, default=60, help="transcript length in words")
+    parser.add_argument("--number", type=int, default=200, help="calls per timing")
+    args = parser.parse_args()
+
+    text = make_transcript(args.words, seed=0)
+    print(f"{'terms':>8}{'index ms':>10}{'per call us':>13}{'per word us':>13}")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = Path(temp_dir) / "lexicon.txt"
+        for size in (int(value) for value in args.sizes.split(",")):
+            path.write_text("\n".join(make_terms(size, seed=size)) + "\n", encoding="utf-8")
+            lexicon = Lexicon(path)
+            build = timeit.timeit(lambda: lexicon.correct(""), number=1)
+            corrected, corrections = lexicon.correct(text)
+            missed = [term for term, _ in PLANTED if term not in corrected]
+            if missed:
+                raise SystemExit(f"Not corrected with {size} terms: {', '.join(missed)}")
+            unexpected = [pair for pair in corrections if pair not in {(h, t) for t, h in PLANTED}]
+            if unexpected:
+                raise SystemExit(f"Ordinary words rewritten with {size} terms: {unexpected}")
+            best = min(timeit.repeat(lambda: lexicon.correct(text), number=args.number, repeat=3))
+            per_call = best / args.number * 1e6
+            print(f"{size:>8}{build * 1000:>10.1f}{per_call:>13.1f}{per_call / len(text.split()):>13.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,535 @@
+"""
+MoneyPenny Engine Module
+Owns the faster-whisper model, either in-process, in a child process, or
+in a persistent engine daemon shared across app restarts. Out-of-process
+engines receive audio through shared memory.
+"""
+
+import contextlib
+import gc
+import logging
+import multiprocessing
+import os
+import subprocess
+import sys
+import threading
+import time
+from bisect import bisect_right
+from multiprocessing import shared_memory
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Listener, answer_challenge, deliver_challenge
+
+import numpy as np
+from faster_whisper import BatchedInferencePipeline, WhisperModel
+
+from network import retry_over_ipv4
+
+RATE = 16000
+
+logger = logging.getLogger("moneypenny")
+
+
+def pcm_to_float32(pcm) -> np.ndarray:
+    """Convert int16 PCM bytes to the float32 waveform faster-whisper expects."""
+    return np.frombuffer(pcm, dtype=np.int16).astype(np.float32) / 32768.0
+
+
+def float32_to_pcm(audio: np.ndarray) -> bytes:
+    """Convert a float32 waveform back to int16 PCM bytes (inverse of pcm_to_float32)."""
+    return np.clip(np.rint(audio * 32768.0), -32768, 32767).astype(np.int16).tobytes()
+
+
+def decode_clips(model, audio: np.ndarray, clips: list, transcribe_kwargs: dict,
+                 batch_size: int) -> list:
+    """Decode clips of one waveform; return one text per clip.
+
+    clips is a list of (start, end) sample offsets laid end to end. A single
+    clip goes through WhisperModel.transcribe. Several clips are handed to
+    the batched pipeline as explicit clip timestamps, so each one fills its
+    own batch slot, and every output segment is mapped back to its clip by
+    start time.
+    """
+    if len(clips) == 1:
+        start, end = clips[0]
+        segments, info = model.transcribe(audio[start:end], **transcribe_kwargs)
+        return ["".join(segment.text for segment in segments).strip()]
+
+    clip_timestamps = [{"start": start / RATE, "end": end / RATE} for start, end in clips]
+    kwargs = dict(transcribe_kwargs)
+    # Clip timestamps replace the VAD pass in the batched pipeline.
+    kwargs.pop("vad_parameters", None)
+    kwargs["vad_filter"] = False
+    kwargs.pop("condition_on_previous_text", None)
+    pipeline = BatchedInferencePipeline(model)
+    segments, info = pipeline.transcribe(
+        audio,
+        clip_timestamps=clip_timestamps,
+        batch_size=batch_size,
+        **kwargs,
+    )
+
+    starts = [clip["start"] for clip in clip_timestamps]
+    texts = [[] for _ in clips]
+    for segment in segments:
+        # Segment starts are rounded to the millisecond.
+        index = max(0, bisect_right(starts, segment.start + 0.001) - 1)
+        text = segment.text.strip()
+        if text:
+            texts[index].append(text)
+    return [" ".join(parts) for parts in texts]
+
+
+class EngineError(RuntimeError):
+    """The engine process could not load a model or decode audio."""
+
+
+def _attach_shared_memory(name: str) -> shared_memory.SharedMemory:
+    block = shared_memory.SharedMemory(name=name)
+    if os.name != "nt":
+        # Before Python 3.13, attaching registers the block with the resource
+        # tracker, which would unlink the client's block when this process
+        # exits. The client owns it.
+        from multiprocessing import resource_tracker
+        resource_tracker.unregister(block._name, "shared_memory")
+    return block
+
+
+def _load_model(models: dict, model_size: str):
+    """Return models[model_size], loading it first if needed. Call with the lock held."""
+    if model_size not in models:
+        logger.info("Engine loading Whisper model: '%s'...", model_size)
+        # The app sends a folder from its model cache, so nothing downloads
+        # here; a bare size name downloads through huggingface_hub, which
+        # cannot take the IPv4-only session and is simply tried again.
+        models[model_size] = retry_over_ipv4(lambda session: WhisperModel(
+            model_size, device="cpu", compute_type="int8"
+        ))
+    return models[model_size]
+
+
+class EngineClients:
+    """Which clients are attached to a shared engine and the models each uses.
+
+    With several apps on one daemon, an "unload" only drops the caller's
+    hold on a model (it is freed once no other client uses it), and a
+    "shutdown" only stops the daemon when no other client is attached.
+    """
+
+    def __init__(self):
+        self.attached = set()
+        self.holders = {}  # model size -> clients that loaded or decoded with it
+        self.lock = threading.Lock()
+
+    def attach(self, client):
+        with self.lock:
+            self.attached.add(client)
+
+    def detach(self, client):
+        """Forget a disconnected client; its models stay loaded for the next one."""
+        with self.lock:
+            self.attached.discard(client)
+            for holders in self.holders.values():
+                holders.discard(client)
+
+    def hold(self, client, model_size: str):
+        with self.lock:
+            self.holders.setdefault(model_size, set()).add(client)
+
+    def release(self, client, model_size: str) -> bool:
+        """Drop client's hold on model_size; True if no other client holds it."""
+        with self.lock:
+            holders = self.holders.get(model_size, set())
+            holders.discard(client)
+            return not holders
+
+    def others(self, client) -> int:
+        """Number of other clients attached."""
+        with self.lock:
+            return len(self.attached - {client})
+
+
+def serve_engine(conn, models: dict, lock=None, clients: EngineClients = None):
+    """Answer engine requests on one connection until it closes.
+
+    Requests are dicts with an "op" of "ping", "load", "unload", "decode",
+    or "shutdown"; replies are dicts with "ok" and either a result or an
+    "error" message. models maps model size to a loaded WhisperModel and may
+    be shared between connections, in which case lock serializes access and
+    clients (see EngineClients) keeps one client's unload or shutdown from
+    pulling a model or the engine out from under the others.
+    A decode reloads a model another client unloaded.
+    Returns "shutdown" when a client asked the engine to stop.
+    """
+    lock = lock or contextlib.nullcontext()
+    while True:
+        try:
+            request = conn.recv()
+        except (EOFError, OSError):
+            return
+        op = request.get("op")
+        try:
+            if op == "ping":
+                reply = {"ok": True, "models": sorted(models), "pid": os.getpid()}
+            elif op == "load":
+                with lock:
+                    _load_model(models, request["model_size"])
+                if clients is not None:
+                    clients.hold(conn, request["model_size"])
+                reply = {"ok": True}
+            elif op == "unload":
+                model_size = request["model_size"]
+                if clients is not None and not clients.release(conn, model_size):
+                    logger.info("Engine keeps Whisper model '%s' for other clients", model_size)
+                else:
+                    with lock:
+                        if models.pop(model_size, None) is not None:
+                            gc.collect()
+                            logger.info("Engine unloaded Whisper model: '%s'", model_size)
+                reply = {"ok": True}
+            elif op == "decode":
+                if clients is not None:
+                    clients.hold(conn, request["model_size"])
+                block = _attach_shared_memory(request["shm"])
+                try:
+                    audio = pcm_to_float32(block.buf[:request["size"]])
+                finally:
+                    block.close()
+                with lock:
+                    texts = decode_clips(
+                        _load_model(models, request["model_size"]),
+                        audio,
+                        request["clips"],
+                        request["kwargs"],
+                        request["batch_size"],
+                    )
+                reply = {"ok": True, "texts": texts}
+            elif op == "shutdown":
+                others = clients.others(conn) if clients is not None else 0
+                conn.send({"ok": True, "stopping": not others})
+                if others:
+                    logger.info("Engine keeps running for %d other client(s)", others)
+                    return None
+                return "shutdown"
+            else:
+                reply = {"ok": False, "error": f"unknown op {op!r}"}
+        except Exception as exc:
+            logger.exception("Engine request %r failed", op)
+            reply = {"ok": False, "error": f"{type(exc).__name__}: {exc}"}
+        try:
+            conn.send(reply)
+        except (EOFError, OSError):
+            return
+
+
+def _engine_process_main(conn):
+    serve_engine(conn, {})
+
+
+class EngineProcess:
+    """Client for a transcription engine running in a child process.
+
+    The child owns the WhisperModel, so decoding never competes with the
+    audio, hotkey, and window threads for this interpreter's GIL. Audio is
+    passed through a reusable shared-memory block rather than pickled, and
+    a crashed engine is restarted (and its model reloaded) on the next
+    request.
+    """
+
+    def __init__(self):
+        self.process = None
+        self.conn = None
+        self.block = None
+        self.model_size = None
+        # Engine process id, for memory reporting (None until started).
+        self.pid = None
+        self.lock = threading.Lock()
+
+    def load(self, model_size: str):
+        with self.lock:
+            self._start()
+            self._request({"op": "load", "model_size": model_size})
+            self.model_size = model_size
+
+    def unload(self):
+        """Free the engine's model; the process (or daemon) keeps running.
+
+        A daemon keeps the model while another client is still using it.
+        """
+        with self.lock:
+            if self.alive() and self.model_size:
+                self._request({"op": "unload", "model_size": self.model_size})
+
+    def decode(self, pcm: bytes, clips: list, transcribe_kwargs: dict,
+               batch_size: int) -> list:
+        """Decode int16 PCM in the engine; return one text per clip."""
+        with self.lock:
+            for attempt in (1, 2):
+                try:
+                    if not self.alive():
+                        self._restart()
+                    self._write_audio(pcm)
+                    reply = self._request({
+                        "op": "decode",
+                        "model_size": self.model_size,
+                        "shm": self.block.name,
+                        "size": len(pcm),
+                        "clips": clips,
+                        "kwargs": transcribe_kwargs,
+                        "batch_size": batch_size,
+                    })
+                    return reply["texts"]
+                except (EOFError, BrokenPipeError, ConnectionError) as exc:
+                    if attempt == 2:
+                        raise EngineError(f"engine process failed: {exc}") from exc
+                    logger.warning("Engine process died (%s); restarting...", exc)
+                    self._stop_process()
+
+    def alive(self) -> bool:
+        return self.process is not None and self.process.is_alive()
+
+    def close(self):
+        with self.lock:
+            if self.alive():
+                try:
+                    self.conn.send({"op": "shutdown"})
+                    self.process.join(2)
+                except Exception:
+                    pass
+            self._stop_process()
+            if self.block is not None:
+                self.block.close()
+                self.block.unlink()
+                self.block = None
+
+    def _start(self):
+        if self.alive():
+            return
+        context = multiprocessing.get_context("spawn")
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_engine_process_main, args=(child_conn,), daemon=True,
+            name="moneypenny-engine",
+        )
+        self.process.start()
+        child_conn.close()
+        self.pid = self.process.pid
+        logger.info("Engine process started (pid %s)", self.process.pid)
+
+    def _restart(self):
+        self._stop_process()
+        self._start()
+        if self.model_size:
+            self._request({"op": "load", "model_size": self.model_size})
+
+    def _stop_process(self):
+        if self.process is not None and self.process.is_alive():
+            self.process.kill()
+        self.process = None
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+    def _write_audio(self, pcm: bytes):
+        size = max(len(pcm), 1)
+        if self.block is None or self.block.size < size:
+            if self.block is not None:
+                self.block.close()
+                self.block.unlink()
+            # Grow in whole minutes of audio so most dictations reuse the block.
+            minute = RATE * 2 * 60
+            self.block = shared_memory.SharedMemory(
+                create=True, size=(size // minute + 1) * minute
+            )
+        self.block.buf[:len(pcm)] = pcm
+
+    def _request(self, request: dict) -> dict:
+        self.conn.send(request)
+        reply = self.conn.recv()
+        if not reply.get("ok"):
+            raise EngineError(reply.get("error", "engine request failed"))
+        return reply
+
+
+def engine_address(name: str = "MoneyPennyEngine") -> str:
+    """Per-user daemon address: a named pipe on Windows, a Unix socket elsewhere."""
+    user = os.environ.get("USERNAME") or os.environ.get("USER") or "user"
+    if os.name == "nt":
+        return rf"\\.\pipe\{name}-{user}"
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR") or "/tmp"
+    return os.path.join(runtime_dir, f"{name.lower()}-{user}.sock")
+
+
+def run_engine_daemon(address: str, authkey: bytes):
+    """Hold loaded models and serve engine clients until asked to shut down.
+
+    Every connection is served on its own thread against one shared model
+    table, so an app restart reattaches to models that are already warm.
+    Returns at once if another daemon already holds the address.
+    """
+    try:
+        Client(address, authkey=authkey).close()
+        logger.info("Engine daemon already running at %s", address)
+        return
+    except AuthenticationError:
+        # A daemon started with another engine.key (a regenerated key, a
+        # second install, another MONEYPENNY_APP_DIR): take the address over.
+        if os.name == "nt":
+            # A named pipe belongs to the process serving it; it cannot be taken.
+            logger.error("Engine daemon at %s uses a different key; stop it first", address)
+            return
+        logger.warning("Engine daemon at %s uses a different key; replacing it", address)
+        os.unlink(address)
+    except (OSError, EOFError):
+        if os.name != "nt" and os.path.exists(address):
+            os.unlink(address)  # stale socket left by a crashed daemon
+
+    # Connections are authenticated on their own threads (see _serve), so
+    # a client that stalls or fails the handshake cannot block accept().
+    try:
+        listener = Listener(address)
+    except OSError as exc:
+        # Another daemon started between the probe and here.
+        logger.info("Engine daemon address %s is in use (%s)", address, exc)
+        return
+    logger.info("Engine daemon listening at %s (pid %s)", address, os.getpid())
+    models = {}
+    lock = threading.Lock()
+    clients = EngineClients()
+    stopping = threading.Event()
+
+    def _serve(conn):
+        with conn:
+            try:
+                deliver_challenge(conn, authkey)
+                answer_challenge(conn, authkey)
+            except (AuthenticationError, OSError, EOFError) as exc:
+                logger.warning("Rejected engine client: %s", exc or type(exc).__name__)
+                return
+            clients.attach(conn)
+            try:
+                result = serve_engine(conn, models, lock, clients)
+            finally:
+                clients.detach(conn)
+            if result == "shutdown":
+                stopping.set()
+                # Unblock accept() so the daemon can exit.
+                with contextlib.suppress(OSError):
+                    Client(address).close()
+
+    try:
+        while not stopping.is_set():
+            try:
+                conn = listener.accept()
+            except (AuthenticationError, OSError, EOFError):
+                continue
+            if stopping.is_set():
+                conn.close()
+                break
+            threading.Thread(target=_serve, args=(conn,), daemon=True).start()
+    finally:
+        listener.close()
+        logger.info("Engine daemon stopped.")
+
+
+class EngineDaemonClient(EngineProcess):
+    """Client for the persistent engine daemon.
+
+    Attaches to a running daemon or spawns one with command, so restarting
+    the app finds its model already loaded. Closing the client leaves the
+    daemon and its models running; a lost connection reconnects (and
+    respawns the daemon if it died) on the next request.
+    """
+
+    CONNECT_TIMEOUT_SECONDS = 15
+
+    def __init__(self, address: str, authkey: bytes, command: list):
+        super().__init__()
+        self.address = address
+        self.authkey = authkey
+        self.command = command
+
+    def alive(self) -> bool:
+        return self.conn is not None and not self.conn.closed
+
+    def shutdown_daemon(self):
+        """Ask the daemon to exit, unloading its models.
+
+        The daemon keeps running (and only detaches this client) while other
+        apps are attached to it.
+        """
+        with self.lock:
+            if self.alive():
+                with contextlib.suppress(Exception):
+                    self._request({"op": "shutdown"})
+            self._stop_process()
+
+    def close(self):
+        with self.lock:
+            self._stop_process()
+            if self.block is not None:
+                self.block.close()
+                self.block.unlink()
+                self.block = None
+
+    def _start(self):
+        if self.alive():
+            return
+        try:
+            self.conn = Client(self.address, authkey=self.authkey)
+            self.pid = self._request({"op": "ping"})["pid"]
+            logger.info("Attached to running engine daemon (pid %s)", self.pid)
+            return
+        except AuthenticationError:
+            # The new daemon replaces one started with another engine.key.
+            logger.warning("Engine daemon at %s uses a different key; starting our own", self.address)
+        except (OSError, EOFError):
+            pass
+
+        logger.info("Starting engine daemon...")
+        kwargs = {}
+        if os.name == "nt":
+            kwargs["creationflags"] = (
+                subprocess.DETACHED_PROCESS
+                | subprocess.CREATE_NEW_PROCESS_GROUP
+                | subprocess.CREATE_NO_WINDOW
+            )
+        else:
+            kwargs["start_new_session"] = True
+        subprocess.Popen(
+            self.command,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            close_fds=True,
+            **kwargs,
+        )
+        deadline = time.monotonic() + self.CONNECT_TIMEOUT_SECONDS
+        while True:
+            try:
+                self.conn = Client(self.address, authkey=self.authkey)
+            except (AuthenticationError, OSError, EOFError) as exc:
+                # Until the new daemon takes over, the old one may still answer.
+                if time.monotonic() > deadline:
+                    raise ConnectionError(f"engine daemon did not start ({exc!r})") from exc
+                time.sleep(0.1)
+                continue
+            self.pid = self._request({"op": "ping"})["pid"]
+            return
+
+    def _stop_process(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+
+def daemon_command(script: str, app_dir: str) -> list:
+    """Command line that starts the engine daemon from this installation."""
+    if getattr(sys, "frozen", False):
+        return [sys.executable, "--engine-daemon", "--app-dir", app_dir]
+    # pythonw.exe keeps the daemon windowless on Windows.
+    python = sys.executable
+    if os.name == "nt" and python.lower().endswith("python.exe"):
+        windowless = python[: -len("python.exe")] + "pythonw.exe"
+        if os.path.exists(windowless):
+            python = windowless
+    return [python, script, "--engine-daemon", "--app-dir", app_dir]
@@ -34,11 +34,15 @@ class MoneyPennyGUI:
         self.status_detail = None
         self.log_text = None
         self.history_text = None
+        self.latency_text = None
+        self.profile_text = None
+        self.models_text = None
         self.recent_activity = []
 
         # Register for status updates
         self.app.add_status_callback(self._on_status_update)
         self.app.add_history_callback(self._on_history_update)
+        self.app.model_cache.add_callback(self._on_model_progress)
 
     def create_window(self):
         """Create the main window."""
@@ -524,6 +528,66 @@ class MoneyPennyGUI:
         )
         hotkey_menu.pack(anchor="w", padx=5, pady=(5, 0))
 
+        # --- Long-form hotkey ---
+        ctk.CTkLabel(
+            container,
+            text="Long-Form Hotkey (press to start, press again to stop)",
+            font=ctk.CTkFont(family="Segoe UI", size=13, weight="bold"),
+            text_color=TEXT_COLOR,
+        ).pack(anchor="w", padx=5, pady=(10, 0))
+
+        self.long_form_hotkey_var = ctk.StringVar(
+            value=self.app.settings.get("long_form_hotkey", "off")
+        )
+        long_form_menu = ctk.CTkOptionMenu(
+            container,
+            values=["off", "f8", "f9", "f10", "f11", "f12", "scroll lock", "pause"],
+            variable=self.long_form_hotkey_var,
+            fg_color=BUTTON_COLOR,
+            button_color=BUTTON_COLOR,
+            button_hover_color=BUTTON_HOVER,
+            text_color=TEXT_COLOR,
+            dropdown_fg_color=BG_COLOR,
+            dropdown_text_color=TEXT_COLOR,
+            width=200,
+        )
+        long_form_menu.pack(anchor="w", padx=5, pady=(5, 0))
+
+        # --- Hands-free ---
+        ctk.CTkLabel(
+            container,
+            text="Hands-Free Recording (start when you speak)",
+            font=ctk.CTkFont(family="Segoe UI", size=13, weight="bold"),
+            text_color=TEXT_COLOR,
+        ).pack(anchor="w", padx=5, pady=(10, 0))
+
+        self.hands_free_labels = {
+            0: "Off",
+            500: "Stop after 0.5 s of silence",
+            1000: "Stop after 1 s of silence",
+            2000: "Stop after 2 s of silence",
+        }
+        silence_ms = self.app.settings.get("hands_free_silence_ms", 1000)
+        self.hands_free_var = ctk.StringVar(
+            value=self.hands_free_labels.get(
+                silence_ms if self.app.settings.get("hands_free", False) else 0,
+                "Stop after 1 s of silence",
+            )
+        )
+        hands_free_menu = ctk.CTkOptionMenu(
+            container,
+            values=list(self.hands_free_labels.values()),
+            variable=self.hands_free_var,
+            fg_color=BUTTON_COLOR,
+            button_color=BUTTON_COLOR,
+            button_hover_color=BUTTON_HOVER,
+            text_color=TEXT_COLOR,
+            dropdown_fg_color=BG_COLOR,
+            dropdown_text_color=TEXT_COLOR,
+            width=250,
+        )
+        hands_free_menu.pack(anchor="w", padx=5, pady=(5, 0))
+
         ctk.CTkLabel(
             container,
             text="Note: Hotkey changes require app restart",
@@ -738,6 +802,80 @@ class MoneyPennyGUI:
         self.log_text.pack(fill="both", expand=True, padx=5, pady=5)
         self.log_text.configure(state="disabled")
 
+        ctk.CTkLabel(
+            tab,
+            text="Speech Models",
+            font=ctk.CTkFont(family="Segoe UI", size=13, weight="bold"),
+            text_color=TEXT_COLOR,
+        ).pack(anchor="w", padx=10, pady=(10, 5))
+
+        models_frame = ctk.CTkFrame(tab, fg_color=BUTTON_COLOR, corner_radius=8)
+        models_frame.pack(fill="x", padx=10, pady=5)
+
+        self.models_text = ctk.CTkTextbox(
+            models_frame,
+            height=60,
+            fg_color=BG_COLOR,
+            text_color=TEXT_COLOR,
+            font=ctk.CTkFont(family="Consolas", size=11),
+        )
+        self.models_text.pack(fill="x", padx=5, pady=5)
+        self._refresh_models_display()
+
+        ctk.CTkLabel(
+            tab,
+            text="Latency (last 100 dictations, ms)",
+            font=ctk.CTkFont(family="Segoe UI", size=13, weight="bold"),
+            text_color=TEXT_COLOR,
+        ).pack(anchor="w", padx=10, pady=(10, 5))
+
+        latency_frame = ctk.CTkFrame(tab, fg_color=BUTTON_COLOR, corner_radius=8)
+        latency_frame.pack(fill="x", padx=10, pady=5)
+
+        self.latency_text = ctk.CTkTextbox(
+            latency_frame,
+            height=150,
+            fg_color=BG_COLOR,
+            text_color=TEXT_COLOR,
+            font=ctk.CTkFont(family="Consolas", size=11),
+        )
+        self.latency_text.pack(fill="x", padx=5, pady=5)
+        self._refresh_latency_display()
+
+        # Profiling: "it feels slow today" reports get a cProfile of real use.
+        profile_header = ctk.CTkFrame(tab, fg_color="transparent")
+        profile_header.pack(fill="x", padx=10, pady=(10, 5))
+
+        ctk.CTkLabel(
+            profile_header,
+            text="Profile (slowest functions, ms)",
+            font=ctk.CTkFont(family="Segoe UI", size=13, weight="bold"),
+            text_color=TEXT_COLOR,
+        ).pack(side="left")
+
+        ctk.CTkButton(
+            profile_header,
+            text="Profile Next 5 Dictations",
+            command=self._start_profiling,
+            fg_color=BUTTON_COLOR,
+            hover_color=BUTTON_HOVER,
+            text_color=TEXT_COLOR,
+            width=180,
+        ).pack(side="right")
+
+        profile_frame = ctk.CTkFrame(tab, fg_color=BUTTON_COLOR, corner_radius=8)
+        profile_frame.pack(fill="x", padx=10, pady=5)
+
+        self.profile_text = ctk.CTkTextbox(
+            profile_frame,
+            height=150,
+            fg_color=BG_COLOR,
+            text_color=TEXT_COLOR,
+            font=ctk.CTkFont(family="Consolas", size=11),
+        )
+        self.profile_text.pack(fill="x", padx=5, pady=5)
+        self._refresh_profile_display(self.app.profiler.last_report)
+
         # Info
         info_frame = ctk.CTkFrame(tab, fg_color="transparent")
         info_frame.pack(fill="x", padx=10, pady=10)
@@ -750,6 +888,15 @@ class MoneyPennyGUI:
             text_color=TEXT_COLOR,
         ).pack(anchor="w")
 
+        long_form_hotkey = self.app.settings.get("long_form_hotkey", "off")
+        if long_form_hotkey != "off":
+            ctk.CTkLabel(
+                info_frame,
+                text=f"Long-form: Press {long_form_hotkey.upper()} to start, again to stop",
+                font=ctk.CTkFont(family="Segoe UI", size=12),
+                text_color=TEXT_COLOR,
+            ).pack(anchor="w")
+
         ctk.CTkLabel(
             info_frame,
             text="Quit: Ctrl+Alt+Q or right-click tray icon → Exit",
@@ -790,6 +937,7 @@ class MoneyPennyGUI:
         if self.window and self.history_text:
             try:
                 self.window.after(0, self._refresh_history_display)
+                self.window.after(0, self._refresh_latency_display)
             except Exception:
                 pass
 
@@ -822,6 +970,105 @@ class MoneyPennyGUI:
         except Exception:
             pass
 
+    def _refresh_latency_display(self):
+        """Show rolling p50/p95/p99 per dictation stage from History."""
+        if not self.latency_text:
+            return
+        summary = self.app.history.latency_percentiles()
+        lines = [f"{'stage':<14}{'p50':>8}{'p95':>8}{'p99':>8}{'n':>6}"]
+        for stage, stats in summary.items():
+            name = stage[:-3].replace("_", " ")
+            lines.append(
+                f"{name:<14}{stats['p50']:>8.0f}{stats['p95']:>8.0f}"
+                f"{stats['p99']:>8.0f}{stats['count']:>6}"
+            )
+        display = "\n".join(lines) if summary else "No timed dictations yet."
+        try:
+            self.latency_text.configure(state="normal")
+            self.latency_text.delete("1.0", "end")
+            self.latency_text.insert("1.0", display)
+            self.latency_text.configure(state="disabled")
+        except Exception:
+            pass
+
+    def _on_model_progress(self, model_size: str, entry: dict):
+        """Schedule a model download refresh from the download thread."""
+        if self.window and self.models_text:
+            try:
+                self.window.after(0, self._refresh_models_display)
+            except Exception:
+                pass
+
+    def _refresh_models_display(self):
+        """Show download progress and state for each speech model."""
+        if not self.models_text:
+            return
+        lines = []
+        for model_size, entry in sorted(self.app.model_cache.progress.items()):
+            if entry["state"] == "downloading" and entry["total"]:
+                lines.append(
+                    f"{model_size:<14}downloading {entry['done'] * 100 // entry['total']:>3}%  "
+                    f"({entry['done'] / 2**20:.0f} / {entry['total'] / 2**20:.0f} MB)"
+                )
+            elif entry["state"] == "failed":
+                lines.append(f"{model_size:<14}download failed: {entry['error']}")
+            else:
+                lines.append(f"{model_size:<14}{entry['state']}")
+        if not lines:
+            lines.append("Models download when first used (or set prefetch_models).")
+        lines.append(f"Folder: {self.app.model_cache.directory}")
+        try:
+            self.models_text.configure(state="normal")
+            self.models_text.delete("1.0", "end")
+            self.models_text.insert("1.0", "\n".join(lines))
+            self.models_text.configure(state="disabled")
+        except Exception:
+            pass
+
+    def _start_profiling(self):
+        self.app.profiler.start(5)
+        self._refresh_profile_display(None)
+        self._log_activity("Profiling the next 5 dictations")
+
+    def show_profile(self, report: dict):
+        """Show a finished profile; safe to call from any thread."""
+        if self.window and self.profile_text:
+            try:
+                self.window.after(0, lambda: self._refresh_profile_display(report))
+            except Exception:
+                pass
+
+    def _refresh_profile_display(self, report):
+        if not self.profile_text:
+            return
+        if report:
+            lines = [f"{'cumulative':>10}{'own':>9}{'calls':>8}  function"]
+            for row in report["rows"]:
+                lines.append(
+                    f"{row['cumulative_ms']:>10.1f}{row['own_ms']:>9.1f}"
+                    f"{row['calls']:>8}  {row['function']}"
+                )
+            lines.append(f"\nFull profile: {report['path']}")
+            display = "\n".join(lines)
+        elif self.app.profiler.active:
+            display = f"Profiling... {self.app.profiler.remaining} dictation(s) to go."
+        else:
+            display = "No profile yet. Click Profile Next 5 Dictations, then dictate as usual."
+        try:
+            self.profile_text.configure(state="normal")
+            self.profile_text.delete("1.0", "end")
+            self.profile_text.insert("1.0", display)
+            self.profile_text.configure(state="disabled")
+        except Exception:
+            pass
+
+    def copy_text(self, text: str):
+        """Put text on the clipboard; safe to call from any thread."""
+        def _copy():
+            self.window.clipboard_clear()
+            self.window.clipboard_append(text)
+        self.window.after(0, _copy)
+
     def _copy_latest_transcript(self):
         entries = self.app.history.get_entries()
         if not entries:
@@ -839,6 +1086,7 @@ class MoneyPennyGUI:
             return
         self.app.history.clear()
         self._refresh_history_display()
+        self._refresh_latency_display()
         self._log_activity("Cleared transcript history")
 
     def _save_settings(self):
@@ -887,6 +1135,19 @@ class MoneyPennyGUI:
         new_hotkey = self.hotkey_var.get()
         old_hotkey = self.app.settings.get("record_hotkey")
         self.app.settings.set("record_hotkey", new_hotkey)
+        new_long_form_hotkey = self.long_form_hotkey_var.get()
+        old_long_form_hotkey = self.app.settings.get("long_form_hotkey", "off")
+        self.app.settings.set("long_form_hotkey", new_long_form_hotkey)
+
+        # Hands-free takes effect immediately
+        silence_ms = next(
+            ms for ms, label in self.hands_free_labels.items()
+            if label == self.hands_free_var.get()
+        )
+        self.app.settings.set("hands_free", silence_ms > 0)
+        if silence_ms:
+            self.app.settings.set("hands_free_silence_ms", silence_ms)
+        self.app.configure_hands_free()
 
         # Save to file
         self.app.settings.save()
@@ -908,7 +1169,7 @@ class MoneyPennyGUI:
                 f"Settings saved, but Cloud mode needs a {self.provider_var.get()} API key.\n\n"
                 f"Paste your key into the {self.provider_var.get()} API Key field, then Save again."
             )
-        elif new_hotkey != old_hotkey:
+        elif new_hotkey != old_hotkey or new_long_form_hotkey != old_long_form_hotkey:
             messagebox.showinfo(
                 "MoneyPenny",
                 "Settings saved!\n\nHotkey change will take effect after restarting the app."
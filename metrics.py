@@ -0,0 +1,246 @@
+"""
+MoneyPenny Metrics Module
+In-process counters, histograms, and gauges for the dictation pipeline,
+rendered in the Prometheus text format and exported (opt-in) through a
+localhost /metrics endpoint or a periodically rewritten file.
+"""
+
+import copy
+import ctypes
+import logging
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+logger = logging.getLogger("moneypenny")
+
+# Seconds; covers a 5 ms cleanup pass up to a long-form passage.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+def _format_labels(labels) -> str:
+    if not labels:
+        return ""
+    escaped = (
+        name + '="' + str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"') + '"'
+        for name, value in labels
+    )
+    return "{" + ",".join(escaped) + "}"
+
+
+class MetricsRegistry:
+    """Named metrics, each holding one series per label set.
+
+    Metrics are declared once (counter, histogram, gauge) and updated from
+    any thread; an update is a dictionary change under one lock, so the
+    pipeline records everything whether or not an exporter is running.
+    Gauges are read from a callback at render time, which returns a number,
+    a {label tuple: number} dict, or None to skip the gauge.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.metrics = {}  # name -> {"kind", "help", "buckets", "series", "callback"}
+
+    def counter(self, name: str, help_text: str):
+        self._declare(name, "counter", help_text)
+
+    def histogram(self, name: str, help_text: str, buckets=LATENCY_BUCKETS):
+        self._declare(name, "histogram", help_text, buckets=tuple(sorted(buckets)))
+
+    def gauge(self, name: str, help_text: str, callback):
+        self._declare(name, "gauge", help_text, callback=callback)
+
+    def inc(self, name: str, amount: float = 1.0, **labels):
+        key = tuple(sorted(labels.items()))
+        with self.lock:
+            series = self.metrics[name]["series"]
+            series[key] = series.get(key, 0.0) + amount
+
+    def observe(self, name: str, value: float, **labels):
+        key = tuple(sorted(labels.items()))
+        with self.lock:
+            metric = self.metrics[name]
+            series = metric["series"].get(key)
+            if series is None:
+                series = metric["series"][key] = {
+                    "counts": [0] * len(metric["buckets"]), "sum": 0.0, "count": 0,
+                }
+            for index, bound in enumerate(metric["buckets"]):
+                if value <= bound:
+                    series["counts"][index] += 1
+            series["sum"] += value
+            series["count"] += 1
+
+    def value(self, name: str, **labels) -> float:
+        """Current value of a counter series (0 if never incremented)."""
+        with self.lock:
+            return self.metrics[name]["series"].get(tuple(sorted(labels.items())), 0.0)
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format (version 0.0.4)."""
+        with self.lock:
+            snapshot = [
+                (name, metric, copy.deepcopy(metric["series"]))
+                for name, metric in self.metrics.items()
+            ]
+        lines = []
+        for name, metric, series in snapshot:
+            if metric["kind"] == "gauge":
+                try:
+                    reading = metric["callback"]()
+                except Exception:
+                    logger.debug("Gauge %s failed", name, exc_info=True)
+                    continue
+                if reading is None:
+                    continue
+                series = reading if isinstance(reading, dict) else {(): reading}
+            lines.append(f"# HELP {name} {metric['help']}")
+            lines.append(f"# TYPE {name} {metric['kind']}")
+            for labels, value in sorted(series.items()):
+                if metric["kind"] != "histogram":
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+                    continue
+                for bound, count in zip(metric["buckets"] + (float("inf"),),
+                                        value["counts"] + [value["count"]]):
+                    bucket_labels = labels + (("le", _format_value(bound)),)
+                    lines.append(f"{name}_bucket{_format_labels(bucket_labels)} {count}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(value['sum'])}")
+                lines.append(f"{name}_count{_format_labels(labels)} {value['count']}")
+        return "\n".join(lines) + "\n"
+
+    def write_file(self, path: Path):
+        """Replace path with the current metrics (atomically, for scrapers)."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_name(path.name + ".tmp")
+        temp_path.write_text(self.render(), encoding="utf-8")
+        os.replace(temp_path, path)
+
+    def _declare(self, name: str, kind: str, help_text: str, buckets=(), callback=None):
+        with self.lock:
+            metric = self.metrics.setdefault(name, {"series": {}})
+            metric.update(kind=kind, help=help_text, buckets=buckets, callback=callback)
+
+
+METRICS = MetricsRegistry()
+
+
+class MetricsExporter:
+    """Opt-in export of a registry: localhost HTTP, a metrics file, or both.
+
+    With port, GET /metrics on 127.0.0.1 answers in the Prometheus text
+    format (scrape it directly, or through an agent on the workstation).
+    With path, the file is rewritten every interval seconds, which suits
+    the node_exporter textfile collector; it is written once more on stop.
+    """
+
+    def __init__(self, registry: MetricsRegistry, port: int = 0, path: Path = None,
+                 interval: float = 15.0, host: str = "127.0.0.1"):
+        self.registry = registry
+        self.path = Path(path) if path else None
+        self.interval = interval
+        self.stopped = threading.Event()
+        self.httpd = None
+        if port:
+            self.httpd = ThreadingHTTPServer((host, port), self._handler_class())
+            self.httpd.daemon_threads = True
+
+    @property
+    def address(self) -> tuple:
+        return self.httpd.server_address if self.httpd is not None else None
+
+    def start(self):
+        if self.httpd is not None:
+            host, port = self.address[:2]
+            threading.Thread(target=self.httpd.serve_forever, name="metrics-http", daemon=True).start()
+            logger.info("Metrics at http://%s:%s/metrics", host, port)
+        if self.path is not None:
+            threading.Thread(target=self._flush_loop, name="metrics-file", daemon=True).start()
+            logger.info("Writing metrics to %s every %gs", self.path, self.interval)
+        return self
+
+    def stop(self):
+        self.stopped.set()
+        if self.httpd is not None:
+            self.httpd.shutdown()
+            self.httpd.server_close()
+        self._flush()
+
+    def _flush(self):
+        if self.path is None:
+            return
+        try:
+            self.registry.write_file(self.path)
+        except OSError:
+            logger.warning("Could not write metrics to %s", self.path, exc_info=True)
+
+    def _flush_loop(self):
+        while not self.stopped.wait(self.interval):
+            self._flush()
+
+    def _handler_class(self):
+        registry = self.registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                if self.path.split("?", 1)[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                data = registry.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        return Handler
+
+
+class _ProcessMemoryCounters(ctypes.Structure):
+    _fields_ = [
+        ("cb", ctypes.c_ulong),
+        ("PageFaultCount", ctypes.c_ulong),
+        ("PeakWorkingSetSize", ctypes.c_size_t),
+        ("WorkingSetSize", ctypes.c_size_t),
+        ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+        ("QuotaPagedPoolUsage", ctypes.c_size_t),
+        ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+        ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+        ("PagefileUsage", ctypes.c_size_t),
+        ("PeakPagefileUsage", ctypes.c_size_t),
+    ]
+
+
+def process_memory_bytes(pid: int = None):
+    """Resident memory (working set) of a process, or None if unavailable."""
+    pid = os.getpid() if pid is None else pid
+    if os.name == "nt":
+        kernel32 = ctypes.windll.kernel32
+        # PROCESS_QUERY_LIMITED_INFORMATION | PROCESS_VM_READ
+        handle = kernel32.OpenProcess(0x1000 | 0x0010, False, pid)
+        if not handle:
+            return None
+        try:
+            counters = _ProcessMemoryCounters()
+            counters.cb = ctypes.sizeof(counters)
+            if not kernel32.K32GetProcessMemoryInfo(handle, ctypes.byref(counters), counters.cb):
+                return None
+            return counters.WorkingSetSize
+        finally:
+            kernel32.CloseHandle(handle)
+    try:
+        with open(f"/proc/{pid}/statm", encoding="ascii") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
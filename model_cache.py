@@ -0,0 +1,302 @@
+"""
+MoneyPenny Model Cache Module
+Downloads faster-whisper models explicitly instead of inside WhisperModel():
+in the background with progress, verified against the Hugging Face Hub's
+checksums, resuming partial files, into a cache folder that several users
+of one computer can share.
+"""
+
+import contextlib
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from fnmatch import fnmatch
+from pathlib import Path
+from urllib.parse import quote
+
+import requests
+from faster_whisper.utils import download_model
+
+from network import retry_over_ipv4
+
+try:
+    from faster_whisper.utils import _MODELS as MODEL_REPOS  # size name -> Hub repo
+except ImportError:
+    MODEL_REPOS = {}
+
+logger = logging.getLogger("moneypenny")
+
+HF_ENDPOINT = os.environ.get("HF_ENDPOINT", "https://huggingface.co")
+# The files faster-whisper downloads for a model (its allow_patterns).
+MODEL_FILE_PATTERNS = (
+    "config.json", "preprocessor_config.json", "model.bin", "tokenizer.json", "vocabulary.*",
+)
+
+
+class ModelDownloadError(RuntimeError):
+    """A model could not be downloaded or failed verification."""
+
+
+def model_repo(model_size: str) -> str:
+    """Hugging Face repo holding a faster-whisper model size (or a repo id as given)."""
+    if "/" in model_size:
+        return model_size
+    return MODEL_REPOS.get(model_size, f"Systran/faster-whisper-{model_size}")
+
+
+class ModelCache:
+    """Complete, verified faster-whisper models in one folder.
+
+    Each model lives in directory/<owner>--<repo>/ and counts as present
+    only once manifest.json is written, after every file matched the
+    Hub's checksum (SHA-256 for large files, the git blob id for small
+    ones). A file being downloaded is kept as <name>.part and resumed
+    with a Range request, so an interrupted download continues where it
+    stopped instead of leaving a broken model behind.
+
+    The folder can be shared by several users of one computer: a lock
+    file stops two processes downloading the same model at once, and a
+    finished model only needs read access. Models that faster-whisper
+    already downloaded into the Hugging Face cache are used in place.
+
+    progress maps model size to {"state", "done", "total", "error"} and
+    callbacks are told whenever a model's state or whole percentage
+    changes.
+    """
+
+    MANIFEST = "manifest.json"
+    LOCK_STALE_SECONDS = 60
+    CHUNK_BYTES = 1 << 20
+
+    def __init__(self, directory: Path, session: requests.Session = None,
+                 endpoint: str = HF_ENDPOINT):
+        self.directory = Path(directory)
+        self.session = session or requests.Session()
+        self.endpoint = endpoint.rstrip("/")
+        self.lock = threading.Lock()
+        self.model_locks = {}
+        self.progress = {}
+        self.callbacks = []
+
+    def add_callback(self, callback):
+        self.callbacks.append(callback)
+
+    def model_dir(self, model_size: str) -> Path:
+        return self.directory / model_repo(model_size).replace("/", "--")
+
+    def cached_path(self, model_size: str):
+        """Folder of a complete, verified model in this cache, or None."""
+        path = self.model_dir(model_size)
+        return path if (path / self.MANIFEST).exists() else None
+
+    def ensure(self, model_size: str, session: requests.Session = None) -> str:
+        """Return a local folder for model_size, downloading it first if needed.
+
+        Blocks until the download finishes; use prefetch() to download in
+        the background. A path to a model folder is returned unchanged.
+        session, if given, replaces self.session for this download (the
+        IPv4-only retry of retry_over_ipv4).
+        """
+        if os.path.isdir(model_size):
+            return model_size
+        path = self.cached_path(model_size) or self._huggingface_cache_path(model_size)
+        if path is None:
+            with self._model_lock(model_size):
+                try:
+                    path = self.cached_path(model_size) or self._download(
+                        model_size, session or self.session
+                    )
+                except Exception as exc:
+                    self._update(model_size, state="failed", error=str(exc))
+                    raise
+        self._update(model_size, state="ready", error=None)
+        return str(path)
+
+    def prefetch(self, model_sizes) -> threading.Thread:
+        """Download model_sizes one after another on a background thread."""
+        def _run():
+            for model_size in model_sizes:
+                try:
+                    retry_over_ipv4(lambda session: self.ensure(model_size, session))
+                except Exception:
+                    logger.exception("Prefetching Whisper model '%s' failed", model_size)
+        thread = threading.Thread(target=_run, name="model-prefetch", daemon=True)
+        thread.start()
+        return thread
+
+    def _model_lock(self, model_size: str) -> threading.Lock:
+        with self.lock:
+            return self.model_locks.setdefault(model_size, threading.Lock())
+
+    def _huggingface_cache_path(self, model_size: str):
+        """A complete model that faster-whisper already put in the Hugging Face cache."""
+        try:
+            path = Path(download_model(model_size, local_files_only=True))
+        except Exception:
+            return None
+        if (path / "model.bin").exists() and (path / "config.json").exists():
+            return path
+        return None
+
+    def _download(self, model_size: str, session: requests.Session) -> Path:
+        repo = model_repo(model_size)
+        target = self.model_dir(model_size)
+        target.mkdir(parents=True, exist_ok=True)
+        with self._download_lock(target):
+            if (target / self.MANIFEST).exists():
+                return target  # another process finished it while we waited
+            revision, files = self._list_files(repo, session)
+            total = sum(file["size"] for file in files)
+            logger.info(
+                "Downloading Whisper model '%s' (%.0f MB) to %s", model_size, total / 2**20, target
+            )
+            self._update(model_size, state="downloading", done=0, total=total, error=None)
+            done = 0
+            for file in files:
+                done = self._fetch(session, model_size, repo, revision, file, target, done)
+            manifest = {"repo": repo, "revision": revision, "files": files,
+                        "downloaded": time.strftime("%Y-%m-%dT%H:%M:%S%z")}
+            (target / self.MANIFEST).write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+        logger.info("Whisper model '%s' downloaded and verified", model_size)
+        return target
+
+    def _list_files(self, repo: str, session: requests.Session) -> tuple:
+        """Return (commit, [{"name", "size", "sha256", "blob_id"}]) for a model repo."""
+        response = session.get(
+            f"{self.endpoint}/api/models/{repo}/revision/main", params={"blobs": "true"}, timeout=30
+        )
+        if response.status_code != 200:
+            raise ModelDownloadError(f"Hugging Face returned HTTP {response.status_code} for {repo}")
+        info = response.json()
+        files = []
+        for sibling in info.get("siblings", []):
+            name = sibling["rfilename"]
+            if not any(fnmatch(name, pattern) for pattern in MODEL_FILE_PATTERNS):
+                continue
+            lfs = sibling.get("lfs") or {}
+            files.append({
+                "name": name,
+                "size": lfs.get("size", sibling.get("size", 0)),
+                "sha256": lfs.get("sha256"),
+                "blob_id": None if lfs else sibling.get("blobId"),
+            })
+        if not any(file["name"] == "model.bin" for file in files):
+            raise ModelDownloadError(f"{repo} has no model.bin")
+        return info["sha"], files
+
+    def _fetch(self, session: requests.Session, model_size: str, repo: str, revision: str,
+               file: dict, target: Path, done: int) -> int:
+        """Download and verify one file, resuming a .part file; return bytes done."""
+        final = target / file["name"]
+        if final.exists() and self._matches(final, file):
+            self._update(model_size, done=done + file["size"])
+            return done + file["size"]
+        part = final.with_name(final.name + ".part")
+        url = f"{self.endpoint}/{repo}/resolve/{revision}/{quote(file['name'])}"
+        for attempt in (1, 2):
+            offset = part.stat().st_size if part.exists() else 0
+            if offset > file["size"]:
+                part.unlink()
+                offset = 0
+            hasher = self._hasher(file)
+            if offset:
+                logger.info("Resuming %s at %.0f MB", file["name"], offset / 2**20)
+                self._hash_file(part, hasher)
+            if offset < file["size"]:
+                headers = {"Range": f"bytes={offset}-"} if offset else {}
+                with session.get(url, headers=headers, stream=True, timeout=30) as response:
+                    if response.status_code == 200 and offset:
+                        offset = 0  # the server ignored the range; start over
+                        hasher = self._hasher(file)
+                    elif response.status_code not in (200, 206):
+                        raise ModelDownloadError(
+                            f"Downloading {file['name']} failed (HTTP {response.status_code})"
+                        )
+                    with open(part, "ab" if offset else "wb") as out:
+                        received = offset
+                        touched = time.monotonic()
+                        for chunk in response.iter_content(self.CHUNK_BYTES):
+                            out.write(chunk)
+                            hasher.update(chunk)
+                            received += len(chunk)
+                            self._update(model_size, done=done + received)
+                            if time.monotonic() - touched > 10:
+                                # Tell waiting processes this download is alive.
+                                os.utime(target / ".lock")
+                                touched = time.monotonic()
+            if hasher.hexdigest() == (file["sha256"] or file["blob_id"]):
+                os.replace(part, final)
+                return done + file["size"]
+            part.unlink()
+            logger.warning("%s failed its checksum (attempt %d); downloading it again", file["name"], attempt)
+        raise ModelDownloadError(f"{file['name']} of {repo} failed its checksum twice")
+
+    def _matches(self, path: Path, file: dict) -> bool:
+        if path.stat().st_size != file["size"]:
+            return False
+        hasher = self._hasher(file)
+        self._hash_file(path, hasher)
+        return hasher.hexdigest() == (file["sha256"] or file["blob_id"])
+
+    @staticmethod
+    def _hasher(file: dict):
+        if file["sha256"]:
+            return hashlib.sha256()
+        # Small files are checked against their git blob id: SHA-1 of a
+        # "blob <size>\0" header followed by the content.
+        return hashlib.sha1(f"blob {file['size']}\0".encode())
+
+    def _hash_file(self, path: Path, hasher):
+        with open(path, "rb") as source:
+            for chunk in iter(lambda: source.read(self.CHUNK_BYTES), b""):
+                hasher.update(chunk)
+
+    @contextlib.contextmanager
+    def _download_lock(self, target: Path):
+        """Hold target/.lock while downloading so other processes wait their turn.
+
+        The holder refreshes the lock as data arrives; a lock untouched for
+        LOCK_STALE_SECONDS was left by a crashed download and is taken over.
+        """
+        lock_path = target / ".lock"
+        while True:
+            try:
+                os.close(os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                break
+            except FileExistsError:
+                try:
+                    age = time.time() - lock_path.stat().st_mtime
+                except FileNotFoundError:
+                    continue
+                if age > self.LOCK_STALE_SECONDS:
+                    logger.info("Taking over a stale model download lock: %s", lock_path)
+                    lock_path.unlink(missing_ok=True)
+                    continue
+                time.sleep(1)
+        try:
+            yield
+        finally:
+            lock_path.unlink(missing_ok=True)
+
+    def _update(self, model_size: str, **changes):
+        """Record download progress; notify callbacks on a state or percentage change."""
+        with self.lock:
+            entry = self.progress.setdefault(
+                model_size, {"state": "missing", "done": 0, "total": 0, "error": None}
+            )
+            before = (entry["state"], self._percent(entry))
+            entry.update(changes)
+            changed = (entry["state"], self._percent(entry)) != before
+        if changed:
+            for callback in self.callbacks:
+                try:
+                    callback(model_size, dict(entry))
+                except Exception:
+                    pass
+
+    @staticmethod
+    def _percent(entry: dict) -> int:
+        return int(entry["done"] * 100 / entry["total"]) if entry["total"] else 0
@@ -0,0 +1,452 @@
+"""
+MoneyPenny Network Module
+Connection layer for the cloud clients: one event loop thread that owns all
+provider I/O, over a shared keep-alive session whose connections use cached
+DNS answers and race IPv6/IPv4 connects (happy eyeballs), without patching
+socket functions process-wide.
+"""
+
+import asyncio
+import errno
+import functools
+import io
+import logging
+import selectors
+import socket
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError, NewConnectionError
+from urllib3.filepost import encode_multipart_formdata
+
+try:
+    from urllib3.exceptions import NameResolutionError
+except ImportError:  # urllib3 1.x reports resolution failures as NewConnectionError
+    NameResolutionError = None
+
+try:
+    import httpx  # optional: pip install "httpx[http2]" for the HTTP/2 client
+except ImportError:
+    httpx = None
+
+logger = logging.getLogger("moneypenny")
+
+# Connect attempts in progress on Windows report WSAEWOULDBLOCK.
+_CONNECT_PENDING = {0, errno.EINPROGRESS, errno.EWOULDBLOCK, errno.EALREADY, 10035}
+
+
+class DNSCache:
+    """Resolved addresses per (host, port), reused until ttl seconds old.
+
+    The provider hosts are looked up once rather than on every dictation.
+    If a refresh fails, the expired answer is used rather than failing
+    the request.
+    """
+
+    def __init__(self, ttl: float = 300.0):
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.entries = {}  # (host, port) -> (expires, addrinfo list)
+
+    def resolve(self, host: str, port: int) -> list:
+        key = (host, port)
+        with self.lock:
+            cached = self.entries.get(key)
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
+        try:
+            addresses = socket.getaddrinfo(host, port, 0, socket.SOCK_STREAM)
+        except socket.gaierror:
+            if cached:
+                logger.warning("DNS lookup for %s failed; using the last known address", host)
+                return cached[1]
+            raise
+        with self.lock:
+            self.entries[key] = (time.monotonic() + self.ttl, addresses)
+        return addresses
+
+    def prefetch(self, *urls: str):
+        """Resolve the hosts of urls in the background so the first request skips DNS."""
+        def _resolve():
+            for url in urls:
+                parsed = requests.utils.urlparse(url)
+                port = parsed.port or (443 if parsed.scheme == "https" else 80)
+                try:
+                    self.resolve(parsed.hostname, port)
+                except OSError:
+                    logger.info("DNS prefetch for %s failed", parsed.hostname)
+        threading.Thread(target=_resolve, daemon=True).start()
+
+
+DNS_CACHE = DNSCache()
+
+
+def _interleave_families(addresses: list) -> list:
+    """Alternate address families, keeping the resolver's preferred one first."""
+    if not addresses:
+        return []
+    first = [a for a in addresses if a[0] == addresses[0][0]]
+    other = [a for a in addresses if a[0] != addresses[0][0]]
+    ordered = []
+    for pair in zip(first, other):
+        ordered.extend(pair)
+    longer = first if len(first) > len(other) else other
+    return ordered + longer[min(len(first), len(other)):]
+
+
+def happy_eyeballs_connect(addresses: list, timeout: float = None,
+                           attempt_delay: float = 0.25, source_address=None,
+                           socket_options=None) -> socket.socket:
+    """Connect to the first address that answers (RFC 8305 style).
+
+    Attempts start attempt_delay seconds apart, alternating IPv6 and IPv4,
+    and a failed attempt starts the next one immediately. The first
+    connection to complete wins and the rest are closed, so a dead IPv6
+    route costs a quarter second instead of a full connect timeout.
+    """
+    candidates = _interleave_families(addresses)
+    deadline = time.monotonic() + timeout if timeout else None
+    selector = selectors.DefaultSelector()
+    pending = []
+    last_error = None
+    next_start = time.monotonic()
+    try:
+        while candidates or pending:
+            now = time.monotonic()
+            if deadline is not None and now >= deadline:
+                raise socket.timeout("connect timed out")
+            if candidates and (now >= next_start or not pending):
+                family, socktype, proto, _, sockaddr = candidates.pop(0)
+                sock = socket.socket(family, socktype, proto)
+                try:
+                    for option in socket_options or ():
+                        sock.setsockopt(*option)
+                    if source_address:
+                        sock.bind(source_address)
+                    sock.setblocking(False)
+                    result = sock.connect_ex(sockaddr)
+                except OSError as exc:
+                    sock.close()
+                    last_error = exc
+                    continue
+                if result not in _CONNECT_PENDING:
+                    sock.close()
+                    last_error = OSError(result, f"connect to {sockaddr[0]} failed")
+                    continue
+                selector.register(sock, selectors.EVENT_WRITE)
+                pending.append(sock)
+                next_start = now + attempt_delay
+
+            waits = []
+            if candidates:
+                waits.append(max(0.0, next_start - time.monotonic()))
+            if deadline is not None:
+                waits.append(max(0.0, deadline - time.monotonic()))
+            for key, _ in selector.select(min(waits) if waits else None):
+                sock = key.fileobj
+                selector.unregister(sock)
+                pending.remove(sock)
+                error = sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+                if error == 0:
+                    sock.setblocking(True)
+                    sock.settimeout(timeout)
+                    return sock
+                sock.close()
+                last_error = OSError(error, f"connect failed ({error})")
+                next_start = time.monotonic()
+        raise last_error or OSError("no addresses to connect to")
+    finally:
+        for sock in pending:
+            sock.close()
+        selector.close()
+
+
+def _connect_timeout(timeout):
+    # urllib3 passes a sentinel object when no timeout was configured.
+    return timeout if isinstance(timeout, (int, float)) else None
+
+
+class _FastConnectMixin:
+    """urllib3 connection that uses DNS_CACHE and happy_eyeballs_connect."""
+
+    # AF_INET limits connects to IPv4; DNS_CACHE still keeps every family.
+    family = socket.AF_UNSPEC
+
+    def _new_conn(self) -> socket.socket:
+        try:
+            addresses = DNS_CACHE.resolve(self._dns_host, self.port)
+            if self.family != socket.AF_UNSPEC:
+                addresses = [address for address in addresses if address[0] == self.family]
+            return happy_eyeballs_connect(
+                addresses,
+                _connect_timeout(self.timeout),
+                source_address=self.source_address,
+                socket_options=self.socket_options,
+            )
+        except socket.gaierror as exc:
+            if NameResolutionError is not None:
+                raise NameResolutionError(self.host, self, exc) from exc
+            raise NewConnectionError(self, f"Failed to resolve {self.host}: {exc}") from exc
+        except socket.timeout as exc:
+            raise ConnectTimeoutError(
+                self, f"Connection to {self.host} timed out. (connect timeout={self.timeout})"
+            ) from exc
+        except OSError as exc:
+            raise NewConnectionError(self, f"Failed to establish a new connection: {exc}") from exc
+
+
+class _FastHTTPConnection(_FastConnectMixin, HTTPConnection):
+    pass
+
+
+class _FastHTTPSConnection(_FastConnectMixin, HTTPSConnection):
+    pass
+
+
+class _FastHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _FastHTTPConnection
+
+
+class _FastHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _FastHTTPSConnection
+
+
+class _IPv4HTTPConnection(_FastHTTPConnection):
+    family = socket.AF_INET
+
+
+class _IPv4HTTPSConnection(_FastHTTPSConnection):
+    family = socket.AF_INET
+
+
+class _IPv4HTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _IPv4HTTPConnection
+
+
+class _IPv4HTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _IPv4HTTPSConnection
+
+
+class FastConnectAdapter(HTTPAdapter):
+    """requests adapter whose pools connect through the cached, raced path."""
+
+    def __init__(self, *args, ipv4_only: bool = False, **kwargs):
+        self.ipv4_only = ipv4_only
+        super().__init__(*args, **kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        if self.ipv4_only:
+            pools = {"http": _IPv4HTTPConnectionPool, "https": _IPv4HTTPSConnectionPool}
+        else:
+            pools = {"http": _FastHTTPConnectionPool, "https": _FastHTTPSConnectionPool}
+        self.poolmanager.pool_classes_by_scheme = pools
+
+
+def create_session(pool_size: int = 16, ipv4_only: bool = False) -> requests.Session:
+    """A keep-alive session for the cloud providers.
+
+    Reusing one session keeps TLS connections open between dictations, and
+    its adapter removes DNS lookups and stalled address families from the
+    connect path. pool_size covers concurrent requests to one host;
+    ipv4_only connects this session over IPv4 alone.
+    """
+    session = requests.Session()
+    adapter = FastConnectAdapter(pool_connections=4, pool_maxsize=pool_size, ipv4_only=ipv4_only)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+class UploadRate:
+    """Smoothed throughput of request bodies, in bytes per second.
+
+    One estimate is shared by every request and thread on the same
+    connection; until an upload has been timed, default is assumed.
+    """
+
+    def __init__(self, default: float, weight: float = 0.3):
+        self.default = default
+        self.weight = weight
+        self.rate = None
+        self.lock = threading.Lock()
+
+    def observe(self, size: int, seconds: float):
+        """Fold in one body of size bytes that took seconds to send."""
+        rate = size / max(seconds, 1e-3)
+        with self.lock:
+            if self.rate is None:
+                self.rate = rate
+            else:
+                self.rate = (1 - self.weight) * self.rate + self.weight * rate
+
+    def seconds_for(self, size: int) -> float:
+        """Expected time to send size bytes."""
+        with self.lock:
+            return size / (self.rate or self.default)
+
+
+class _SentBody(io.BytesIO):
+    """Request body that calls on_sent once the transport has read all of it.
+
+    urllib3 sends a file-like body block by block and reads again only
+    after the previous block went out, so the final empty read marks the
+    end of the upload rather than the moment the request was built.
+    """
+
+    def __init__(self, body: bytes, on_sent):
+        super().__init__(body)
+        self.on_sent = on_sent
+
+    def read(self, size=-1):
+        data = super().read(size)
+        if not data and self.on_sent is not None:
+            on_sent, self.on_sent = self.on_sent, None
+            on_sent()
+        return data
+
+
+async def _sent_chunks(body: bytes, on_sent, size: int = 64 * 1024):
+    """The httpx counterpart of _SentBody."""
+    for offset in range(0, len(body), size):
+        yield body[offset:offset + size]
+    on_sent()
+
+
+class ProviderIO:
+    """One asyncio event loop thread that owns all cloud provider I/O.
+
+    Provider calls are coroutines on this loop. submit() hands the caller a
+    concurrent.futures.Future it can wait on or cancel (cancelling stops the
+    task in the loop), concurrent uploads are gathered instead of each
+    holding a thread, and retry back-off sleeps in the loop.
+
+    Transport: with http2 enabled and httpx[http2] installed, one
+    AsyncClient carries every request, so transcription and cleanup to the
+    same provider are multiplexed over a single HTTP/2 connection (httpx
+    does its own happy-eyeballs connects). Otherwise each request runs on
+    the keep-alive requests session in a small executor; cancelling such a
+    request abandons its result, but the blocking call runs to completion.
+    """
+
+    def __init__(self, session: requests.Session, max_workers: int = 8):
+        self.session = session
+        self.http2 = False
+        self.client = None
+        self.loop = None
+        self.thread = None
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="provider-io")
+        self.start_lock = threading.Lock()
+
+    def submit(self, coro) -> Future:
+        """Schedule coro on the I/O loop; return a cancellable Future."""
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_loop())
+
+    def run(self, coro):
+        """Run coro on the I/O loop and wait for its result."""
+        future = self.submit(coro)
+        try:
+            return future.result()
+        except BaseException:
+            future.cancel()
+            raise
+
+    async def post(self, url: str, on_sent=None, **kwargs):
+        """POST through the active transport; returns a requests- or httpx-style response.
+
+        With on_sent, the multipart upload (files= and data=) is encoded
+        here and streamed, and on_sent() is called once the whole body has
+        been written, so the caller can time the upload apart from the
+        server's processing.
+        """
+        client = self._http2_client()
+        if on_sent is not None:
+            fields = dict(kwargs.pop("data", None) or {})
+            for name, (filename, file, content_type) in kwargs.pop("files").items():
+                fields[name] = (filename, file.read(), content_type)
+            body, content_type = encode_multipart_formdata(fields)
+            kwargs["headers"] = {
+                **(kwargs.get("headers") or {}),
+                "Content-Type": content_type,
+                "Content-Length": str(len(body)),
+            }
+            if client is not None:
+                kwargs["content"] = _sent_chunks(body, on_sent)
+            else:
+                kwargs["data"] = _SentBody(body, on_sent)
+        if client is not None:
+            return await client.post(url, **kwargs)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.executor, functools.partial(self.session.post, url, **kwargs)
+        )
+
+    def close(self):
+        """Cancel in-flight requests, then stop and close the loop."""
+        loop = self.loop
+        if loop is None:
+            return
+
+        async def _shutdown():
+            tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            if self.client is not None:
+                await self.client.aclose()
+                self.client = None
+
+        try:
+            asyncio.run_coroutine_threadsafe(_shutdown(), loop).result(timeout=5)
+        except Exception:
+            logger.warning("Provider I/O did not shut down cleanly", exc_info=True)
+        loop.call_soon_threadsafe(loop.stop)
+        self.thread.join(timeout=5)
+        if not self.thread.is_alive():
+            loop.close()
+        self.loop = None
+
+    def _http2_client(self):
+        if not self.http2 or httpx is None:
+            return None
+        if self.client is None:
+            try:
+                self.client = httpx.AsyncClient(http2=True)
+            except ImportError:
+                logger.warning("HTTP/2 needs the h2 package (pip install \"httpx[http2]\"); using HTTP/1.1")
+                self.http2 = False
+                return None
+        return self.client
+
+    def _ensure_loop(self):
+        with self.start_lock:
+            if self.loop is None:
+                self.loop = asyncio.new_event_loop()
+                self.thread = threading.Thread(
+                    target=self.loop.run_forever, name="provider-io", daemon=True
+                )
+                self.thread.start()
+            return self.loop
+
+
+def retry_over_ipv4(operation):
+    """Run operation(None); after a network error, run operation(session) once more,
+    with a session that connects over IPv4 only.
+
+    Some networks have a broken IPv6 route to Hugging Face, which resets
+    the SSL connection (WinError 10054) during model downloads. Only the
+    retry's own session is limited to IPv4: nothing is patched process-wide,
+    so provider lookups on other threads (and DNS_CACHE) keep both families
+    while a long download runs.
+    """
+    try:
+        return operation(None)
+    except OSError:
+        logger.warning("Model download failed; retrying over IPv4", exc_info=True)
+    with create_session(pool_size=4, ipv4_only=True) as session:
+        return operation(session)
@@ -0,0 +1,205 @@
+"""
+MoneyPenny Server Module
+Serves the dictation pipeline (transcription, lexicon prompt, and cleanup)
+to other local tools through an OpenAI-compatible HTTP API.
+"""
+
+import json
+import logging
+import threading
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger("moneypenny")
+
+
+class TranscriptionAPIServer:
+    """Localhost HTTP API backed by one warm MoneyPenny pipeline.
+
+    Endpoints:
+      POST /v1/audio/transcriptions  OpenAI-compatible multipart upload
+                                     (file, optional response_format and
+                                     cleanup); other OpenAI fields such as
+                                     model and prompt are accepted and
+                                     ignored in favor of MoneyPenny's
+                                     configured backend and lexicon.
+      POST /v1/cleanup               JSON {"text": ...}; runs TranscriptCleaner.
+      GET  /health                   Liveness check.
+
+    Every request shares the same Transcriber through the batcher, so
+    simultaneous clients queue for one loaded model and bursts are decoded
+    together. At most max_concurrent requests are processed at once; the
+    rest wait up to queue_timeout seconds and are then refused with 503.
+    """
+
+    MAX_UPLOAD_BYTES = 100 * 1024 * 1024
+
+    def __init__(self, batcher, make_cleaner, load_frames, host: str = "127.0.0.1",
+                 port: int = 8765, max_concurrent: int = 4, queue_timeout: float = 30.0):
+        self.batcher = batcher
+        self.make_cleaner = make_cleaner
+        self.load_frames = load_frames
+        self.slots = threading.BoundedSemaphore(max_concurrent) if max_concurrent else None
+        # Requests still decoding their upload; the batcher waits for them.
+        self.preparing = 0
+        self.preparing_lock = threading.Lock()
+        self.queue_timeout = queue_timeout
+        self.httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self.httpd.daemon_threads = True
+
+    @property
+    def address(self) -> tuple:
+        return self.httpd.server_address
+
+    def serve_forever(self):
+        host, port = self.address[:2]
+        logger.info("MoneyPenny API listening on http://%s:%s", host, port)
+        self.httpd.serve_forever()
+
+    def shutdown(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def is_preparing(self) -> bool:
+        """True while another request is about to submit audio (batcher should_wait)."""
+        return self.preparing > 0
+
+    def transcribe(self, audio: bytes, cleanup: bool) -> dict:
+        with self.preparing_lock:
+            self.preparing += 1
+        try:
+            frames = self.load_frames(audio)
+            future = self.batcher.submit(frames)
+        finally:
+            with self.preparing_lock:
+                self.preparing -= 1
+        text, error, decode = future.result()
+        if error:
+            raise RuntimeError(error)
+        result = {"text": text}
+        if cleanup and text:
+            cleaned, used = self.make_cleaner().clean(text)
+            result = {"text": cleaned, "raw": text, "cleanup_used": used}
+        return result
+
+    def cleanup(self, text: str) -> dict:
+        # A cleaner per request keeps last_error private to its caller.
+        cleaner = self.make_cleaner()
+        cleaned, used = cleaner.clean(text)
+        return {"text": cleaned, "cleanup_used": used, "error": cleaner.last_error}
+
+    def _handler_class(self):
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                logger.info("API %s %s", self.address_string(), format % args)
+
+            def do_GET(self):
+                if self.path.rstrip("/") == "/health":
+                    self._send_json(200, {"status": "ok"})
+                else:
+                    self._send_error(404, "Not found")
+
+            def do_POST(self):
+                path = self.path.split("?", 1)[0].rstrip("/")
+                if path not in ("/v1/audio/transcriptions", "/v1/cleanup"):
+                    self._send_error(404, "Not found")
+                    return
+                # Every refusal below leaves the body unread, so the
+                # connection cannot carry another request.
+                length = _content_length(self.headers.get("Content-Length"))
+                if length is None:
+                    self.close_connection = True
+                    self._send_error(400, "Missing or invalid Content-Length")
+                    return
+                if length > api.MAX_UPLOAD_BYTES:
+                    self.close_connection = True
+                    self._send_error(413, "Upload too large")
+                    return
+                # Take a slot before reading, so waiting requests do not
+                # each hold an upload in memory.
+                if api.slots and not api.slots.acquire(timeout=api.queue_timeout):
+                    self.close_connection = True
+                    self._send_error(503, "Server busy; try again shortly")
+                    return
+                try:
+                    body = self.rfile.read(length)
+                    if path == "/v1/cleanup":
+                        self._handle_cleanup(body)
+                    else:
+                        self._handle_transcription(body)
+                except Exception as exc:
+                    logger.exception("API request failed")
+                    self._send_error(502, str(exc) or "Transcription failed")
+                finally:
+                    if api.slots:
+                        api.slots.release()
+
+            def _handle_transcription(self, body: bytes):
+                fields = _parse_multipart(self.headers.get("Content-Type", ""), body)
+                if "file" not in fields:
+                    self._send_error(400, "Missing multipart field 'file'")
+                    return
+                cleanup = fields.get("cleanup", b"").decode().lower() in ("1", "true", "yes")
+                result = api.transcribe(fields["file"], cleanup)
+                if fields.get("response_format", b"json").decode() == "text":
+                    self._send(200, result["text"].encode("utf-8"), "text/plain; charset=utf-8")
+                else:
+                    self._send_json(200, result)
+
+            def _handle_cleanup(self, body: bytes):
+                try:
+                    text = json.loads(body or b"{}").get("text")
+                except (json.JSONDecodeError, AttributeError):
+                    text = None
+                if not isinstance(text, str):
+                    self._send_error(400, 'Expected a JSON body like {"text": "..."}')
+                    return
+                self._send_json(200, api.cleanup(text))
+
+            def _send_error(self, status: int, message: str):
+                self._send_json(status, {"error": {"message": message, "code": status}})
+
+            def _send_json(self, status: int, payload: dict):
+                body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                self._send(status, body, "application/json")
+
+            def _send(self, status: int, body: bytes, content_type: str):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                if self.close_connection:
+                    self.send_header("Connection", "close")
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
+
+
+def _content_length(value):
+    """Content-Length as an int; None if it is missing, negative or not a number."""
+    if value is None or not value.strip().isdigit():
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        return None
+
+
+def _parse_multipart(content_type: str, body: bytes) -> dict:
+    """Return {field name: raw bytes} for a multipart/form-data body."""
+    if not content_type.startswith("multipart/form-data"):
+        return {}
+    message = BytesParser(policy=HTTP).parsebytes(
+        b"Content-Type: " + content_type.encode("latin-1") + b"\r\n\r\n" + body
+    )
+    fields = {}
+    for part in message.iter_parts():
+        name = part.get_param("name", header="content-disposition")
+        if name:
+            fields[name] = part.get_payload(decode=True) or b""
+    return fields
@@ -1,14 +1,77 @@
+import hashlib
 import io
+import asyncio
+import contextlib
 import json
+import logging
+import logging.handlers
+import multiprocessing
+import os
+import random
+import socket
+import sys
 import tempfile
+import threading
+import time
 import unittest
+import wave
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
+from multiprocessing import AuthenticationError, shared_memory
+from multiprocessing.connection import Client, Listener
 from unittest.mock import MagicMock, Mock, patch
 
+import requests
+
+from benchmarks.cleaner_micro import cases as cleaner_cases, make_transcript
+from benchmarks.fake_provider import FakeProvider
+from engine import (
+    EngineDaemonClient,
+    EngineProcess,
+    engine_address,
+    run_engine_daemon,
+    serve_engine,
+)
+from metrics import METRICS, MetricsExporter, MetricsRegistry
+from model_cache import ModelCache, ModelDownloadError
+from network import (
+    DNS_CACHE,
+    DNSCache,
+    ProviderIO,
+    create_session,
+    happy_eyeballs_connect,
+    httpx,
+    retry_over_ipv4,
+)
+from server import TranscriptionAPIServer
+
+import voice_to_text
 from voice_to_text import (
+    CHUNK,
+    LEAD_PAD_CHUNKS,
+    HANDS_FREE_CPU_WARN_PERCENT,
+    MAX_PAUSE_CHUNKS,
+    AudioSpool,
+    CaptureGapDetector,
+    DecodePolicy,
+    DictationProfiler,
+    JsonLogFormatter,
+    Lexicon,
+    LongFormSession,
+    MoneyPennyApp,
+    OfflineQueue,
+    RateLimitTracker,
+    SpeechOnsetDetector,
     TranscriptCleaner,
     TranscriptHistory,
     Transcriber,
+    TranscriptionBatcher,
+    _chunk_peak,
+    enable_json_log,
+    frames_to_flac,
+    load_audio_frames,
     type_text_with_breaks,
 )
 
@@ -20,6 +83,9 @@ class FakeSettings:
     def get(self, key, default=None):
         return self.values.get(key, default)
 
+    def set(self, key, value):
+        self.values[key] = value
+
 
 class TranscriptCleanerTests(unittest.TestCase):
     def setUp(self):
@@ -36,7 +102,7 @@ class TranscriptCleanerTests(unittest.TestCase):
             "choices": [{"message": {"content": '"Working really well."'}}]
         }
 
-        with patch("voice_to_text.requests.post", return_value=response) as post:
+        with patch("voice_to_text.http_session.post", return_value=response) as post:
             text, used = self.cleaner.clean("quote working really well quote period")
 
         self.assertTrue(used)
@@ -52,7 +118,7 @@ class TranscriptCleanerTests(unittest.TestCase):
     def test_http_failure_falls_back_to_raw_transcript(self):
         response = Mock(status_code=429, text="rate limited")
         with (
-            patch("voice_to_text.requests.post", return_value=response),
+            patch("voice_to_text.http_session.post", return_value=response),
             patch("voice_to_text.logger.warning"),
         ):
             text, used = self.cleaner.clean("keep this exact text period")
@@ -67,7 +133,7 @@ class TranscriptCleanerTests(unittest.TestCase):
             "choices": [{"message": {"content": "x" * 1000}}]
         }
         with (
-            patch("voice_to_text.requests.post", return_value=response),
+            patch("voice_to_text.http_session.post", return_value=response),
             patch("voice_to_text.logger.warning"),
         ):
             text, used = self.cleaner.clean("short dictation period")
@@ -77,7 +143,7 @@ class TranscriptCleanerTests(unittest.TestCase):
 
     def test_disabled_cleanup_does_not_call_groq(self):
         cleaner = TranscriptCleaner(FakeSettings(cleanup_mode="off"))
-        with patch("voice_to_text.requests.post") as post:
+        with patch("voice_to_text.http_session.post") as post:
             text, used = cleaner.clean("raw transcript")
 
         post.assert_not_called()
@@ -85,7 +151,7 @@ class TranscriptCleanerTests(unittest.TestCase):
         self.assertEqual(text, "raw transcript")
 
     def test_commands_mode_skips_ordinary_dictation(self):
-        with patch("voice_to_text.requests.post") as post:
+        with patch("voice_to_text.http_session.post") as post:
             text, used = self.cleaner.clean("ordinary speech without a verbal command")
 
         post.assert_not_called()
@@ -112,7 +178,7 @@ class TranscriptCleanerTests(unittest.TestCase):
         self.assertIn("CLEAN: That finishes the list\nNext topic", prompt)
 
     def test_lone_line_break_command_moves_cursor_without_a_model_call(self):
-        with patch("voice_to_text.requests.post") as post:
+        with patch("voice_to_text.http_session.post") as post:
             text, used = self.cleaner.clean("new line")
 
         post.assert_not_called()
@@ -124,7 +190,7 @@ class TranscriptCleanerTests(unittest.TestCase):
         response.json.return_value = {
             "choices": [{"message": {"content": "The next point is about timing."}}]
         }
-        with patch("voice_to_text.requests.post", return_value=response):
+        with patch("voice_to_text.http_session.post", return_value=response):
             text, used = self.cleaner.clean("new line the next point is about timing")
 
         self.assertTrue(used)
@@ -134,14 +200,14 @@ class TranscriptCleanerTests(unittest.TestCase):
         response.json.return_value = {
             "choices": [{"message": {"content": "That finishes the list."}}]
         }
-        with patch("voice_to_text.requests.post", return_value=response):
+        with patch("voice_to_text.http_session.post", return_value=response):
             text, used = self.cleaner.clean("that finishes the list, new paragraph")
 
         self.assertTrue(used)
         self.assertEqual(text, "That finishes the list.\n")
 
     def test_lone_new_paragraph_command_is_a_soft_break(self):
-        with patch("voice_to_text.requests.post") as post:
+        with patch("voice_to_text.http_session.post") as post:
             text, used = self.cleaner.clean("new paragraph")
 
         post.assert_not_called()
@@ -149,7 +215,7 @@ class TranscriptCleanerTests(unittest.TestCase):
         self.assertEqual(text, "\n")
 
     def test_double_new_line_command_stays_soft_breaks(self):
-        with patch("voice_to_text.requests.post") as post:
+        with patch("voice_to_text.http_session.post") as post:
             text, used = self.cleaner.clean("new line new line")
 
         post.assert_not_called()
@@ -163,7 +229,7 @@ class TranscriptCleanerTests(unittest.TestCase):
                 {"message": {"content": "End of section one\n\nSection two begins"}}
             ]
         }
-        with patch("voice_to_text.requests.post", return_value=response):
+        with patch("voice_to_text.http_session.post", return_value=response):
             text, used = self.cleaner.clean(
                 "end of section one new paragraph section two begins"
             )
@@ -176,7 +242,7 @@ class TranscriptCleanerTests(unittest.TestCase):
         response.json.return_value = {
             "choices": [{"message": {"content": "First thought\n\nSecond thought"}}]
         }
-        with patch("voice_to_text.requests.post", return_value=response):
+        with patch("voice_to_text.http_session.post", return_value=response):
             text, used = self.cleaner.clean("first thought new line second thought")
 
         self.assertTrue(used)
@@ -198,13 +264,32 @@ class TranscriptCleanerTests(unittest.TestCase):
         response.json.return_value = {
             "choices": [{"message": {"content": "That finishes the list\nNext topic"}}]
         }
-        with patch("voice_to_text.requests.post", return_value=response):
+        with patch("voice_to_text.http_session.post", return_value=response):
             text, used = self.cleaner.clean("that finishes the list new line next topic")
 
         self.assertTrue(used)
         self.assertEqual(text, "That finishes the list\nNext topic")
 
 
+class CleanerTextProcessingTests(unittest.TestCase):
+    def test_single_pass_helpers_match_the_reference_implementations(self):
+        cleaner = TranscriptCleaner(FakeSettings(cleanup_mode="commands"))
+        pieces = (
+            "comma", "Comma", "new", "line", "New Line", "newline", "paragraph",
+            "quotation", "mark", "full", "stop", " ", "  ", "\t", "\n", "\n\n",
+            ",", ".", ";", '"', "(", "x", "commas", "ß", "İ", "ı",
+        )
+        rng = random.Random(7)
+        samples = [make_transcript(size, seed=size, cues=cues)
+                   for size in (300, 3000) for cues in (True, False)]
+        samples += ["".join(rng.choice(pieces) for _ in range(rng.randint(0, 14)))
+                    for _ in range(3000)]
+
+        for name, (current, reference) in cleaner_cases(cleaner).items():
+            for text in samples:
+                self.assertEqual(current(text), reference(text), (name, text))
+
+
 class TypeTextWithBreaksTests(unittest.TestCase):
     def test_line_breaks_use_shift_enter(self):
         from pynput.keyboard import Key
@@ -253,10 +338,70 @@ class TranscriptHistoryTests(unittest.TestCase):
             self.assertEqual(entries[0]["raw"], "quote hello quote")
             self.assertEqual(entries[0]["final"], '"Hello"')
             self.assertTrue(entries[0]["cleanup_used"])
+            self.assertNotIn("decode", entries[0])
 
             line = path.read_text(encoding="utf-8").strip()
             self.assertEqual(json.loads(line)["provider"], "groq")
 
+    def test_history_records_decode_parameters(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "history.jsonl"
+            history = TranscriptHistory(path)
+            history.add(
+                "raw", "final", "local", "local", 0.4, False,
+                decode={"profile": "short", "beam_size": 1},
+            )
+
+            entries = TranscriptHistory(path).get_entries()
+            self.assertEqual(entries[0]["decode"]["profile"], "short")
+
+    def test_history_keeps_latency_spans_apart_from_decode(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "history.jsonl"
+            history = TranscriptHistory(path)
+            history.add(
+                "raw", "final", "cloud", "groq", 0.5, False,
+                decode={"profile": "short", "spans": {"upload_ms": 310.0}},
+                spans={"queue_ms": 1.5, "total_ms": 420.0},
+            )
+
+            entry = TranscriptHistory(path).get_entries()[0]
+            self.assertEqual(entry["decode"], {"profile": "short"})
+            self.assertEqual(
+                entry["spans"], {"upload_ms": 310.0, "queue_ms": 1.5, "total_ms": 420.0}
+            )
+
+    def test_spans_added_after_typing_are_persisted(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "history.jsonl"
+            history = TranscriptHistory(path)
+            entry = history.add(
+                "raw", "final", "local", "local", 0.5, False, spans={"queue_ms": 1.5},
+            )
+            history.add_spans(entry, {"typing_ms": 40.0, "total_ms": 540.0})
+
+            reloaded = TranscriptHistory(path).get_entries()[0]
+            self.assertEqual(
+                reloaded["spans"], {"queue_ms": 1.5, "typing_ms": 40.0, "total_ms": 540.0}
+            )
+
+    def test_latency_percentiles_cover_the_recent_window_per_stage(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            history = TranscriptHistory(Path(temp_dir) / "history.jsonl")
+            history.add("raw", "old", "local", "local", 9.0, False, spans={"total_ms": 9000.0})
+            for total in range(1, 101):
+                history.add(
+                    "raw", "final", "local", "local", total / 1000, False,
+                    spans={"total_ms": float(total), "decode_ms": 5.0},
+                )
+            history.add("raw", "untimed", "local", "local", 0.1, False)
+
+            summary = history.latency_percentiles()
+
+        self.assertEqual(list(summary), ["total_ms", "decode_ms"])
+        self.assertEqual(summary["total_ms"], {"count": 100, "p50": 50.0, "p95": 95.0, "p99": 99.0})
+        self.assertEqual(summary["decode_ms"]["p99"], 5.0)
+
     def test_clear_removes_persisted_history(self):
         with tempfile.TemporaryDirectory() as temp_dir:
             path = Path(temp_dir) / "history.jsonl"
@@ -268,6 +413,1775 @@ class TranscriptHistoryTests(unittest.TestCase):
             self.assertEqual(path.read_text(encoding="utf-8"), "")
 
 
+class LexiconTests(unittest.TestCase):
+    def _lexicon(self, temp_dir: str, terms) -> Lexicon:
+        path = Path(temp_dir) / "lexicon.txt"
+        path.write_text("# comment\n" + "\n".join(terms) + "\n", encoding="utf-8")
+        return Lexicon(path)
+
+    def test_prompt_is_cached_until_the_file_changes(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            lexicon = self._lexicon(temp_dir, ["Kubernetes", "MoneyPenny"])
+            prompt = lexicon.get_prompt()
+            self.assertIn("Kubernetes, MoneyPenny.", prompt)
+            self.assertIs(lexicon.get_prompt(), prompt)
+
+            lexicon.path.write_text("Terraform\n", encoding="utf-8")
+            os.utime(lexicon.path, ns=(time.time_ns() + 10**9,) * 2)
+
+            self.assertTrue(lexicon.get_prompt().endswith(": Terraform."))
+            self.assertEqual(lexicon.terms, ["Terraform"])
+
+    def test_large_lexicon_fills_the_budget_with_whole_terms(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            terms = [f"Term{index:04d}" for index in range(2000)]
+            lexicon = self._lexicon(temp_dir, terms)
+            prompt = lexicon.get_prompt()
+
+            self.assertLessEqual(len(prompt), Lexicon.PROMPT_MAX_CHARS)
+            listed = prompt[len(Lexicon.PROMPT_PREFIX):-1].split(", ")
+            self.assertEqual(listed, terms[:len(listed)])
+            self.assertGreater(len(listed), 50)
+
+    def test_recently_dictated_and_corrected_terms_are_chosen_first(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            terms = [f"Term{index:04d}" for index in range(2000)] + ["Acme Cloud", "Zed"]
+            lexicon = self._lexicon(temp_dir, terms)
+            now = time.time()
+            lexicon.observe("deploy to zed", "Deploy to Zed.", now - 90 * 86400)
+            lexicon.observe("deploy to zed", "Deploy to Zed.", now - 90 * 86400)
+            lexicon.observe("ask akmi cloud", "Ask Acme Cloud.", now)
+
+            listed = lexicon.get_prompt()[len(Lexicon.PROMPT_PREFIX):-1].split(", ")
+
+            self.assertEqual(listed[:3], ["Acme Cloud", "Zed", "Term0000"])
+            self.assertGreater(lexicon.scores["Acme Cloud"], lexicon.scores["Zed"])
+
+    def test_learns_from_history_and_rescores_after_reload(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            lexicon = self._lexicon(temp_dir, ["Alpha", "Beta"])
+            history = TranscriptHistory(Path(temp_dir) / "history.jsonl")
+            history.add("beta test", "Beta test.", "local", "local", 0.3, False)
+            lexicon.learn(history.get_entries())
+            self.assertTrue(lexicon.get_prompt().endswith(": Beta, Alpha."))
+
+            lexicon.add("Gamma")
+            lexicon.observe("gamma ray", "Gamma ray.")
+
+            self.assertTrue(lexicon.get_prompt().endswith(": Gamma, Beta, Alpha."))
+            self.assertIn("Gamma", Lexicon(lexicon.path).terms)
+
+
+    def test_correct_rewrites_misheard_terms(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            lexicon = self._lexicon(temp_dir, ["MoneyPenny", "Kubernetes", "Acme Cloud", "O'Brien"])
+
+            text, corrections = lexicon.correct("Money penny runs on Kubernetis, per acme clowd and o brien.")
+
+            self.assertEqual(text, "MoneyPenny runs on Kubernetes, per Acme Cloud and O'Brien.")
+            self.assertEqual(corrections, [
+                ("Money penny", "MoneyPenny"), ("Kubernetis", "Kubernetes"),
+                ("acme clowd", "Acme Cloud"), ("o brien", "O'Brien"),
+            ])
+
+    def test_correct_leaves_inflections_common_words_and_distant_spellings(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            lexicon = self._lexicon(temp_dir, ["Skylark", "Go", "Groq", "Kubernetes"])
+            text = "Skylarks sing. I will go home, ask grok, and deploy cube or nets."
+
+            self.assertEqual(lexicon.correct(text), (text, []))
+
+    def test_correct_never_turns_ordinary_words_into_names(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            lexicon = self._lexicon(temp_dir, ["Swift", "Logan", "Stripe", "Parker", "Mason", "Clojure"])
+
+            for text in (
+                "Hold shift.", "Please login.", "The parser failed.", "Strip the whitespace.",
+                "That closure.", "I met a mason.", "Two parsers logged stripes.",
+            ):
+                self.assertEqual(lexicon.correct(text), (text, []), text)
+
+    def test_cleaner_corrects_terms_before_cleanup(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            lexicon = self._lexicon(temp_dir, ["Kubernetes"])
+            settings = FakeSettings(cleanup_mode="off")
+            cleaner = TranscriptCleaner(settings, lexicon)
+
+            self.assertEqual(cleaner.clean("deploy to kubernetis"), ("deploy to Kubernetes", False))
+            settings.set("lexicon_correction", False)
+            self.assertEqual(cleaner.clean("deploy to kubernetis"), ("deploy to kubernetis", False))
+
+
+def _busy_cleanup_step():
+    return sum(index * index for index in range(20000))
+
+
+class DictationProfilerTests(unittest.TestCase):
+    def test_profile_covers_the_requested_dictations_then_stops(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            profiler = DictationProfiler(Path(temp_dir))
+            with profiler.section():
+                _busy_cleanup_step()
+            self.assertIsNone(profiler.dictation_done())
+
+            profiler.start(2)
+            for _ in range(2):
+                with profiler.section():
+                    _busy_cleanup_step()
+                report = profiler.dictation_done()
+
+            self.assertFalse(profiler.active)
+            self.assertTrue(report["path"].exists())
+            self.assertTrue(report["path"].with_suffix(".txt").exists())
+            self.assertLessEqual(len(report["rows"]), DictationProfiler.TOP_N)
+            busy = [row for row in report["rows"] if row["function"].startswith("_busy_cleanup_step")]
+            self.assertEqual(busy[0]["calls"], 2)
+            self.assertEqual(len(list(Path(temp_dir).glob("*.prof"))), 1)
+
+    def test_overlapping_section_runs_unprofiled(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            profiler = DictationProfiler(Path(temp_dir))
+            profiler.start(1)
+            # A second cProfile at once raises on Python 3.12+.
+            with profiler.section():
+                with profiler.section():
+                    _busy_cleanup_step()
+            report = profiler.dictation_done()
+
+        functions = [row["function"] for row in report["rows"]]
+        self.assertTrue(any(name.startswith("_busy_cleanup_step") for name in functions))
+
+
+class LoggingTests(unittest.TestCase):
+    def test_app_logger_only_enqueues_records(self):
+        handlers = voice_to_text.logger.handlers
+        self.assertEqual(len(handlers), 1)
+        self.assertIsInstance(handlers[0], logging.handlers.QueueHandler)
+
+    def test_json_log_keeps_exceptions_logged_through_the_queue(self):
+        listener = voice_to_text._log_listener
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "moneypenny.jsonl"
+            with patch.object(voice_to_text, "JSON_LOG_FILE", path):
+                enable_json_log(True)
+                handlers = listener.handlers
+                # Only the JSON file, so the traceback stays out of the test output.
+                listener.handlers = tuple(
+                    h for h in handlers if isinstance(h.formatter, JsonLogFormatter)
+                )
+                try:
+                    raise ValueError("bad audio")
+                except ValueError:
+                    voice_to_text.logger.exception("Failed: %s", "clip.wav")
+                listener.stop()  # drains the queue
+                listener.handlers = handlers
+                listener.start()
+                enable_json_log(False)
+
+            line = path.read_text(encoding="utf-8").splitlines()[-1]
+        entry = json.loads(line)
+        self.assertEqual(entry["level"], "ERROR")
+        self.assertEqual(entry["message"], "Failed: clip.wav")
+        self.assertIn("ValueError: bad audio", entry["exception"])
+
+    def test_json_log_setting_adds_and_removes_its_file(self):
+        listener = voice_to_text._log_listener
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "moneypenny.jsonl"
+            with patch.object(voice_to_text, "JSON_LOG_FILE", path):
+                enable_json_log(True)
+                enable_json_log(True)
+                self.assertEqual(len(listener.handlers), 3 if sys.stdout is not None else 2)
+                voice_to_text.logger.info("json %s", "check")
+                listener.stop()  # drains the queue
+                listener.start()
+                enable_json_log(False)
+
+            self.assertEqual(json.loads(path.read_text(encoding="utf-8").splitlines()[-1])["message"], "json check")
+        self.assertFalse(any(isinstance(h.formatter, JsonLogFormatter) for h in listener.handlers))
+
+
+class IdleModelUnloadTests(unittest.TestCase):
+    def make_transcriber(self):
+        lexicon = Mock()
+        lexicon.get_prompt.return_value = ""
+        transcriber = Transcriber(FakeSettings(transcription_mode="local"), lexicon)
+        transcriber.model = Mock()
+        transcriber.last_used = time.monotonic() - 120
+        return transcriber
+
+    def test_idle_model_is_unloaded_then_preloaded_on_demand(self):
+        transcriber = self.make_transcriber()
+        reloaded = Mock()
+
+        with patch("voice_to_text.logger.info") as log:
+            self.assertFalse(transcriber.unload_if_idle(300))
+            self.assertTrue(transcriber.unload_if_idle(60))
+        self.assertIsNone(transcriber.model)
+        self.assertTrue(transcriber.idle_unloaded)
+        self.assertIn("memory", log.call_args.args[0] % log.call_args.args[1:])
+
+        with (
+            patch("voice_to_text.WhisperModel", return_value=reloaded) as whisper_model,
+            patch.object(voice_to_text.MODEL_CACHE, "ensure", return_value="/models/tiny.en"),
+        ):
+            transcriber.preload()
+            transcriber.preload()
+            deadline = time.monotonic() + 5
+            while transcriber.model is None and time.monotonic() < deadline:
+                time.sleep(0.01)
+            with transcriber.model_lock:
+                pass
+
+        self.assertIs(transcriber.model, reloaded)
+        self.assertFalse(transcriber.idle_unloaded)
+        whisper_model.assert_called_once()
+
+    def test_model_in_use_is_not_unloaded(self):
+        transcriber = self.make_transcriber()
+        holding = threading.Event()
+        release = threading.Event()
+
+        def decode():
+            with transcriber.model_lock:
+                holding.set()
+                release.wait(2)
+        worker = threading.Thread(target=decode)
+        worker.start()
+        holding.wait(2)
+        try:
+            self.assertFalse(transcriber.unload_if_idle(60))
+        finally:
+            release.set()
+            worker.join()
+        self.assertIsNotNone(transcriber.model)
+
+
+class DecodePolicyTests(unittest.TestCase):
+    def test_short_dense_clip_decodes_greedily_without_vad(self):
+        policy = DecodePolicy(FakeSettings(beam_size=5))
+        decode = policy.choose(1.2, 0.9)
+
+        self.assertEqual(decode["profile"], "short")
+        self.assertEqual(decode["beam_size"], 1)
+        self.assertFalse(decode["vad_filter"])
+
+    def test_short_sparse_clip_keeps_vad(self):
+        decode = DecodePolicy(FakeSettings(beam_size=5)).choose(2.0, 0.2)
+        self.assertTrue(decode["vad_filter"])
+
+    def test_long_clip_caps_beam_and_tightens_vad(self):
+        decode = DecodePolicy(FakeSettings(beam_size=5)).choose(90.0, 0.6)
+
+        self.assertEqual(decode["profile"], "long")
+        self.assertEqual(decode["beam_size"], DecodePolicy.LONG_CLIP_MAX_BEAM)
+        self.assertEqual(decode["vad_parameters"], DecodePolicy.LONG_CLIP_VAD)
+
+    def test_disabled_policy_uses_configured_beam(self):
+        policy = DecodePolicy(FakeSettings(beam_size=3, adaptive_decoding=False))
+        decode = policy.choose(1.0, 1.0)
+
+        self.assertEqual(decode["profile"], "fixed")
+        self.assertEqual(decode["beam_size"], 3)
+        self.assertTrue(decode["vad_filter"])
+
+    def test_local_transcription_records_chosen_parameters(self):
+        settings = FakeSettings(transcription_mode="local", beam_size=5)
+        lexicon = Mock()
+        lexicon.get_prompt.return_value = ""
+        transcriber = Transcriber(settings, lexicon)
+        transcriber.model = Mock()
+        transcriber.model.transcribe.return_value = ([Mock(text=" yes")], None)
+        loud = (b"\x00\x10" * CHUNK)
+        frames = [loud] * 10
+
+        self.assertEqual(transcriber.transcribe(frames), "yes")
+        kwargs = transcriber.model.transcribe.call_args.kwargs
+        self.assertEqual(kwargs["beam_size"], 1)
+        self.assertFalse(kwargs["vad_filter"])
+        self.assertEqual(transcriber.last_decode["profile"], "short")
+        self.assertEqual(transcriber.last_decode["speech_ratio"], 1.0)
+
+
+class SpeechGateTests(unittest.TestCase):
+    def make_transcriber(self, **values):
+        lexicon = Mock()
+        lexicon.get_prompt.return_value = ""
+        settings = FakeSettings(
+            transcription_mode="cloud",
+            cloud_provider="groq",
+            groq_api_key="key",
+            **values,
+        )
+        return Transcriber(settings, lexicon)
+
+    def test_silent_clip_never_reaches_the_network(self):
+        transcriber = self.make_transcriber()
+        quiet = b"\x10\x00" * CHUNK
+        # One loud click among silence is not speech.
+        frames = [quiet] * 8 + [b"\x00\x40" * CHUNK] + [quiet] * 8
+
+        with patch("voice_to_text.http_session.post") as post:
+            result = transcriber.transcribe(frames)
+
+        post.assert_not_called()
+        self.assertEqual(result, "")
+        self.assertIsNone(transcriber.last_error)
+
+    def test_disabled_gate_sends_silence_to_the_backend(self):
+        transcriber = self.make_transcriber(speech_gate=False)
+        response = Mock(status_code=200)
+        response.json.return_value = {"text": ""}
+
+        with patch("voice_to_text.http_session.post", return_value=response) as post:
+            transcriber.transcribe([b"\x00\x00" * CHUNK] * 8)
+
+        post.assert_called_once()
+
+    def test_cloud_dictation_records_stage_spans(self):
+        transcriber = self.make_transcriber()
+        response = Mock(status_code=200, headers={"openai-processing-ms": "120"})
+        response.json.return_value = {"text": "hello"}
+
+        with patch("voice_to_text.http_session.post", return_value=response):
+            self.assertEqual(transcriber.transcribe([b"\x00\x10" * CHUNK] * 10), "hello")
+
+        spans = transcriber.last_decode["spans"]
+        self.assertEqual(set(spans), {"prepare_ms", "encode_ms", "upload_ms", "server_ms"})
+        self.assertEqual(spans["server_ms"], 120.0)
+
+
+class SilenceCompactionTests(unittest.TestCase):
+    def test_leading_silence_and_long_pauses_are_shortened(self):
+        transcriber = Transcriber(FakeSettings(), Mock())
+        silent, loud = b"\x00\x00" * CHUNK, b"\x00\x10" * CHUNK
+        frames = [silent] * 20 + [loud] * 5 + [silent] * 30 + [loud] * 5
+        peaks = [0] * 20 + [4096] * 5 + [0] * 30 + [4096] * 5
+
+        with patch("voice_to_text.logger.info"):
+            kept, kept_peaks = transcriber._compact_silence(frames, peaks)
+
+        self.assertEqual(len(kept), LEAD_PAD_CHUNKS + 5 + MAX_PAUSE_CHUNKS + 5)
+        self.assertEqual(len(kept_peaks), len(kept))
+        self.assertEqual(kept[LEAD_PAD_CHUNKS], loud)
+
+    def test_short_pauses_are_left_alone(self):
+        transcriber = Transcriber(FakeSettings(), Mock())
+        peaks = [4096] * 5 + [0] * MAX_PAUSE_CHUNKS + [4096] * 5
+        frames = [bytes([index]) for index in range(len(peaks))]
+
+        kept, _ = transcriber._compact_silence(frames, peaks)
+        self.assertEqual(kept, frames)
+
+
+class ParallelSplitTests(unittest.TestCase):
+    def make_frames(self, seconds):
+        silent, loud = b"\x00\x00" * CHUNK, b"\x00\x10" * CHUNK
+        # Two seconds of speech followed by a short pause, repeated.
+        pattern = [loud] * 31 + [silent] * 4
+        count = int(seconds * 16000 / CHUNK)
+        frames = (pattern * (count // len(pattern) + 1))[:count]
+        peaks = [4096 if chunk == loud else 0 for chunk in frames]
+        return frames, peaks
+
+    def test_long_dictation_splits_at_silent_chunks(self):
+        transcriber = Transcriber(FakeSettings(parallel_workers=4), Mock())
+        frames, peaks = self.make_frames(120)
+
+        with patch("voice_to_text.logger.info"):
+            segments = transcriber._split_at_silences(frames, peaks)
+
+        limit = int(Transcriber.SPLIT_MAX_SECONDS * 16000 / CHUNK)
+        self.assertGreater(len(segments), 1)
+        self.assertEqual(sum(len(segment) for segment in segments), len(frames))
+        for segment in segments[:-1]:
+            self.assertLessEqual(len(segment), limit)
+            self.assertEqual(segment[-1], b"\x00\x00" * CHUNK)
+
+    def test_short_dictation_and_single_worker_do_not_split(self):
+        frames, peaks = self.make_frames(10)
+        transcriber = Transcriber(FakeSettings(parallel_workers=4), Mock())
+        self.assertEqual(transcriber._split_at_silences(frames, peaks), [frames])
+
+        frames, peaks = self.make_frames(120)
+        transcriber = Transcriber(FakeSettings(parallel_workers=1), Mock())
+        self.assertEqual(transcriber._split_at_silences(frames, peaks), [frames])
+
+    def test_cloud_pieces_are_stitched_in_order(self):
+        lexicon = Mock()
+        lexicon.get_prompt.return_value = ""
+        transcriber = Transcriber(
+            FakeSettings(cloud_provider="groq", groq_api_key="key"), lexicon
+        )
+        buffers = [io.BytesIO(f"piece {index}".encode()) for index in range(5)]
+
+        def respond(url, data, **kwargs):
+            # The audio is the last multipart field.
+            audio = data.read().split(b"\r\n\r\n")[-1].split(b"\r\n--")[0]
+            response = Mock(status_code=200)
+            response.json.return_value = {"text": audio.decode()}
+            return response
+
+        with patch("voice_to_text.http_session.post", side_effect=respond) as post:
+            text = transcriber._transcribe_cloud(buffers)
+
+        self.assertEqual(post.call_count, 5)
+        self.assertEqual(text, "piece 0 piece 1 piece 2 piece 3 piece 4")
+
+
+class BatchedDictationTests(unittest.TestCase):
+    def make_transcriber(self):
+        lexicon = Mock()
+        lexicon.get_prompt.return_value = ""
+        transcriber = Transcriber(FakeSettings(transcription_mode="local"), lexicon)
+        transcriber.model = Mock()
+        return transcriber
+
+    def test_queued_clips_share_one_batched_decode(self):
+        transcriber = self.make_transcriber()
+        loud = b"\x00\x10" * CHUNK
+        clips = [[loud] * 10, [loud] * 20, [loud] * 15]
+        chunk_seconds = CHUNK / 16000
+        segments = [
+            Mock(start=0.0, text=" first"),
+            Mock(start=round(10 * chunk_seconds, 3), text=" second"),
+            Mock(start=round(30 * chunk_seconds, 3), text=" third"),
+        ]
+
+        with (
+            patch("engine.BatchedInferencePipeline") as pipeline,
+            patch("voice_to_text.logger.info"),
+        ):
+            pipeline.return_value.transcribe.return_value = (iter(segments), None)
+            results = transcriber.transcribe_batch(clips)
+
+        pipeline.return_value.transcribe.assert_called_once()
+        kwargs = pipeline.return_value.transcribe.call_args.kwargs
+        self.assertEqual(len(kwargs["clip_timestamps"]), 3)
+        self.assertEqual(kwargs["batch_size"], 3)
+        transcriber.model.transcribe.assert_not_called()
+        self.assertEqual([text for text, _, _ in results], ["first", "second", "third"])
+        self.assertEqual(results[1][2]["batched"], 3)
+        self.assertIn("decode_ms", results[1][2]["spans"])
+        self.assertIn("prepare_ms", results[1][2]["spans"])
+
+    def test_single_queued_clip_keeps_the_direct_path(self):
+        transcriber = self.make_transcriber()
+        transcriber.model.transcribe.return_value = ([Mock(text=" solo")], None)
+
+        with patch("engine.BatchedInferencePipeline") as pipeline:
+            results = transcriber.transcribe_batch([[b"\x00\x10" * CHUNK] * 10])
+
+        pipeline.assert_not_called()
+        self.assertEqual(results[0][0], "solo")
+
+    def test_batcher_drains_clips_waiting_behind_a_decode(self):
+        transcriber = Mock()
+        release = threading.Event()
+        batches = []
+
+        def transcribe_batch(clips):
+            batches.append(clips)
+            release.wait(2)
+            return [(f"text {clip}", None, {}) for clip in clips]
+
+        transcriber.transcribe_batch.side_effect = transcribe_batch
+        batcher = TranscriptionBatcher(transcriber, max_wait=0)
+        first = batcher.submit("a")
+        while not batches:
+            time.sleep(0.005)
+        later = [batcher.submit(clip) for clip in ("b", "c")]
+        # Hold the first decode long enough that b and c's wait survives
+        # batch_wait_ms's 0.1 ms rounding on a fast machine.
+        time.sleep(0.01)
+        release.set()
+
+        self.assertEqual(first.result(2)[0], "text a")
+        self.assertEqual([future.result(2)[0] for future in later], ["text b", "text c"])
+        self.assertEqual(batches, [["a"], ["b", "c"]])
+        # b and c waited for the first decode to finish.
+        self.assertGreaterEqual(later[0].result()[2]["spans"]["batch_wait_ms"], 10)
+
+
+class EngineTests(unittest.TestCase):
+    def test_engine_decodes_audio_passed_through_shared_memory(self):
+        model = Mock()
+        model.transcribe.return_value = ([Mock(text=" from the engine")], None)
+        client, server = multiprocessing.Pipe()
+        worker = threading.Thread(
+            target=serve_engine, args=(server, {"tiny.en": model}), daemon=True
+        )
+        worker.start()
+        block = shared_memory.SharedMemory(create=True, size=4096)
+        try:
+            pcm = (b"\x00\x40" * 1024)
+            block.buf[:len(pcm)] = pcm
+            client.send({
+                "op": "decode",
+                "model_size": "tiny.en",
+                "shm": block.name,
+                "size": len(pcm),
+                "clips": [(0, 1024)],
+                "kwargs": {"beam_size": 1},
+                "batch_size": 1,
+            })
+            reply = client.recv()
+        finally:
+            client.send({"op": "shutdown"})
+            client.recv()
+            block.close()
+            block.unlink()
+
+        self.assertEqual(reply, {"ok": True, "texts": ["from the engine"]})
+        audio = model.transcribe.call_args.args[0]
+        self.assertEqual(len(audio), 1024)
+        self.assertAlmostEqual(float(audio[0]), 0.5)
+
+    def test_engine_reports_errors_instead_of_dying(self):
+        client, server = multiprocessing.Pipe()
+        worker = threading.Thread(target=serve_engine, args=(server, {}), daemon=True)
+        worker.start()
+        with patch("engine.logger.exception"):
+            client.send({"op": "decode", "model_size": "missing"})
+            reply = client.recv()
+        client.send({"op": "ping"})
+
+        self.assertFalse(reply["ok"])
+        self.assertTrue(client.recv()["ok"])
+        client.send({"op": "shutdown"})
+        client.recv()
+
+    def test_unloaded_engine_model_is_reloaded_by_the_next_decode(self):
+        model = Mock()
+        model.transcribe.return_value = ([Mock(text=" again")], None)
+        models = {"tiny.en": Mock()}
+        client, server = multiprocessing.Pipe()
+        threading.Thread(target=serve_engine, args=(server, models), daemon=True).start()
+        block = shared_memory.SharedMemory(create=True, size=4096)
+        try:
+            with patch("engine.logger.info"):
+                client.send({"op": "unload", "model_size": "tiny.en"})
+                self.assertTrue(client.recv()["ok"])
+                self.assertEqual(models, {})
+                with patch("engine.WhisperModel", return_value=model):
+                    client.send({
+                        "op": "decode", "model_size": "tiny.en", "shm": block.name,
+                        "size": 2048, "clips": [(0, 1024)], "kwargs": {}, "batch_size": 1,
+                    })
+                    reply = client.recv()
+        finally:
+            client.send({"op": "shutdown"})
+            client.recv()
+            block.close()
+            block.unlink()
+
+        self.assertEqual(reply, {"ok": True, "texts": ["again"]})
+        self.assertIs(models["tiny.en"], model)
+
+    def test_engine_process_restarts_after_a_crash(self):
+        engine = EngineProcess()
+        try:
+            with patch("engine.logger.info"):
+                engine._start()
+                first_pid = engine.process.pid
+                self.assertTrue(engine._request({"op": "ping"})["ok"])
+                engine.process.kill()
+                engine.process.join(5)
+                self.assertFalse(engine.alive())
+                engine._restart()
+            self.assertEqual(engine._request({"op": "ping"})["pid"], engine.process.pid)
+            self.assertNotEqual(engine.process.pid, first_pid)
+        finally:
+            engine.close()
+
+
+class EngineDaemonTests(unittest.TestCase):
+    def test_models_stay_loaded_across_client_reconnects(self):
+        address = engine_address(f"MoneyPennyTest{os.getpid()}")
+        model = Mock()
+        model.transcribe.return_value = ([Mock(text=" warm")], None)
+        with (
+            patch("engine.WhisperModel", return_value=model) as whisper_model,
+            patch("engine.logger.info"),
+        ):
+            daemon = threading.Thread(
+                target=run_engine_daemon, args=(address, b"secret"), daemon=True
+            )
+            daemon.start()
+            first = EngineDaemonClient(address, b"secret", command=["unused"])
+            deadline = time.monotonic() + 5
+            while True:
+                try:
+                    first.load("tiny.en")
+                    break
+                except OSError:
+                    if time.monotonic() > deadline:
+                        raise
+                    time.sleep(0.05)
+            first.close()
+
+            # A restarted app attaches to the daemon and finds the model warm.
+            second = EngineDaemonClient(address, b"secret", command=["unused"])
+            second.load("tiny.en")
+            texts = second.decode(b"\x00\x10" * 1024, [(0, 1024)], {}, 1)
+            second.shutdown_daemon()
+            second.close()
+            daemon.join(5)
+
+        self.assertEqual(texts, ["warm"])
+        whisper_model.assert_called_once()
+        self.assertFalse(daemon.is_alive())
+
+    def _start_daemon(self, address: str, authkey: bytes) -> threading.Thread:
+        daemon = threading.Thread(target=run_engine_daemon, args=(address, authkey), daemon=True)
+        daemon.start()
+        deadline = time.monotonic() + 5
+        while True:
+            try:
+                Client(address, authkey=authkey).close()
+                return daemon
+            except (OSError, EOFError, AuthenticationError):
+                if time.monotonic() > deadline:
+                    raise
+                time.sleep(0.05)
+
+    def _load_and_stop(self, address: str, authkey: bytes, daemon: threading.Thread):
+        with patch("engine.WhisperModel"):
+            client = EngineDaemonClient(address, authkey, command=["unused"])
+            client.load("tiny.en")
+            client.shutdown_daemon()
+            client.close()
+        daemon.join(5)
+        self.assertFalse(daemon.is_alive())
+
+    def test_one_client_cannot_unload_or_stop_the_daemon_for_another(self):
+        address = engine_address(f"MoneyPennyTestShared{os.getpid()}")
+        model = Mock()
+        model.transcribe.return_value = ([Mock(text=" still here")], None)
+        with patch("engine.logger"), patch("engine.WhisperModel", return_value=model):
+            daemon = self._start_daemon(address, b"secret")
+            first = EngineDaemonClient(address, b"secret", command=["unused"])
+            second = EngineDaemonClient(address, b"secret", command=["unused"])
+            first.load("tiny.en")
+            second.load("tiny.en")
+
+            first.unload()
+            first.shutdown_daemon()
+            first.close()
+            texts = second.decode(b"\x00\x10" * 1024, [(0, 1024)], {}, 1)
+            self.assertTrue(daemon.is_alive())
+
+            second.unload()
+            self.assertEqual(second._request({"op": "ping"})["models"], [])
+            second.shutdown_daemon()
+            second.close()
+            daemon.join(5)
+
+        self.assertEqual(texts, ["still here"])
+        self.assertFalse(daemon.is_alive())
+
+    def test_second_daemon_exits_when_one_is_running(self):
+        address = engine_address(f"MoneyPennyTestTwice{os.getpid()}")
+        with patch("engine.logger") as logger:
+            daemon = self._start_daemon(address, b"secret")
+            second = threading.Thread(target=run_engine_daemon, args=(address, b"secret"))
+            second.start()
+            second.join(5)
+            self.assertFalse(second.is_alive())
+            logger.info.assert_any_call("Engine daemon already running at %s", address)
+            self._load_and_stop(address, b"secret", daemon)
+
+    def test_wrong_key_and_silent_clients_do_not_stop_the_daemon(self):
+        address = engine_address(f"MoneyPennyTestAuth{os.getpid()}")
+        with patch("engine.logger"):
+            daemon = self._start_daemon(address, b"secret")
+            # Connects but never answers the challenge.
+            silent = Client(address)
+            with self.assertRaises(AuthenticationError):
+                Client(address, authkey=b"wrong")
+
+            self._load_and_stop(address, b"secret", daemon)
+            silent.close()
+            time.sleep(0.05)  # let the daemon's thread for it log the reset
+
+    @unittest.skipIf(os.name == "nt", "named pipes have no socket file to replace")
+    def test_daemon_replaces_one_started_with_another_key(self):
+        address = engine_address(f"MoneyPennyTestRekey{os.getpid()}")
+        old = Listener(address, authkey=b"old")
+
+        def refuse():
+            # The old daemon keeps rejecting the new key until it is closed.
+            while True:
+                try:
+                    old.accept().close()
+                except (AuthenticationError, EOFError):
+                    continue
+                except OSError:
+                    return
+
+        threading.Thread(target=refuse, daemon=True).start()
+        with patch("engine.logger"):
+            daemon = self._start_daemon(address, b"new")
+            self._load_and_stop(address, b"new", daemon)
+        with contextlib.suppress(OSError):
+            old.close()
+
+
+class NetworkTests(unittest.TestCase):
+    def listening_socket(self):
+        listener = socket.socket()
+        listener.bind(("127.0.0.1", 0))
+        listener.listen()
+        self.addCleanup(listener.close)
+        return listener.getsockname()
+
+    def test_dns_answers_are_cached_and_survive_a_failed_refresh(self):
+        cache = DNSCache(ttl=60)
+        answer = [(socket.AF_INET, socket.SOCK_STREAM, 6, "", ("192.0.2.7", 443))]
+
+        with patch("network.socket.getaddrinfo", return_value=answer) as lookup:
+            self.assertEqual(cache.resolve("api.example", 443), answer)
+            self.assertEqual(cache.resolve("api.example", 443), answer)
+        lookup.assert_called_once()
+
+        cache.ttl = 0
+        cache.entries.clear()
+        with patch("network.socket.getaddrinfo", return_value=answer):
+            cache.resolve("api.example", 443)
+        with (
+            patch("network.socket.getaddrinfo", side_effect=socket.gaierror("offline")),
+            patch("network.logger.warning"),
+        ):
+            self.assertEqual(cache.resolve("api.example", 443), answer)
+
+    def test_ipv4_retry_uses_its_own_session_and_leaves_the_resolver_alone(self):
+        resolvers = []
+
+        def download(session):
+            resolvers.append(socket.getaddrinfo)
+            if session is None:
+                raise requests.ConnectionError("connection reset over IPv6")
+            return session.get_adapter("https://huggingface.co")
+
+        with patch("network.logger.warning"):
+            adapter = retry_over_ipv4(download)
+
+        self.assertEqual(resolvers, [socket.getaddrinfo, socket.getaddrinfo])
+        v6 = (socket.AF_INET6, socket.SOCK_STREAM, 6, "", ("2001:db8::1", 443, 0, 0))
+        v4 = (socket.AF_INET, socket.SOCK_STREAM, 6, "", ("192.0.2.7", 443))
+        pool = adapter.poolmanager.connection_from_url("https://huggingface.co")
+        with (
+            patch.object(DNS_CACHE, "resolve", return_value=[v6, v4]),
+            patch("network.happy_eyeballs_connect") as connect,
+        ):
+            pool._new_conn()._new_conn()
+
+        self.assertEqual(connect.call_args.args[0], [v4])
+
+    def test_happy_eyeballs_moves_past_dead_addresses(self):
+        closed = socket.socket()
+        closed.bind(("127.0.0.1", 0))
+        dead_address = closed.getsockname()
+        closed.close()
+        stream = (socket.AF_INET, socket.SOCK_STREAM, 6, "")
+        addresses = [
+            stream + (("192.0.2.1", 443),),  # TEST-NET: never answers
+            stream + (dead_address,),  # refused at once
+            stream + (self.listening_socket(),),
+        ]
+
+        started = time.monotonic()
+        sock = happy_eyeballs_connect(addresses, timeout=5, attempt_delay=0.2)
+        elapsed = time.monotonic() - started
+        self.addCleanup(sock.close)
+
+        self.assertEqual(sock.getpeername(), addresses[2][4])
+        self.assertLess(elapsed, 1.0)
+
+    def test_session_reuses_its_connection_between_requests(self):
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        connections = []
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                connections.append(self.client_address)
+
+            def do_GET(self):
+                self.send_response(200)
+                self.send_header("Content-Length", "2")
+                self.end_headers()
+                self.wfile.write(b"ok")
+
+            def log_message(self, *args):
+                pass
+
+        httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=httpd.serve_forever, daemon=True).start()
+        self.addCleanup(httpd.server_close)
+        self.addCleanup(httpd.shutdown)
+        url = f"http://127.0.0.1:{httpd.server_address[1]}/"
+
+        session = create_session()
+        self.addCleanup(session.close)
+        self.assertEqual(session.get(url, timeout=5).text, "ok")
+        self.assertEqual(session.get(url, timeout=5).text, "ok")
+
+        self.assertEqual(len(connections), 1)
+        self.assertIn(("127.0.0.1", httpd.server_address[1]), DNS_CACHE.entries)
+
+
+class ProviderIOTests(unittest.TestCase):
+    def make_io(self, session):
+        provider_io = ProviderIO(session)
+        self.addCleanup(provider_io.close)
+        return provider_io
+
+    def test_close_stops_and_closes_the_loop(self):
+        provider_io = ProviderIO(Mock())
+
+        async def noop():
+            return "ok"
+
+        self.assertEqual(provider_io.run(noop()), "ok")
+        loop, thread = provider_io.loop, provider_io.thread
+        provider_io.close()
+
+        self.assertFalse(thread.is_alive())
+        self.assertTrue(loop.is_closed())
+
+    def test_cancelling_a_future_cancels_its_task_on_the_loop(self):
+        provider_io = self.make_io(Mock())
+        cancelled = threading.Event()
+
+        async def slow():
+            try:
+                await asyncio.sleep(30)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        future = provider_io.submit(slow())
+        time.sleep(0.05)
+        future.cancel()
+
+        self.assertTrue(cancelled.wait(2))
+
+    def test_requests_session_transport_runs_off_the_loop(self):
+        session = Mock()
+        session.post.return_value = Mock(status_code=200)
+        provider_io = self.make_io(session)
+
+        response = provider_io.run(provider_io.post("https://example.invalid", timeout=3))
+
+        self.assertEqual(response.status_code, 200)
+        session.post.assert_called_once_with("https://example.invalid", timeout=3)
+
+    @unittest.skipIf(httpx is None, "httpx is not installed")
+    def test_http2_transport_uses_one_shared_async_client(self):
+        seen = []
+
+        def handler(request):
+            seen.append(request.url.path)
+            return httpx.Response(200, json={"text": "ok"})
+
+        session = Mock()
+        provider_io = self.make_io(session)
+        provider_io.http2 = True
+        provider_io.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+        first = provider_io.run(provider_io.post(
+            "https://api.example/v1/audio/transcriptions",
+            files={"file": ("audio.wav", io.BytesIO(b"RIFF"), "audio/wav")},
+            data={"model": "whisper"},
+        ))
+        second = provider_io.run(provider_io.post(
+            "https://api.example/v1/chat/completions", json={"messages": []}
+        ))
+
+        self.assertEqual((first.json(), second.status_code), ({"text": "ok"}, 200))
+        self.assertEqual(seen, ["/v1/audio/transcriptions", "/v1/chat/completions"])
+        session.post.assert_not_called()
+
+    @unittest.skipIf(httpx is None, "httpx is not installed")
+    def test_http2_upload_reports_when_its_body_was_sent(self):
+        bodies = []
+        sent = threading.Event()
+
+        def handler(request):
+            bodies.append(request.content)
+            return httpx.Response(200, json={"text": "ok"})
+
+        provider_io = self.make_io(Mock())
+        provider_io.http2 = True
+        provider_io.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+        response = provider_io.run(provider_io.post(
+            "https://api.example/v1/audio/transcriptions",
+            files={"file": ("audio.wav", io.BytesIO(b"RIFF"), "audio/wav")},
+            data={"model": "whisper"},
+            on_sent=sent.set,
+        ))
+
+        self.assertEqual(response.json(), {"text": "ok"})
+        self.assertTrue(sent.is_set())
+        self.assertIn(b'name="model"\r\n\r\nwhisper', bodies[0])
+        self.assertIn(b"\r\n\r\nRIFF\r\n", bodies[0])
+
+    def test_stalled_upload_is_hedged_and_the_faster_copy_wins(self):
+        lexicon = Mock()
+        lexicon.get_prompt.return_value = ""
+        transcriber = Transcriber(FakeSettings(cloud_hedge_seconds=0.05), lexicon)
+        calls = []
+
+        def post(*args, **kwargs):
+            calls.append(kwargs["data"].read())
+            if len(calls) == 1:
+                time.sleep(0.5)
+                response = Mock(status_code=200)
+                response.json.return_value = {"text": "slow copy"}
+                return response
+            response = Mock(status_code=200)
+            response.json.return_value = {"text": "fast copy"}
+            return response
+
+        with (
+            patch("voice_to_text.http_session.post", side_effect=post),
+            patch("voice_to_text.logger.info"),
+        ):
+            started = time.monotonic()
+            result = transcriber._cloud_request(
+                io.BytesIO(b"audio"),
+                url="https://example.invalid/transcriptions",
+                api_key="key",
+                model="test-model",
+                extra_headers={},
+                provider_name="Groq",
+            )
+            elapsed = time.monotonic() - started
+
+        self.assertEqual(result, "fast copy")
+        self.assertEqual(len(calls), 2)
+        self.assertTrue(all(b"\r\n\r\naudio\r\n" in body for body in calls))
+        self.assertLess(elapsed, 0.4)
+
+    def test_long_upload_on_a_slow_uplink_is_not_hedged(self):
+        lexicon = Mock()
+        lexicon.get_prompt.return_value = ""
+        transcriber = Transcriber(FakeSettings(cloud_hedge_seconds=0.05), lexicon)
+        transcriber.uploads.rate = 1000  # bytes/s, so 400 bytes should take 0.4 s
+        calls = []
+
+        def post(*args, **kwargs):
+            calls.append(1)
+            while kwargs["data"].read(64):  # the transport sending the body
+                pass
+            time.sleep(0.2)  # server time
+            response = Mock(status_code=200)
+            response.json.return_value = {"text": "only copy"}
+            return response
+
+        with patch("voice_to_text.http_session.post", side_effect=post):
+            result = transcriber._cloud_request(
+                io.BytesIO(b"a" * 400),
+                url="https://example.invalid/transcriptions",
+                api_key="key",
+                model="test-model",
+                extra_headers={},
+                provider_name="Groq",
+            )
+
+        self.assertEqual(result, "only copy")
+        self.assertEqual(len(calls), 1)
+        # Timed to the end of the body, not the answer 0.2 s later (2000 bytes/s).
+        self.assertGreater(transcriber.uploads.rate, 10_000)
+
+
+class FakeProviderTests(unittest.TestCase):
+    def test_cloud_dictation_and_cleanup_run_against_the_fake_provider(self):
+        provider = FakeProvider(latency_ms=20, jitter_ms=0).start()
+        self.addCleanup(provider.shutdown)
+        lexicon = Mock()
+        lexicon.get_prompt.return_value = ""
+        settings = FakeSettings(
+            transcription_mode="cloud",
+            cloud_provider="groq",
+            groq_api_key="key",
+            cleanup_mode="always",
+        )
+
+        with patch.dict(voice_to_text.PROVIDER_API_URLS, provider.api_urls()):
+            transcriber = Transcriber(settings, lexicon)
+            text = transcriber.transcribe([b"\x00\x10" * CHUNK] * 40)
+            cleaned, used = TranscriptCleaner(settings).clean(text)
+
+        self.assertTrue(text.startswith("the quarterly"))
+        self.assertEqual((cleaned, used), (text, True))
+        self.assertGreaterEqual(transcriber.last_decode["spans"]["server_ms"], 20)
+        self.assertEqual(provider.counts, {"transcriptions": 1, "chat": 1, "errors": 0})
+        # The streamed body reported when it was sent.
+        self.assertIsNotNone(transcriber.uploads.rate)
+
+
+class FakeModelHub:
+    """Serves one model repo the way the Hugging Face Hub API does, with Range support."""
+
+    def __init__(self, files: dict, corrupt: str = None):
+        self.files = files
+        self.corrupt = corrupt
+        self.requests = []
+        hub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                hub.requests.append((self.path, self.headers.get("Range")))
+                if self.path.startswith("/api/models/"):
+                    siblings = []
+                    for name, data in hub.files.items():
+                        if name == "model.bin":
+                            siblings.append({"rfilename": name, "size": 134, "lfs": {
+                                "sha256": hashlib.sha256(data).hexdigest(), "size": len(data)}})
+                        else:
+                            blob = hashlib.sha1(f"blob {len(data)}\0".encode() + data).hexdigest()
+                            siblings.append({"rfilename": name, "size": len(data), "blobId": blob})
+                    siblings.append({"rfilename": "README.md", "size": 10, "blobId": "0" * 40})
+                    self._send(200, json.dumps({"sha": "abc123", "siblings": siblings}).encode())
+                    return
+                name = self.path.rsplit("/", 1)[-1]
+                data = hub.files[name]
+                if name == hub.corrupt:
+                    data = b"X" * len(data)
+                start = int(self.headers["Range"][6:-1]) if self.headers.get("Range") else 0
+                self._send(206 if start else 200, data[start:])
+
+            def _send(self, status, body):
+                self.send_response(status)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class ModelCacheTests(unittest.TestCase):
+    FILES = {"config.json": b'{"alignment_heads": []}', "model.bin": bytes(range(256)) * 40,
+             "vocabulary.txt": b"hello\nworld\n"}
+
+    def make_cache(self, corrupt=None):
+        hub = FakeModelHub(self.FILES, corrupt)
+        self.addCleanup(hub.close)
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        cache = ModelCache(Path(temp_dir.name), endpoint=hub.url)
+        patcher = patch.object(ModelCache, "_huggingface_cache_path", return_value=None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return cache, hub
+
+    def test_partial_download_is_resumed_and_verified(self):
+        cache, hub = self.make_cache()
+        target = cache.model_dir("tiny.en")
+        target.mkdir(parents=True)
+        (target / "model.bin.part").write_bytes(self.FILES["model.bin"][:4000])
+        updates = []
+        cache.add_callback(lambda model, entry: updates.append(entry))
+
+        with patch("model_cache.logger.info"):
+            path = Path(cache.ensure("tiny.en"))
+
+        self.assertEqual(path, target)
+        for name, data in self.FILES.items():
+            self.assertEqual((path / name).read_bytes(), data)
+        self.assertFalse(list(path.glob("*.part")))
+        self.assertFalse((path / "README.md").exists())
+        self.assertIn(("/Systran/faster-whisper-tiny.en/resolve/abc123/model.bin", "bytes=4000-"), hub.requests)
+        self.assertEqual(updates[-1]["state"], "ready")
+        self.assertEqual(max(entry["done"] for entry in updates), updates[-1]["total"])
+
+        # A complete model is used without asking the Hub again.
+        requests_made = len(hub.requests)
+        self.assertEqual(cache.ensure("tiny.en"), str(path))
+        self.assertEqual(len(hub.requests), requests_made)
+
+    def test_file_failing_its_checksum_is_discarded(self):
+        cache, hub = self.make_cache(corrupt="config.json")
+
+        with patch("model_cache.logger.info"), patch("model_cache.logger.warning"):
+            with self.assertRaises(ModelDownloadError):
+                cache.ensure("tiny.en")
+
+        target = cache.model_dir("tiny.en")
+        self.assertIsNone(cache.cached_path("tiny.en"))
+        self.assertFalse((target / "config.json").exists())
+        self.assertFalse((target / ".lock").exists())
+
+
+class MetricsTests(unittest.TestCase):
+    def test_registry_renders_prometheus_text(self):
+        registry = MetricsRegistry()
+        registry.counter("dictations_total", "Dictations.")
+        registry.histogram("stage_seconds", "Stages.", buckets=(0.1, 1.0))
+        registry.gauge("memory_bytes", "Memory.", lambda: 2048)
+        registry.gauge("unloaded_bytes", "Skipped while None.", lambda: None)
+        registry.inc("dictations_total", outcome="typed")
+        registry.inc("dictations_total", outcome="typed")
+        for value in (0.05, 0.5, 3.0):
+            registry.observe("stage_seconds", value, stage="upload")
+
+        lines = registry.render().splitlines()
+
+        self.assertIn("# TYPE dictations_total counter", lines)
+        self.assertIn('dictations_total{outcome="typed"} 2', lines)
+        self.assertIn('stage_seconds_bucket{stage="upload",le="0.1"} 1', lines)
+        self.assertIn('stage_seconds_bucket{stage="upload",le="1"} 2', lines)
+        self.assertIn('stage_seconds_bucket{stage="upload",le="+Inf"} 3', lines)
+        self.assertIn('stage_seconds_count{stage="upload"} 3', lines)
+        self.assertIn("memory_bytes 2048", lines)
+        self.assertFalse(any("unloaded_bytes" in line for line in lines))
+
+    def test_exporter_serves_http_and_writes_the_file(self):
+        registry = MetricsRegistry()
+        registry.counter("requests_total", "Requests.")
+        registry.inc("requests_total", 3)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "moneypenny.prom"
+            with socket.socket() as probe:
+                probe.bind(("127.0.0.1", 0))
+                port = probe.getsockname()[1]
+            exporter = MetricsExporter(registry, port=port, path=path, interval=60).start()
+            try:
+                host, port = exporter.address[:2]
+                response = requests.get(f"http://{host}:{port}/metrics", timeout=5)
+                missing = requests.get(f"http://{host}:{port}/other", timeout=5)
+            finally:
+                exporter.stop()
+
+            self.assertEqual(response.status_code, 200)
+            self.assertIn("requests_total 3", response.text)
+            self.assertEqual(missing.status_code, 404)
+            self.assertIn("requests_total 3", path.read_text(encoding="utf-8"))
+
+    def test_capture_gap_detector_reports_dropped_input_only(self):
+        step = CHUNK / 16000
+        gaps = CaptureGapDetector()
+        gaps.reset(now=0.0)
+        now = 0.1  # first read arrives after the stream's own latency
+        self.assertEqual(gaps.update(CHUNK, 0, now=now), 0.0)
+        for _ in range(20):
+            now += step
+            self.assertEqual(gaps.update(CHUNK, 0, now=now), 0.0)
+
+        # A stall the stream buffered: reads catch up without losing input.
+        now += 7 * step
+        for backlog in range(6, -1, -1):
+            self.assertEqual(gaps.update(CHUNK, backlog * CHUNK, now=now), 0.0)
+
+        # A stall longer than the buffer: a second of audio never arrives.
+        now += 1.0 + step
+        self.assertAlmostEqual(gaps.update(CHUNK, 0, now=now), 1.0, places=2)
+
+
+class TranscriptionAPIServerTests(unittest.TestCase):
+    def start_server(self, batcher, **kwargs):
+        api = TranscriptionAPIServer(
+            batcher,
+            make_cleaner=lambda: TranscriptCleaner(
+                FakeSettings(cleanup_mode="always", groq_api_key="key")
+            ),
+            load_frames=load_audio_frames,
+            port=0,
+            **kwargs,
+        )
+        threading.Thread(target=api.serve_forever, daemon=True).start()
+        self.addCleanup(api.shutdown)
+        self.api = api
+        host, port = api.address[:2]
+        return f"http://{host}:{port}"
+
+    def make_wav(self, seconds=1.0):
+        buffer = io.BytesIO()
+        with wave.open(buffer, "wb") as wav_file:
+            wav_file.setnchannels(1)
+            wav_file.setsampwidth(2)
+            wav_file.setframerate(16000)
+            wav_file.writeframes(b"\x00\x10" * int(16000 * seconds))
+        return buffer.getvalue()
+
+    def test_openai_compatible_transcription_upload(self):
+        batcher = Mock()
+        future = Future()
+        future.set_result(("hello from the server", None, {}))
+        batcher.submit.return_value = future
+
+        with patch("server.logger.info"):
+            url = self.start_server(batcher)
+            response = requests.post(
+                url + "/v1/audio/transcriptions",
+                files={"file": ("clip.wav", self.make_wav(), "audio/wav")},
+                data={"model": "whisper-1"},
+                timeout=5,
+            )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"text": "hello from the server"})
+        frames = batcher.submit.call_args.args[0]
+        self.assertEqual(sum(len(chunk) for chunk in frames), 32000)
+        self.assertEqual(len(frames[0]), CHUNK * 2)
+
+    def test_transcription_errors_are_reported_as_json(self):
+        batcher = Mock()
+        future = Future()
+        future.set_result(("", "Local transcription failed.", {}))
+        batcher.submit.return_value = future
+
+        with patch("server.logger.info"), patch("server.logger.exception"):
+            url = self.start_server(batcher)
+            response = requests.post(
+                url + "/v1/audio/transcriptions",
+                files={"file": ("clip.wav", self.make_wav(), "audio/wav")},
+                timeout=5,
+            )
+
+        self.assertEqual(response.status_code, 502)
+        self.assertIn("Local transcription failed", response.json()["error"]["message"])
+
+    def test_cleanup_endpoint_runs_the_cleaner(self):
+        cleaned = Mock(status_code=200)
+        cleaned.json.return_value = {"choices": [{"message": {"content": "Hello."}}]}
+
+        with (
+            patch("server.logger.info"),
+            patch("voice_to_text.http_session.post", return_value=cleaned),
+        ):
+            url = self.start_server(Mock())
+            response = requests.post(
+                url + "/v1/cleanup", json={"text": "hello period"}, timeout=5
+            )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["text"], "Hello.")
+        self.assertTrue(response.json()["cleanup_used"])
+
+    def test_busy_server_refuses_after_the_queue_timeout(self):
+        with patch("server.logger.info"):
+            url = self.start_server(Mock(), max_concurrent=1, queue_timeout=0.05)
+            # Hold the only slot, as a long transcription would.
+            self.api.slots.acquire()
+            self.addCleanup(self.api.slots.release)
+            response = requests.post(
+                url + "/v1/cleanup", json={"text": "hello"}, timeout=5
+            )
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.json()["error"]["code"], 503)
+
+
+    def raw_post(self, url: str, headers: str) -> bytes:
+        """Send a bodiless POST; return everything read until the server closes."""
+        host, port = url.rsplit("/", 1)[1].split(":")
+        with socket.create_connection((host, int(port)), timeout=5) as sock:
+            sock.sendall(
+                f"POST /v1/cleanup HTTP/1.1\r\nHost: {host}\r\n{headers}\r\n".encode()
+            )
+            reply = b""
+            while chunk := sock.recv(4096):
+                reply += chunk
+        return reply
+
+    def test_bad_content_length_is_refused_and_the_connection_closed(self):
+        with patch("server.logger.info"):
+            url = self.start_server(Mock())
+            for headers in ("", "Content-Length: -5\r\n", "Content-Length: lots\r\n"):
+                reply = self.raw_post(url, headers)
+                self.assertTrue(reply.startswith(b"HTTP/1.1 400"), (headers, reply))
+                self.assertIn(b"Connection: close", reply)
+
+            reply = self.raw_post(url, f"Content-Length: {self.api.MAX_UPLOAD_BYTES + 1}\r\n")
+        self.assertTrue(reply.startswith(b"HTTP/1.1 413"), reply)
+        self.assertIn(b"Connection: close", reply)
+
+    def test_waiting_request_does_not_read_its_body(self):
+        with patch("server.logger.info"):
+            url = self.start_server(Mock(), max_concurrent=1, queue_timeout=0.05)
+            self.api.slots.acquire()
+            self.addCleanup(self.api.slots.release)
+            # The body is never sent: a request that read before queuing would hang.
+            reply = self.raw_post(url, "Content-Length: 1000\r\n")
+
+        self.assertTrue(reply.startswith(b"HTTP/1.1 503"), reply)
+        self.assertIn(b"Connection: close", reply)
+
+
+class SpeechOnsetDetectorTests(unittest.TestCase):
+    def feed(self, detector, peaks):
+        return [event for event in map(detector.update, peaks) if event]
+
+    def test_speech_starts_after_a_short_loud_run_and_stops_after_silence(self):
+        detector = SpeechOnsetDetector(silence_seconds=0.5)
+        silence_chunks = detector.silence_chunks
+
+        self.assertEqual(self.feed(detector, [100] * 50 + [4000, 100, 4000]), [])
+        self.assertEqual(self.feed(detector, [4000] * 3), ["start"])
+        self.assertEqual(self.feed(detector, [100] * (silence_chunks - 1) + [4000]), [])
+        self.assertEqual(self.feed(detector, [100] * silence_chunks), ["stop"])
+
+    def test_steady_background_noise_raises_the_threshold(self):
+        detector = SpeechOnsetDetector()
+
+        self.assertEqual(self.feed(detector, [450] * 200), [])
+        self.assertEqual(self.feed(detector, [800] * 10), [])
+        self.assertEqual(self.feed(detector, [3000] * 3), ["start"])
+
+    def test_listening_cost_per_chunk_stays_under_the_cpu_warning(self):
+        detector = SpeechOnsetDetector()
+        chunk = b"\x10\x00" * CHUNK
+        count = 2000
+
+        started = time.thread_time()
+        for _ in range(count):
+            detector.update(_chunk_peak(chunk))
+        per_chunk = (time.thread_time() - started) / count
+
+        # Each chunk is 64 ms of audio.
+        chunk_seconds = CHUNK / 16000
+        self.assertLess(per_chunk / chunk_seconds * 100, HANDS_FREE_CPU_WARN_PERCENT)
+
+
+class RateLimitTests(unittest.TestCase):
+    def groq_headers(self, remaining_requests, remaining_tokens=6000, **extra):
+        headers = {
+            "x-ratelimit-limit-requests": "100",
+            "x-ratelimit-remaining-requests": str(remaining_requests),
+            "x-ratelimit-reset-requests": "1m30s",
+            "x-ratelimit-limit-tokens": "6000",
+            "x-ratelimit-remaining-tokens": str(remaining_tokens),
+            "x-ratelimit-reset-tokens": "450ms",
+        }
+        headers.update(extra)
+        return headers
+
+    def test_low_quota_is_kept_for_dictation(self):
+        limits = RateLimitTracker()
+        limits.observe("groq:model", self.groq_headers(remaining_requests=5))
+
+        self.assertEqual(limits.wait_seconds("groq:model", "dictation", {"requests": 1}), 0)
+        cleanup_wait = limits.wait_seconds("groq:model", "cleanup", {"requests": 1})
+        # Six more requests are needed above the reserve; 95 refill over 90 s.
+        self.assertAlmostEqual(cleanup_wait, 6 / (95 / 90), places=2)
+        self.assertEqual(limits.wait_seconds("unknown", "background", {"requests": 1}), 0)
+
+    def test_local_reservations_and_retry_after_block_the_key(self):
+        limits = RateLimitTracker()
+        limits.observe("groq:model", self.groq_headers(remaining_requests=1))
+        limits.reserve("groq:model", {"requests": 1})
+        self.assertGreater(limits.wait_seconds("groq:model", "dictation", {"requests": 1}), 0)
+
+        limits.observe("other", {"retry-after": "12"})
+        self.assertGreater(limits.wait_seconds("other", "dictation", {"requests": 1}), 11)
+
+    def test_cloud_dictation_goes_local_before_the_quota_runs_out(self):
+        limits = RateLimitTracker()
+        limits.observe("groq:whisper-large-v3-turbo", self.groq_headers(remaining_requests=0))
+        lexicon = Mock()
+        lexicon.get_prompt.return_value = ""
+        transcriber = Transcriber(
+            FakeSettings(transcription_mode="cloud", cloud_provider="groq", groq_api_key="key"),
+            lexicon,
+        )
+        transcriber.model = Mock()
+        transcriber.model.transcribe.return_value = ([Mock(text=" local words")], None)
+
+        with (
+            patch("voice_to_text.RATE_LIMITS", limits),
+            patch("voice_to_text.http_session.post") as post,
+            patch("voice_to_text.logger.info"),
+        ):
+            text = transcriber.transcribe([b"\x00\x10" * CHUNK] * 10)
+
+        self.assertEqual(text, "local words")
+        post.assert_not_called()
+        self.assertEqual(transcriber.last_decode["routed"], "local (rate limit)")
+
+    def test_low_quota_warms_the_local_model_instead_of_loading_it_inline(self):
+        limits = RateLimitTracker()
+        limits.observe("groq:whisper-large-v3-turbo", self.groq_headers(remaining_requests=0))
+        lexicon = Mock()
+        lexicon.get_prompt.return_value = ""
+        transcriber = Transcriber(
+            FakeSettings(transcription_mode="cloud", cloud_provider="groq", groq_api_key="key"),
+            lexicon,
+        )
+        loaded = threading.Event()
+        response = Mock(status_code=200, headers={})
+        response.json.return_value = {"text": "cloud words"}
+
+        with (
+            patch("voice_to_text.RATE_LIMITS", limits),
+            patch("voice_to_text.http_session.post", return_value=response),
+            patch.object(transcriber, "load_model", side_effect=loaded.set),
+            patch("voice_to_text.logger.info"),
+        ):
+            text = transcriber.transcribe([b"\x00\x10" * CHUNK] * 10)
+            self.assertTrue(loaded.wait(2))
+
+        self.assertEqual(text, "cloud words")
+        self.assertNotIn("routed", transcriber.last_decode)
+
+    def test_cleanup_is_skipped_when_it_would_eat_the_reserve(self):
+        limits = RateLimitTracker()
+        limits.observe(
+            "groq:llama-3.1-8b-instant",
+            self.groq_headers(remaining_requests=50, remaining_tokens=200),
+        )
+        cleaner = TranscriptCleaner(
+            FakeSettings(
+                cleanup_mode="always",
+                groq_api_key="key",
+                cleanup_model="llama-3.1-8b-instant",
+            )
+        )
+
+        with (
+            patch("voice_to_text.RATE_LIMITS", limits),
+            patch("voice_to_text.http_session.post") as post,
+            patch("voice_to_text.logger.info"),
+        ):
+            result = cleaner.clean("hello comma world")
+
+        self.assertEqual(result, ("hello comma world", False))
+        post.assert_not_called()
+        self.assertIn("rate limit", cleaner.last_error)
+
+
+class OfflineQueueTests(unittest.TestCase):
+    loud = b"\x00\x10" * CHUNK
+
+    def make_queue(self, results):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        batcher = Mock()
+
+        def submit(frames):
+            future = Future()
+            future.set_result(results.pop(0))
+            return future
+
+        batcher.submit.side_effect = submit
+        batcher.transcriber.cloud_wait_seconds.return_value = 0.0
+        recovered = []
+        queue = OfflineQueue(
+            batcher,
+            lambda text, decode, recorded_at: recovered.append((text, recorded_at)),
+            directory=Path(temp_dir.name),
+            group_size=2,
+        )
+        return queue, recovered
+
+    def test_saved_audio_is_compressed_and_lossless(self):
+        frames = [bytes(range(256)) * 8] * 20
+
+        flac = frames_to_flac(frames)
+
+        self.assertLess(len(flac), len(b"".join(frames)))
+        self.assertEqual(b"".join(load_audio_frames(flac)), b"".join(frames))
+
+    def test_failed_probe_keeps_every_saved_dictation(self):
+        queue, recovered = self.make_queue([("", "Groq connection failed.", {})])
+        with patch("voice_to_text.logger.info"):
+            queue.add([self.loud] * 4)
+            queue.add([self.loud] * 4)
+
+            self.assertFalse(queue.drain())
+
+        self.assertEqual(len(queue.pending()), 2)
+        self.assertEqual(recovered, [])
+
+    def test_drain_recovers_dictations_oldest_first_and_deletes_them(self):
+        queue, recovered = self.make_queue(
+            [("first", None, {}), ("second", None, {}), ("third", None, {})]
+        )
+        with patch("voice_to_text.logger.info"):
+            for _ in range(3):
+                queue.add([self.loud] * 4)
+
+            self.assertTrue(queue.drain())
+
+        self.assertEqual([text for text, _ in recovered], ["first", "second", "third"])
+        self.assertLessEqual(recovered[0][1], recovered[2][1])
+        self.assertEqual(queue.pending(), [])
+
+    def test_unreadable_files_are_set_aside_and_the_rest_still_drain(self):
+        queue, recovered = self.make_queue([("good", None, {}), ("later", None, {})])
+        with patch("voice_to_text.logger.info"), patch("voice_to_text.logger.warning"):
+            queue.add([self.loud] * 4)
+            queue.directory.joinpath("00000000-000000-000000.flac").write_bytes(b"truncated")
+            queue.directory.joinpath("not-a-timestamp.flac").write_bytes(
+                frames_to_flac([self.loud] * 4)
+            )
+            queue.add([self.loud] * 4)
+
+            self.assertTrue(queue.drain())
+
+        self.assertEqual([text for text, _ in recovered], ["good", "later"])
+        self.assertEqual(queue.pending(), [])
+        self.assertEqual(
+            sorted(path.name for path in (queue.directory / "failed").iterdir()),
+            ["00000000-000000-000000.flac", "not-a-timestamp.flac"],
+        )
+
+    def test_a_failing_result_handler_does_not_stall_the_queue(self):
+        queue, recovered = self.make_queue([("first", None, {}), ("second", None, {})])
+        deliver = queue.on_result
+        calls = []
+
+        def on_result(text, decode, recorded_at):
+            calls.append(text)
+            if len(calls) == 1:
+                raise RuntimeError("history file locked")
+            deliver(text, decode, recorded_at)
+
+        queue.on_result = on_result
+        with patch("voice_to_text.logger.info"), patch("voice_to_text.logger.warning"), \
+                patch("voice_to_text.logger.exception"):
+            queue.add([self.loud] * 4)
+            queue.add([self.loud] * 4)
+
+            self.assertTrue(queue.drain())
+
+        self.assertEqual([text for text, _ in recovered], ["second"])
+        self.assertEqual(queue.pending(), [])
+        self.assertEqual(len(list((queue.directory / "failed").iterdir())), 1)
+
+    def failed_dictation(self, status_code):
+        """Run a Cloud dictation whose upload gets status_code; return the app."""
+        settings = FakeSettings(transcription_mode="cloud", cloud_provider="groq", groq_api_key="key")
+        lexicon = Mock()
+        lexicon.get_prompt.return_value = ""
+        transcriber = Transcriber(settings, lexicon)
+        response = Mock(status_code=status_code, headers={}, text="error")
+        with (
+            patch("voice_to_text.http_session.post", return_value=response),
+            patch.object(Transcriber, "RETRY_DELAY_SECONDS", 0),
+            patch("voice_to_text.logger"),
+        ):
+            text = transcriber.transcribe([self.loud] * 10)
+        future = Future()
+        future.set_result((text, transcriber.last_error, transcriber.last_decode))
+
+        app = MoneyPennyApp.__new__(MoneyPennyApp)
+        app.settings = settings
+        app.offline_queue = Mock()
+        app.status_callbacks = []
+        now = time.perf_counter()
+        with patch("voice_to_text.logger"):
+            app._transcribe_and_type_locked([self.loud] * 10, future, {"released": now, "queued": now})
+        return app
+
+    def test_rejected_key_is_reported_not_queued(self):
+        app = self.failed_dictation(401)
+
+        app.offline_queue.add.assert_not_called()
+
+    def test_provider_outage_is_queued_for_later(self):
+        app = self.failed_dictation(503)
+
+        app.offline_queue.add.assert_called_once()
+
+    def test_cloud_batches_are_sent_concurrently_with_separate_results(self):
+        lexicon = Mock()
+        lexicon.get_prompt.return_value = ""
+        transcriber = Transcriber(
+            FakeSettings(transcription_mode="cloud", cloud_provider="groq", groq_api_key="key"),
+            lexicon,
+        )
+        in_flight = []
+        peak = []
+
+        def post(*args, **kwargs):
+            in_flight.append(1)
+            peak.append(len(in_flight))
+            while kwargs["data"].read(4096):
+                pass
+            time.sleep(0.05)
+            in_flight.pop()
+            response = Mock(status_code=200)
+            response.json.return_value = {"text": "ok"}
+            return response
+
+        with patch("voice_to_text.http_session.post", side_effect=post):
+            results = transcriber.transcribe_batch([[self.loud] * 10, [self.loud] * 12])
+
+        self.assertEqual([text for text, _, _ in results], ["ok", "ok"])
+        self.assertGreater(max(peak), 1)
+        self.assertIsNot(results[0][2], results[1][2])
+        self.assertEqual(results[1][2]["audio_seconds"], round(12 * CHUNK / 16000, 2))
+        # Every clip's upload fed the one shared estimate.
+        self.assertIsNotNone(transcriber.uploads.rate)
+
+
+class LongFormSessionTests(unittest.TestCase):
+    loud = b"\x00\x10" * CHUNK
+    quiet = b"\x00\x00" * CHUNK
+
+    def test_spool_grows_past_its_first_block_and_reads_back_chunks(self):
+        spool = AudioSpool()
+        self.addCleanup(spool.close)
+        data = bytes(range(256)) * (AudioSpool.BLOCK_BYTES // 256 + 40)
+
+        end = spool.append(data)
+
+        self.assertEqual(end, len(data))
+        self.assertGreater(spool.size, AudioSpool.BLOCK_BYTES)
+        frames = spool.read_frames(100, end)
+        self.assertEqual(len(frames[0]), CHUNK * 2)
+        self.assertEqual(b"".join(frames), data[100:])
+
+    def test_segments_are_cut_at_pauses_after_the_target_length(self):
+        segments = []
+        session = LongFormSession(segments.append, target_seconds=1.0, max_seconds=5.0)
+        speech = [self.loud] * 20 + [self.quiet] * MAX_PAUSE_CHUNKS
+        for chunk in speech + [self.loud] * 6:
+            session.append(chunk)
+        self.assertEqual(len(segments), 1)
+        self.assertEqual(len(segments[0]), 20 + MAX_PAUSE_CHUNKS // 2)
+
+        session.finish()
+
+        self.assertEqual(len(segments), 2)
+        self.assertEqual(b"".join(segments[0] + segments[1]), b"".join(speech + [self.loud] * 6))
+
+    def test_unbroken_speech_is_cut_at_the_limit_and_memory_stays_bounded(self):
+        segments = []
+        session = LongFormSession(
+            lambda frames: segments.append(len(frames)), target_seconds=1.0, max_seconds=2.0
+        )
+        max_chunks = int(2.0 * 16000 / CHUNK)
+        most_pending = 0
+        for _ in range(10 * max_chunks):
+            session.append(self.loud)
+            most_pending = max(most_pending, len(session.peaks))
+        session.finish()
+
+        self.assertLessEqual(most_pending, max_chunks)
+        self.assertEqual(sum(segments), 10 * max_chunks)
+        self.assertTrue(all(count <= max_chunks for count in segments))
+
+
+class BatchFileTranscriptionTests(unittest.TestCase):
+    def write_wav(self, path, seconds=1.0):
+        with wave.open(str(path), "wb") as wav_file:
+            wav_file.setnchannels(1)
+            wav_file.setsampwidth(2)
+            wav_file.setframerate(16000)
+            wav_file.writeframes(b"\x00\x10" * int(16000 * seconds))
+
+    def test_cloud_batch_writes_one_timed_record_per_audio_file(self):
+        settings = FakeSettings(
+            transcription_mode="cloud",
+            cloud_provider="groq",
+            groq_api_key="key",
+            cleanup_mode="off",
+        )
+        response = Mock(status_code=200)
+        response.json.return_value = {"text": "voicemail text"}
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            folder = Path(temp_dir)
+            self.write_wav(folder / "first.wav")
+            (folder / "nested").mkdir()
+            self.write_wav(folder / "nested" / "second.WAV", seconds=2.0)
+            (folder / "notes.txt").write_text("not audio")
+            broken = folder / "broken.flac"
+            broken.write_bytes(b"not really flac")
+            output = folder / "out.jsonl"
+
+            with (
+                patch("voice_to_text.Settings", return_value=settings),
+                patch("voice_to_text.Lexicon") as lexicon,
+                patch("voice_to_text.http_session.post", return_value=response),
+                patch("voice_to_text.logger.info"),
+                patch("voice_to_text.Transcriber", wraps=Transcriber) as transcriber,
+            ):
+                lexicon.return_value.get_prompt.return_value = ""
+                summary = voice_to_text.transcribe_files(folder, output, workers=2)
+
+            records = {
+                Path(record["file"]).name: record
+                for record in map(json.loads, output.read_text().splitlines())
+            }
+
+        self.assertEqual(set(records), {"first.wav", "second.WAV", "broken.flac"})
+        self.assertEqual(records["first.wav"]["text"], "voicemail text")
+        self.assertEqual(records["second.WAV"]["audio_seconds"], 2.0)
+        self.assertIn("transcribe_ms", records["first.wav"]["timings"])
+        self.assertIn("Could not read audio", records["broken.flac"]["error"])
+        self.assertEqual(summary["files"], 3)
+        self.assertEqual(summary["failed"], 1)
+        self.assertEqual(summary["workers"], 2)
+        # One Transcriber serves every upload instead of one per worker thread.
+        transcriber.assert_called_once()
+
+    def test_crashed_local_worker_keeps_finished_records(self):
+        class CrashingPool:
+            def __init__(self, **kwargs):
+                pass
+
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc_info):
+                return False
+
+            def submit(self, function, path, cleanup):
+                future = Future()
+                if "crash" in path:
+                    future.set_exception(BrokenProcessPool("worker died"))
+                else:
+                    future.set_result({
+                        "file": path, "text": "done", "error": None, "audio_seconds": 1.0,
+                    })
+                return future
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            folder = Path(temp_dir)
+            self.write_wav(folder / "a.wav")
+            self.write_wav(folder / "crash.wav")
+            output = folder / "out.jsonl"
+
+            with (
+                patch("voice_to_text.Settings", return_value=FakeSettings(transcription_mode="local")),
+                patch("voice_to_text.ProcessPoolExecutor", CrashingPool),
+                patch("voice_to_text.logger.info"),
+            ):
+                summary = voice_to_text.transcribe_files(folder, output, workers=2)
+
+            records = {
+                Path(record["file"]).name: record
+                for record in map(json.loads, output.read_text().splitlines())
+            }
+
+        self.assertEqual(records["a.wav"]["text"], "done")
+        self.assertIn("worker crashed", records["crash.wav"]["error"])
+        self.assertEqual(summary["files"], 2)
+        self.assertEqual(summary["failed"], 1)
+
+
 class CloudTranscriptionErrorTests(unittest.TestCase):
     def test_rejected_api_key_is_exposed_to_the_app(self):
         settings = Mock()
@@ -277,7 +2191,7 @@ class CloudTranscriptionErrorTests(unittest.TestCase):
         response = Mock(status_code=401, text='{"error":"invalid key"}')
 
         with (
-            patch("voice_to_text.requests.post", return_value=response),
+            patch("voice_to_text.http_session.post", return_value=response),
             patch("voice_to_text.logger.error"),
         ):
             result = transcriber._cloud_request(
@@ -301,11 +2215,14 @@ class CloudTranscriptionErrorTests(unittest.TestCase):
         lexicon.get_prompt.return_value = ""
         transcriber = Transcriber(settings, lexicon)
         response = Mock(status_code=522, text="cloudflare timeout")
+        retries = METRICS.value("moneypenny_provider_retries_total", provider="groq")
+        errors = METRICS.value("moneypenny_provider_errors_total", provider="groq",
+                               request="transcription", reason="http_522")
 
         with (
-            patch("voice_to_text.requests.post", return_value=response) as post,
+            patch("voice_to_text.http_session.post", return_value=response) as post,
             patch("voice_to_text.logger.error"),
-            patch("voice_to_text.time.sleep"),
+            patch.object(Transcriber, "RETRY_DELAY_SECONDS", 0),
         ):
             result = transcriber._cloud_request(
                 io.BytesIO(b"audio"),
@@ -322,6 +2239,9 @@ class CloudTranscriptionErrorTests(unittest.TestCase):
             transcriber.last_error,
             "Groq transcription failed (HTTP 522).",
         )
+        self.assertEqual(METRICS.value("moneypenny_provider_retries_total", provider="groq"), retries + 1)
+        self.assertEqual(METRICS.value("moneypenny_provider_errors_total", provider="groq",
+                                       request="transcription", reason="http_522"), errors + 2)
 
     def test_server_error_retry_recovers_on_second_attempt(self):
         settings = Mock()
@@ -334,12 +2254,12 @@ class CloudTranscriptionErrorTests(unittest.TestCase):
 
         with (
             patch(
-                "voice_to_text.requests.post",
+                "voice_to_text.http_session.post",
                 side_effect=[failure, success],
             ) as post,
             patch("voice_to_text.logger.error"),
             patch("voice_to_text.logger.info"),
-            patch("voice_to_text.time.sleep"),
+            patch.object(Transcriber, "RETRY_DELAY_SECONDS", 0),
         ):
             result = transcriber._cloud_request(
                 io.BytesIO(b"audio"),
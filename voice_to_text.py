@@ -2,49 +2,63 @@
 
 import pyaudio
 import keyboard
-import requests
-from faster_whisper import WhisperModel
+import av
+import numpy as np
+from faster_whisper import WhisperModel, decode_audio
 from pynput.keyboard import Controller, Key
+import multiprocessing
 import threading
 import time
 import io
 import wave
 import os
 import logging
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 import sys
 import traceback
 from pathlib import Path
 import signal
 import atexit
+import contextlib
+import copy
+import gc
+import cProfile
 import json
+import mmap
+import pstats
+import re
+import tempfile
 from collections import deque
-import socket
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+import queue
+import asyncio
 from datetime import datetime
 
+from engine import (
+    EngineDaemonClient,
+    EngineProcess,
+    daemon_command,
+    decode_clips,
+    engine_address,
+    float32_to_pcm,
+    pcm_to_float32,
+    run_engine_daemon,
+)
+from metrics import METRICS, MetricsExporter, process_memory_bytes
+from model_cache import ModelCache
+from network import DNS_CACHE, ProviderIO, UploadRate, create_session, retry_over_ipv4
 
-def _force_ipv4():
-    """Force outbound connections to use IPv4.
-
-    Some networks have a broken IPv6 route to Hugging Face, which causes
-    Python's SSL connection to be reset (WinError 10054) during model
-    downloads. Preferring IPv4 works around this. IPv4 is universally
-    supported, so this is safe to apply globally for this app's only
-    network use (model downloads).
-    """
-    _orig_getaddrinfo = socket.getaddrinfo
-
-    def _ipv4_getaddrinfo(host, port, family=0, type=0, proto=0, flags=0):
-        return _orig_getaddrinfo(host, port, socket.AF_INET, type, proto, flags)
-
-    socket.getaddrinfo = _ipv4_getaddrinfo
-
-
-_force_ipv4()
 
 # --- Logging & App Paths ---
 def _resolve_app_dir() -> Path:
-    """Keep mutable app data in the project folder when running frozen."""
+    """Keep mutable app data in the project folder when running frozen.
+
+    MONEYPENNY_APP_DIR overrides the location, so benchmarks and other
+    scripted runs keep their settings and history apart from the user's.
+    """
+    if os.environ.get("MONEYPENNY_APP_DIR"):
+        return Path(os.environ["MONEYPENNY_APP_DIR"]).resolve()
     if getattr(sys, "frozen", False):
         try:
             app_dir_index = sys.argv.index("--app-dir") + 1
@@ -57,12 +71,72 @@ def _resolve_app_dir() -> Path:
 APP_DIR = _resolve_app_dir()
 LOG_DIR = APP_DIR / "logs"
 LOG_FILE = LOG_DIR / "moneypenny.log"
+JSON_LOG_FILE = LOG_DIR / "moneypenny.jsonl"
+LOG_MAX_BYTES = 1_000_000  # each log file rotates at this size
+LOG_BACKUPS = 3
 SETTINGS_FILE = APP_DIR / "settings.json"
 LEXICON_FILE = APP_DIR / "lexicon.txt"
+# Bundled with the app, not user data.
+COMMON_WORDS_FILE = Path(__file__).resolve().parent / "common_words.txt"
 HISTORY_FILE = APP_DIR / "transcript_history.jsonl"
+ENGINE_KEY_FILE = APP_DIR / "engine.key"
+LONG_FORM_DIR = APP_DIR / "long_form"
+OFFLINE_QUEUE_DIR = APP_DIR / "offline_queue"
+MODEL_DIR = APP_DIR / "models"
+
+# OpenAI-compatible API roots of the cloud providers.
+PROVIDER_API_URLS = {
+    "groq": "https://api.groq.com/openai/v1",
+    "openrouter": "https://openrouter.ai/api/v1",
+}
+
+
+class JsonLogFormatter(logging.Formatter):
+    """One JSON object per line, for scripts and log tools."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created).astimezone().isoformat(
+                timespec="milliseconds"
+            ),
+            "level": record.levelname,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class LogQueueHandler(QueueHandler):
+    """Enqueue records with their exception info intact.
+
+    QueueHandler.prepare folds the traceback into the message and drops
+    exc_info, so the listener's JSON formatter could never write an
+    "exception" field. Only the message is rendered here, in the logging
+    thread; each handler's formatter adds the traceback its own way.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        return record
+
+
+_log_listener = None
 
 
 def configure_logging() -> logging.Logger:
+    """Log through a queue so the calling thread never waits on the disk.
+
+    Hotkey, microphone, dictation, and GUI threads only enqueue records; a
+    listener thread formats them and writes the rotating log file (and the
+    console). A slow disk or a virus scanner holding the file therefore
+    no longer adds to dictation latency.
+    """
+    global _log_listener
     LOG_DIR.mkdir(parents=True, exist_ok=True)
 
     log_formatter = logging.Formatter(
@@ -71,7 +145,7 @@ def configure_logging() -> logging.Logger:
     )
 
     file_handler = RotatingFileHandler(
-        LOG_FILE, maxBytes=1_000_000, backupCount=3, encoding="utf-8"
+        LOG_FILE, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUPS, encoding="utf-8"
     )
     file_handler.setFormatter(log_formatter)
     file_handler.setLevel(logging.INFO)
@@ -79,7 +153,7 @@ def configure_logging() -> logging.Logger:
     logger = logging.getLogger("moneypenny")
     if not logger.handlers:
         logger.setLevel(logging.INFO)
-        logger.addHandler(file_handler)
+        handlers = [file_handler]
         # Console output only when a console exists (python.exe).
         # When launched via pythonw.exe (no console window), sys.stdout is None,
         # so we skip the console handler to avoid crashing.
@@ -87,11 +161,39 @@ def configure_logging() -> logging.Logger:
             console_handler = logging.StreamHandler(stream=sys.stdout)
             console_handler.setFormatter(log_formatter)
             console_handler.setLevel(logging.INFO)
-            logger.addHandler(console_handler)
+            handlers.append(console_handler)
+        log_queue = queue.SimpleQueue()
+        _log_listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+        _log_listener.start()
+        # Stopping drains the queue, so records logged just before exit are kept.
+        atexit.register(_log_listener.stop)
+        logger.addHandler(LogQueueHandler(log_queue))
         logger.propagate = False
     return logger
 
 
+def enable_json_log(enabled: bool):
+    """Also write every record to logs/moneypenny.jsonl (the log_json setting).
+
+    JSON lines go to their own rotating file, so neither file mixes formats
+    when the setting changes after startup.
+    """
+    if _log_listener is None:
+        return
+    handlers = [h for h in _log_listener.handlers if not isinstance(h.formatter, JsonLogFormatter)]
+    if enabled:
+        json_handler = RotatingFileHandler(
+            JSON_LOG_FILE, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUPS, encoding="utf-8"
+        )
+        json_handler.setFormatter(JsonLogFormatter())
+        json_handler.setLevel(logging.INFO)
+        handlers.append(json_handler)
+    for handler in _log_listener.handlers:
+        if handler not in handlers:
+            handler.close()
+    _log_listener.handlers = tuple(handlers)
+
+
 logger = configure_logging()
 
 
@@ -163,12 +265,103 @@ FORMAT = pyaudio.paInt16
 CHANNELS = 1
 RATE = 16000
 CHUNK = 1024
+SILENCE_PEAK = 500  # int16 amplitude below this counts as silence
+# A clip needs at least this many non-silent chunks (~0.2s) to count as
+# speech; a hotkey tap or desk bump only spikes one or two.
+MIN_SPEECH_CHUNKS = 3
+# Silence kept before the first speech chunk so soft onsets survive (~0.2s),
+# and the longest pause left inside a dictation (~0.5s) — enough for Whisper
+# to hear a sentence boundary without decoding or uploading dead air.
+LEAD_PAD_CHUNKS = 3
+MAX_PAUSE_CHUNKS = 8
+# Share of one CPU core the microphone thread (stream reads plus detection)
+# is expected to stay under while listening hands-free. It is advisory: the
+# use is measured and logged, with a warning above this, but never throttled,
+# since skipping chunks would blind the onset detector.
+HANDS_FREE_CPU_WARN_PERCENT = 1.0
+
+
+# Latency spans recorded per dictation, in milliseconds. The stages run one
+# after another from hotkey release to the last typed character and add up
+# to total_ms. The transcription stages break transcribe_ms down further;
+# they start when the clip is submitted, so they can overlap queue_ms.
+LATENCY_STAGES = (
+    "release_ms", "queue_ms", "transcribe_ms", "cleanup_ms",
+    "modifier_wait_ms", "typing_ms", "total_ms",
+)
+TRANSCRIPTION_STAGES = (
+    "batch_wait_ms", "prepare_ms", "encode_ms", "upload_ms", "server_ms",
+    "model_wait_ms", "decode_ms",
+)
+LATENCY_WINDOW = 100  # Status tab percentiles cover this many dictations
+
+# Pipeline metrics, recorded always and exported when metrics_port or
+# metrics_file is set. Stage histograms are in seconds, named without "_ms".
+METRICS.counter("moneypenny_dictations_total",
+                "Dictations finished, by outcome (typed, saved, recovered, no_speech, failed, no_audio).")
+METRICS.histogram("moneypenny_stage_seconds",
+                  "Dictation latency per stage (LATENCY_STAGES and TRANSCRIPTION_STAGES).")
+METRICS.counter("moneypenny_cleanup_total",
+                "Transcripts offered to cleanup, by result (applied, not_needed, skipped).")
+METRICS.counter("moneypenny_lexicon_corrections_total",
+                "Misheard lexicon terms rewritten before cleanup.")
+METRICS.counter("moneypenny_provider_errors_total",
+                "Failed cloud provider requests, by provider, request type, and reason.")
+METRICS.counter("moneypenny_provider_retries_total", "Cloud transcription requests retried, by provider.")
+METRICS.counter("moneypenny_provider_hedges_total", "Stalled cloud uploads hedged with a second copy, by provider.")
+METRICS.counter("moneypenny_silence_trimmed_seconds_total",
+                "Silence removed before transcription, by position (leading, pause, trailing).")
+METRICS.counter("moneypenny_audio_overflows_total", "Microphone overflows (input dropped before it was read).")
+METRICS.counter("moneypenny_audio_dropped_seconds_total", "Seconds of microphone input lost to overflows.")
+METRICS.counter("moneypenny_audio_read_errors_total", "Failed microphone stream reads.")
+
+
+def _elapsed_ms(started: float, ended: float = None) -> float:
+    """Milliseconds between two time.perf_counter() readings (ended defaults to now)."""
+    return round(((time.perf_counter() if ended is None else ended) - started) * 1000, 1)
+
+
+def _add_span(spans: dict, name: str, started: float):
+    """Add the time since started to spans[name]; a stage can run more than once."""
+    spans[name] = round(spans.get(name, 0.0) + _elapsed_ms(started), 1)
+
+
+def _memory_change(before, after) -> str:
+    """Describe a working-set change in MB for the log, e.g. "memory 812 MB -> 143 MB"."""
+    if after is None:
+        return "memory use unknown"
+    if before is None:
+        return f"memory {after / 2**20:.0f} MB"
+    return f"memory {before / 2**20:.0f} MB -> {after / 2**20:.0f} MB"
+
+
+def _percentile(values: list, percent: float) -> float:
+    """Nearest-rank percentile of sorted values."""
+    rank = max(1, -(-len(values) * percent // 100))
+    return values[int(rank) - 1]
+
+
+def _chunk_peak(chunk: bytes) -> int:
+    """Peak absolute int16 amplitude of one captured audio chunk."""
+    from array import array
+    samples = array("h", chunk)
+    if not samples:
+        return 0
+    return max(max(samples), -min(samples))
 
 # Default settings
 DEFAULT_SETTINGS = {
     "transcription_mode": "local",  # "local" (offline, CPU) or "cloud" (API)
     "model_size": "tiny.en",
     "beam_size": 1,
+    "adaptive_decoding": True,  # pick beam/VAD per dictation from its length
+    "speech_gate": True,  # skip the backend when a clip has no speech energy
+    "compress_pauses": True,  # drop leading silence, shorten long pauses
+    "parallel_workers": 4,  # long dictations: concurrent pieces (1 = off)
+    "batch_max_wait_ms": 100,  # Local mode: wait for a burst being recorded
+    # "in-process", "subprocess" (model in a child process), or "daemon"
+    # (model stays loaded in a shared engine across app restarts)
+    "local_engine": "in-process",
     "cloud_provider": "groq",  # "groq" (fastest) or "openrouter"
     "openrouter_api_key": "",
     "cloud_model": "openai/gpt-transcribe",
@@ -176,7 +369,24 @@ DEFAULT_SETTINGS = {
     "groq_model": "whisper-large-v3-turbo",
     "cleanup_mode": "commands",  # "off", "commands", or "always"
     "cleanup_model": "llama-3.1-8b-instant",
+    "lexicon_correction": True,  # fix near misses of lexicon terms before cleanup
     "record_hotkey": "right ctrl",
+    "long_form_hotkey": "off",  # press once to start, again to stop
+    "long_form_output": "type",  # "type" segments as they finish, or "save"
+    "hands_free": False,  # start recording when speech begins, no hotkey
+    "hands_free_silence_ms": 1000,  # hands-free: stop after this much silence
+    "offline_queue": True,  # keep failed cloud dictations and retry later
+    "offline_queue_clipboard": False,  # copy recovered transcripts
+    "rate_limit_routing": True,  # go local / skip cleanup before a Groq 429
+    "cloud_hedge_seconds": 2.5,  # resend an upload this long past its expected time (0 = off)
+    "http2": False,  # one thread-free HTTP/2 connection per provider (httpx[http2], bundled)
+    "log_json": False,  # also write logs/moneypenny.jsonl, one JSON object per line
+    "metrics_port": 0,  # serve Prometheus metrics on localhost:<port>/metrics (0 = off)
+    "metrics_file": "",  # also rewrite this file with the metrics ("" = off)
+    "metrics_flush_seconds": 15,
+    "model_idle_unload_minutes": 0,  # free the local model after this idle time (0 = never)
+    "model_cache_dir": "",  # folder for downloaded models, e.g. shared by all users ("" = models/)
+    "prefetch_models": [],  # model sizes to download in the background at startup
     "selected_microphone": None,  # None = system default
 }
 
@@ -222,64 +432,398 @@ class Settings:
         self.settings[key] = value
 
 
+# Soundex consonant classes; vowels separate repeated codes, h and w do not.
+_SOUNDEX = {
+    **dict.fromkeys("bfpv", "1"), **dict.fromkeys("cgjkqsxz", "2"), **dict.fromkeys("dt", "3"),
+    "l": "4", **dict.fromkeys("mn", "5"), "r": "6", **{digit: digit for digit in "0123456789"},
+}
+
+
+def _phonetic_key(word: str) -> str:
+    """Soundex-style consonant skeleton of a casefolded word, not cut to four
+    characters, so "kubernetis" and "kubernetes" share the key "216532"."""
+    key = []
+    previous = None
+    for char in word:
+        code = _SOUNDEX.get(char)
+        if code is None:
+            if char not in "hw":
+                previous = None
+            continue
+        if code != previous:
+            key.append(code)
+        previous = code
+    return "".join(key)
+
+
+def _load_common_words(path: Path = COMMON_WORDS_FILE):
+    """The bundled common-word list as a frozenset, or None if it is missing."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return frozenset(
+                line.strip() for line in f if line.strip() and not line.startswith("#")
+            )
+    except OSError:
+        logger.warning("%s is missing; lexicon correction only fixes spacing", path)
+        return None
+
+
+def _edit_distance(a: str, b: str, limit: int) -> int:
+    """Levenshtein distance between a and b, or limit + 1 once it exceeds limit."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for row, char_a in enumerate(a, 1):
+        current = [row]
+        for column, char_b in enumerate(b, 1):
+            current.append(min(
+                previous[column] + 1,
+                current[column - 1] + 1,
+                previous[column - 1] + (char_a != char_b),
+            ))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return min(previous[-1], limit + 1)
+
+
 class Lexicon:
-    """Manages the lexicon/dictionary for transcription biasing."""
+    """Manages the lexicon/dictionary for transcription biasing.
+
+    The biasing prompt is built once and cached until the terms change,
+    through add/remove or an edit to lexicon.txt (noticed by one stat()
+    per prompt), so a lexicon of thousands of terms costs nothing per
+    dictation. Whisper only reads about 224 prompt tokens, so when the
+    terms do not all fit, the ones dictated lately win: a term scores a
+    point each time it appears in a dictation's final text, or
+    CORRECTION_WEIGHT points when cleanup had to put it there (it is in
+    the final text but not the raw transcript), and points halve every
+    SCORE_HALF_LIFE_DAYS. Terms never dictated keep their file order.
+    """
 
-    def __init__(self):
+    PROMPT_PREFIX = "Transcribe clearly using these domain terms and proper nouns when appropriate: "
+    # About Whisper's 224-token prompt limit; the model ignores the rest.
+    PROMPT_MAX_CHARS = 600
+    SCORE_HALF_LIFE_DAYS = 30
+    CORRECTION_WEIGHT = 3.0
+    MAX_TERM_WORDS = 6
+    # Shorter spellings, or ones with fewer consonant sounds (which would
+    # sound like too many other words), are only corrected on an exact match.
+    MIN_FUZZY_CHARS = 5
+    MIN_FUZZY_CONSONANTS = 3
+    _WORD = re.compile(r"\w+")
+    # Words never rewritten into a term, shared by every lexicon; loaded
+    # with the first correction index (None if the list is missing).
+    _common_words = None
+
+    def __init__(self, path: Path = LEXICON_FILE):
+        self.path = path
+        self.lock = threading.RLock()
         self.terms = []
+        self.scores = {}  # term -> recency-weighted appearances
+        self._index = {}  # casefolded words -> term
+        self._longest = 1
+        # (raw, final, time) of recent dictations, rescored when the terms change.
+        self._recent = deque(maxlen=TranscriptHistory.MAX_ENTRIES)
+        self._epoch = time.time()
+        self._signature = None
+        self._prompt = None
+        self._spellings = None  # built by the first correct()
         self.load()
 
     def load(self):
-        self.terms = []
-        if not LEXICON_FILE.exists():
-            return
-        try:
-            with open(LEXICON_FILE, "r", encoding="utf-8") as f:
-                for line in f:
-                    line = line.strip()
-                    if line and not line.startswith("#"):
-                        self.terms.append(line)
-            logger.info("Lexicon loaded: %d terms", len(self.terms))
-        except Exception:
-            logger.exception("Failed to load lexicon")
+        terms = []
+        with self.lock:
+            self._signature = self._file_signature()
+            if self._signature is not None:
+                try:
+                    with open(self.path, "r", encoding="utf-8") as f:
+                        for line in f:
+                            line = line.strip()
+                            if line and not line.startswith("#"):
+                                terms.append(line)
+                    logger.info("Lexicon loaded: %d terms", len(terms))
+                except Exception:
+                    logger.exception("Failed to load lexicon")
+            self.terms = terms
+            self._reindex()
 
     def save(self):
         try:
-            with open(LEXICON_FILE, "w", encoding="utf-8") as f:
+            with open(self.path, "w", encoding="utf-8") as f:
                 f.write("# Add one term or phrase per line to bias transcription.\n")
                 f.write("# Lines starting with # are ignored.\n\n")
                 for term in self.terms:
                     f.write(term + "\n")
+            self._signature = self._file_signature()
             logger.info("Lexicon saved: %d terms", len(self.terms))
         except Exception:
             logger.exception("Failed to save lexicon")
 
     def add(self, term: str):
         term = term.strip()
-        if term and term not in self.terms:
-            self.terms.append(term)
-            self.save()
-            return True
+        with self.lock:
+            if term and term not in self.terms:
+                self.terms.append(term)
+                self._reindex()
+                self.save()
+                return True
         return False
 
     def remove(self, term: str):
-        if term in self.terms:
-            self.terms.remove(term)
-            self.save()
-            return True
+        with self.lock:
+            if term in self.terms:
+                self.terms.remove(term)
+                self._reindex()
+                self.save()
+                return True
         return False
 
+    def learn(self, entries):
+        """Score the terms from past dictations (TranscriptHistory entries)."""
+        for entry in entries:
+            try:
+                when = datetime.fromisoformat(entry["timestamp"]).timestamp()
+            except (KeyError, TypeError, ValueError):
+                continue
+            self.observe(entry.get("raw", ""), entry.get("final", ""), when)
+
+    def observe(self, raw: str, final: str, when: float = None):
+        """Credit the terms in a finished dictation toward prompt selection."""
+        when = time.time() if when is None else when
+        with self.lock:
+            self._recent.append((raw, final, when))
+            if self._score(raw, final, when):
+                self._prompt = None
+
     def get_prompt(self) -> str:
+        with self.lock:
+            self._reload_if_changed()
+            if self._prompt is None:
+                self._prompt = self._build_prompt()
+            return self._prompt
+
+    def correct(self, text: str) -> tuple:
+        """Rewrite misheard lexicon terms in text; return (text, [(heard, term)]).
+
+        Runs on every transcript before cleanup, so it works from indexes
+        built once per lexicon change and costs tens of microseconds per
+        word even with tens of thousands of terms. A run of words spelled
+        like a term once spaces and hyphens are removed is replaced
+        ("Money penny" -> "MoneyPenny"). Otherwise only misspellings are:
+        a word that sounds like a one-word term (same phonetic key) and is
+        one edit from it (two from eight characters; "Kubernetis" ->
+        "Kubernetes"), or a run matching a longer term word for word with
+        each differing word such a misspelling. Common words
+        (common_words.txt) and their inflections, words that extend or
+        shorten a term ("skylarks", "strip" for "Stripe"), and words that
+        differ from a capitalized term only in case are left alone.
+        """
+        with self.lock:
+            self._reload_if_changed()
+            if not self.terms:
+                return text, []
+            if self._spellings is None:
+                self._build_spellings()
+            words = list(self._WORD.finditer(text))
+            parts = []
+            corrections = []
+            position = 0
+            index = 0
+            while index < len(words):
+                match = self._match_at(text, words, index)
+                if match is None:
+                    index += 1
+                    continue
+                count, term = match
+                start, end = words[index].start(), words[index + count - 1].end()
+                if text[start:end] != term:
+                    corrections.append((text[start:end], term))
+                    parts += [text[position:start], term]
+                    position = end
+                index += count
+        if not corrections:
+            return text, []
+        return "".join(parts) + text[position:], corrections
+
+    def _match_at(self, text: str, words: list, index: int):
+        """(word count, term) for the longest lexicon match starting at words[index]."""
+        heard_words = []
+        for end in range(index, min(index + self._longest + 1, len(words))):
+            if end > index and text[words[end - 1].end():words[end].start()] not in (" ", "-"):
+                break
+            heard_words.append(words[end].group().casefold())
+        for count in range(len(heard_words), 0, -1):
+            run = tuple(heard_words[:count])
+            term = self._spellings.get("".join(run))
+            if term is not None:
+                heard = text[words[index].start():words[index + count - 1].end()]
+                if count == 1 and term in (term.lower(), term.capitalize()):
+                    # "Go" or "Rust" must not capitalize every "go"; casing
+                    # a known spelling is the recognizer's call.
+                    return count, heard
+                return count, term
+            term = self._near_miss(run[0]) if count == 1 else self._near_miss_run(run)
+            if term is not None:
+                return count, term
+        return None
+
+    def _near_miss(self, word: str):
+        """The closest one-word term that word is a near miss of, or None."""
+        if self._common_words is None or len(word) < self.MIN_FUZZY_CHARS:
+            return None
+        key = _phonetic_key(word)
+        if len(key) < self.MIN_FUZZY_CONSONANTS or self._is_common(word):
+            return None
+        limit = self._edit_limit(word)
+        best = None
+        for length in range(len(word) - limit, len(word) + limit + 1):
+            for spelling, term in self._phonetic.get((key, length), ()):
+                distance = self._distance(word, spelling, limit)
+                if distance <= limit:
+                    rank = (distance, -self.scores.get(term, 0.0))
+                    if best is None or rank < best[0]:
+                        best = (rank, term)
+        return best[1] if best else None
+
+    def _near_miss_run(self, run: tuple):
+        """The multi-word term that run matches word for word, each word
+        equal or a near miss of its own ("acme clowd" -> "Acme Cloud")."""
+        if self._common_words is None:
+            return None
+        for term_words, term in self._phonetic_runs.get(tuple(_phonetic_key(word) for word in run), ()):
+            if all(heard == wanted or self._is_near_miss(heard, wanted)
+                   for heard, wanted in zip(run, term_words)):
+                return term
+        return None
+
+    def _is_near_miss(self, heard: str, wanted: str) -> bool:
+        """heard (same phonetic key as wanted) is a misspelling of wanted, not another word."""
+        if len(heard) < self.MIN_FUZZY_CHARS or len(_phonetic_key(heard)) < self.MIN_FUZZY_CONSONANTS:
+            return False
+        if self._is_common(heard):
+            return False
+        limit = self._edit_limit(heard)
+        return self._distance(heard, wanted, limit) <= limit
+
+    @staticmethod
+    def _edit_limit(word: str) -> int:
+        return 1 if len(word) < 8 else 2
+
+    @staticmethod
+    def _distance(heard: str, wanted: str, limit: int) -> int:
+        """Edit distance from heard to wanted, or limit + 1 when heard is
+        an extension ("skylarks") or a truncation ("strip" for "stripe")
+        of wanted rather than a misspelling."""
+        if heard.startswith(wanted) or wanted.startswith(heard):
+            return limit + 1
+        # An edit breaks at most two bigrams: a cheap filter before the
+        # edit distance itself.
+        bigrams = {heard[i:i + 2] for i in range(len(heard) - 1)}
+        if len(bigrams.difference(wanted[i:i + 2] for i in range(len(wanted) - 1))) > 2 * limit:
+            return limit + 1
+        return _edit_distance(heard, wanted, limit)
+
+    def _is_common(self, word: str) -> bool:
+        """word, or the stem of a plural or -ed/-ing/-er/-ly form, is a common word."""
+        common = self._common_words
+        if word in common:
+            return True
+        if word.endswith("ies") and word[:-3] + "y" in common:
+            return True
+        for suffix in ("s", "es", "d", "ed", "ing", "er", "ers", "ly"):
+            stem = word[:-len(suffix)]
+            if not word.endswith(suffix) or len(stem) < 3:
+                continue
+            if stem in common or stem + "e" in common or (stem[-1] == stem[-2] and stem[:-1] in common):
+                return True
+        return False
+
+    def _build_spellings(self):
+        """Index terms by compact spelling, one-word terms by phonetic key and
+        length, and longer terms by their words' phonetic keys. Call with lock held."""
+        if Lexicon._common_words is None:
+            Lexicon._common_words = _load_common_words()
+        self._spellings = {}
+        self._phonetic = {}
+        self._phonetic_runs = {}
+        for words, term in self._index.items():
+            spelling = "".join(words)
+            if spelling in self._spellings:
+                continue
+            self._spellings[spelling] = term
+            if len(words) > 1:
+                keys = tuple(_phonetic_key(word) for word in words)
+                self._phonetic_runs.setdefault(keys, []).append((words, term))
+                continue
+            key = _phonetic_key(spelling)
+            if len(spelling) >= self.MIN_FUZZY_CHARS and len(key) >= self.MIN_FUZZY_CONSONANTS:
+                self._phonetic.setdefault((key, len(spelling)), []).append((spelling, term))
+
+    def _reload_if_changed(self):
+        if self._file_signature() != self._signature:
+            logger.info("Lexicon file changed; reloading")
+            self.load()
+
+    def _build_prompt(self) -> str:
         if not self.terms:
             return ""
-        max_terms = 50
-        selected = self.terms[:max_terms]
-        prompt = (
-            "Transcribe clearly using these domain terms and proper nouns when appropriate: "
-            + ", ".join(selected)
-            + "."
-        )
-        return prompt[:600]
+        # A stable sort, so terms with equal scores stay in file order.
+        ranked = sorted(self.terms, key=lambda term: -self.scores.get(term, 0.0))
+        budget = self.PROMPT_MAX_CHARS - len(self.PROMPT_PREFIX) - len(".")
+        selected = []
+        for term in ranked:
+            cost = len(term) + (len(", ") if selected else 0)
+            if cost <= budget:
+                selected.append(term)
+                budget -= cost
+        if len(selected) < len(self.terms):
+            logger.debug("Lexicon prompt holds %d of %d terms", len(selected), len(self.terms))
+        return self.PROMPT_PREFIX + ", ".join(selected) + "."
+
+    def _file_signature(self):
+        try:
+            stat = self.path.stat()
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _reindex(self):
+        """Rebuild the term lookup and rescore recent dictations. Call with lock held."""
+        self._index = {}
+        for term in self.terms:
+            words = tuple(self._WORD.findall(term.casefold()))
+            if 0 < len(words) <= self.MAX_TERM_WORDS:
+                self._index.setdefault(words, term)
+        self._longest = max((len(words) for words in self._index), default=1)
+        self.scores = {}
+        for raw, final, when in self._recent:
+            self._score(raw, final, when)
+        self._prompt = None
+        self._spellings = None
+
+    def _score(self, raw: str, final: str, when: float) -> bool:
+        used = self._find_terms(final)
+        if not used:
+            return False
+        dictated = self._find_terms(raw)
+        # Exponential decay relative to a fixed epoch: older points weigh
+        # less, and the ranking never has to be recomputed as time passes.
+        weight = 2 ** ((when - self._epoch) / (self.SCORE_HALF_LIFE_DAYS * 86400))
+        for term in used:
+            points = 1.0 if term in dictated else self.CORRECTION_WEIGHT
+            self.scores[term] = self.scores.get(term, 0.0) + weight * points
+        return True
+
+    def _find_terms(self, text: str) -> set:
+        words = self._WORD.findall(text.casefold())
+        found = set()
+        for start in range(len(words)):
+            for end in range(start + 1, min(start + self._longest, len(words)) + 1):
+                term = self._index.get(tuple(words[start:end]))
+                if term is not None:
+                    found.add(term)
+        return found
 
 
 class TranscriptHistory:
@@ -311,9 +855,15 @@ class TranscriptHistory:
             logger.exception("Failed to load transcript history")
 
     def add(self, raw: str, final: str, mode: str, provider: str, elapsed: float,
-            cleanup_used: bool):
+            cleanup_used: bool, decode: dict = None, recorded_at: datetime = None,
+            spans: dict = None):
+        """Record a dictation. The transcriber's latency spans arrive inside
+        decode["spans"] and are stored with the app's own under "spans"."""
+        now = datetime.now().astimezone()
+        decode = dict(decode or {})
+        spans = {**decode.pop("spans", {}), **(spans or {})}
         entry = {
-            "timestamp": datetime.now().astimezone().isoformat(timespec="seconds"),
+            "timestamp": (recorded_at or now).isoformat(timespec="seconds"),
             "raw": raw,
             "final": final,
             "mode": mode,
@@ -321,12 +871,26 @@ class TranscriptHistory:
             "elapsed_seconds": round(elapsed, 3),
             "cleanup_used": cleanup_used,
         }
+        if decode:
+            # Decoding parameters chosen for this dictation, kept for analysis.
+            entry["decode"] = decode
+        if spans:
+            entry["spans"] = spans
+        if recorded_at is not None:
+            # Recovered from the offline queue some time after recording.
+            entry["transcribed_at"] = now.isoformat(timespec="seconds")
         with self.lock:
             self.entries.append(entry)
             self.entries = self.entries[-self.MAX_ENTRIES:]
             self._rewrite()
         return entry
 
+    def add_spans(self, entry: dict, spans: dict):
+        """Fill in spans measured after the entry was recorded, such as typing."""
+        with self.lock:
+            entry.setdefault("spans", {}).update(spans)
+            self._rewrite()
+
     def clear(self):
         with self.lock:
             self.entries = []
@@ -336,6 +900,26 @@ class TranscriptHistory:
         with self.lock:
             return [entry.copy() for entry in self.entries]
 
+    def latency_percentiles(self, window: int = LATENCY_WINDOW) -> dict:
+        """Rolling p50/p95/p99 (ms) per stage over the last window timed dictations.
+
+        Returns {stage: {"count", "p50", "p95", "p99"}} in pipeline order,
+        leaving out stages no recent dictation went through.
+        """
+        with self.lock:
+            recent = [entry["spans"] for entry in self.entries if entry.get("spans")][-window:]
+        summary = {}
+        for stage in LATENCY_STAGES + TRANSCRIPTION_STAGES:
+            values = sorted(spans[stage] for spans in recent if stage in spans)
+            if values:
+                summary[stage] = {
+                    "count": len(values),
+                    "p50": _percentile(values, 50),
+                    "p95": _percentile(values, 95),
+                    "p99": _percentile(values, 99),
+                }
+        return summary
+
     def _rewrite(self):
         try:
             with open(self.path, "w", encoding="utf-8") as history_file:
@@ -345,6 +929,120 @@ class TranscriptHistory:
             logger.exception("Failed to save transcript history")
 
 
+def _header_number(headers, name: str):
+    try:
+        return float(headers.get(name))
+    except (TypeError, ValueError):
+        return None
+
+
+def _parse_reset_seconds(value) -> float:
+    """Parse Groq reset times such as "7.66s", "2m59.56s", or "450ms"."""
+    if not isinstance(value, str):
+        return 0.0
+    total = 0.0
+    for amount, unit in re.findall(r"([\d.]+)(ms|h|m|s)", value):
+        total += float(amount) * {"ms": 0.001, "s": 1, "m": 60, "h": 3600}[unit]
+    return total
+
+
+class RateLimitTracker:
+    """Client-side token buckets mirroring provider rate limits.
+
+    Every Groq response carries x-ratelimit-{limit,remaining,reset}-{requests,
+    tokens} headers. Each (provider:model, kind) pair becomes a bucket whose
+    level is the remaining quota, refilling linearly until the reset time;
+    requests deduct their cost locally until the next response corrects it.
+    A 429 Retry-After blocks the key outright. Callers ask how long to wait
+    for a given priority: dictation may use the whole quota, cleanup and
+    background jobs leave a reserve for it, so a busy day degrades to local
+    transcription and raw text instead of 429 retries.
+    """
+
+    # Share of each limit a priority must leave untouched.
+    RESERVE = {"dictation": 0.0, "cleanup": 0.1, "background": 0.25}
+    KINDS = ("requests", "tokens")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.buckets = {}  # (key, kind) -> [capacity, level, refill per second, updated]
+        self.blocked_until = {}
+
+    def observe(self, key: str, headers):
+        now = time.monotonic()
+        with self.lock:
+            for kind in self.KINDS:
+                limit = _header_number(headers, f"x-ratelimit-limit-{kind}")
+                remaining = _header_number(headers, f"x-ratelimit-remaining-{kind}")
+                if limit is None or remaining is None or limit <= 0:
+                    continue
+                reset = _parse_reset_seconds(headers.get(f"x-ratelimit-reset-{kind}"))
+                rate = (limit - remaining) / reset if reset > 0 else 0.0
+                self.buckets[(key, kind)] = [limit, remaining, rate, now]
+            retry_after = _header_number(headers, "retry-after")
+            if retry_after:
+                self.blocked_until[key] = now + retry_after
+
+    def reserve(self, key: str, cost: dict):
+        """Deduct a request's cost before it is sent."""
+        now = time.monotonic()
+        with self.lock:
+            for kind, amount in cost.items():
+                bucket = self.buckets.get((key, kind))
+                if bucket is not None:
+                    bucket[1] = self._level(bucket, now) - amount
+                    bucket[3] = now
+
+    def wait_seconds(self, key: str, priority: str, cost: dict) -> float:
+        """Seconds until cost fits above this priority's reserve (0 = go now)."""
+        now = time.monotonic()
+        with self.lock:
+            wait = max(0.0, self.blocked_until.get(key, 0.0) - now)
+            for kind, amount in cost.items():
+                bucket = self.buckets.get((key, kind))
+                if bucket is None:
+                    continue
+                capacity, _, rate, _ = bucket
+                shortfall = amount + self.RESERVE[priority] * capacity - self._level(bucket, now)
+                if shortfall > 0:
+                    wait = max(wait, shortfall / rate if rate > 0 else float("inf"))
+            return wait
+
+    @staticmethod
+    def _level(bucket: list, now: float) -> float:
+        capacity, level, rate, updated = bucket
+        return min(capacity, level + rate * (now - updated))
+
+
+RATE_LIMITS = RateLimitTracker()
+# One keep-alive session and one I/O loop thread for every cloud request;
+# see network.py.
+http_session = create_session()
+provider_io = ProviderIO(http_session)
+# Downloaded speech models; model_cache_dir can point it at a shared folder.
+MODEL_CACHE = ModelCache(MODEL_DIR)
+
+
+CUE_BOUNDARIES = '.,!?;:"()[]{}'  # punctuation that separates words for command cues
+
+
+def _cue_pattern(cues) -> re.Pattern:
+    """Whole-word matcher for cues in casefolded text, searched with a leading space.
+
+    Whitespace and the punctuation in CUE_BOUNDARIES separate words, both
+    around a cue and between the words of a multi-word cue. Starting the
+    pattern with the separator (instead of a lookbehind) lets the regex
+    engine skip straight to word starts.
+    """
+    gap = f"[\\s{re.escape(CUE_BOUNDARIES)}]"
+    word_char = f"[^\\s{re.escape(CUE_BOUNDARIES)}]"
+    alternatives = "|".join(
+        f"{gap}+".join(re.escape(word) for word in cue.split())
+        for cue in sorted(cues, key=len, reverse=True)
+    )
+    return re.compile(f"{gap}(?:{alternatives})(?!{word_char})")
+
+
 class TranscriptCleaner:
     """Context-aware dictation cleanup through Groq's fast chat endpoint."""
 
@@ -383,8 +1081,10 @@ CLEAN: "hello."
 
 If the transcript is empty or only filler, return exactly EMPTY."""
 
-    def __init__(self, settings: Settings):
+    def __init__(self, settings: Settings, lexicon: Lexicon = None):
         self.settings = settings
+        # Misheard lexicon terms are corrected locally before cleanup.
+        self.lexicon = lexicon
         self.last_error = None
 
     COMMAND_CUES = (
@@ -418,6 +1118,14 @@ If the transcript is empty or only filler, return exactly EMPTY."""
         ("newline", "\n"),
     )
 
+    # Compiled once; each matcher is one regex pass instead of per-cue or
+    # per-character Python loops. ASCII case-insensitivity matches casefold()
+    # on these letters without also matching dotted and dotless I.
+    _CUE_PATTERN = _cue_pattern(COMMAND_CUES)
+    _BREAK_PHRASE = "|".join(re.escape(phrase) for phrase, _ in _EDGE_BREAKS)
+    _LEADING_BREAK = re.compile(rf"(?:{_BREAK_PHRASE})[ \t,.;:]*", re.ASCII | re.IGNORECASE)
+    _NEWLINE_RUN = re.compile(r"\n{2,}")
+
     def should_clean(self, transcript: str) -> bool:
         """Use the second API call only when the selected mode requires it."""
         raw = transcript.strip()
@@ -427,14 +1135,11 @@ If the transcript is empty or only filler, return exactly EMPTY."""
         if mode == "always":
             return True
 
-        # Padding gives single-word cues simple word boundaries without turning
-        # this back into a punctuation-replacement parser. The LLM still makes
-        # the contextual decision about command versus literal prose.
-        normalized = raw.casefold()
-        for punctuation in '.,!?;:"()[]{}':
-            normalized = normalized.replace(punctuation, " ")
-        normalized = " " + " ".join(normalized.split()) + " "
-        return any(f" {cue} " in normalized for cue in self.COMMAND_CUES)
+        # Cues match as whole words, with punctuation counting as a word
+        # boundary, without turning this back into a punctuation-replacement
+        # parser. The LLM still makes the contextual decision about command
+        # versus literal prose.
+        return self._CUE_PATTERN.search(" " + raw.casefold()) is not None
 
     def _extract_line_break_commands(self, text: str) -> tuple[str, str, str]:
         """Split edge line-break commands off a transcript.
@@ -445,30 +1150,29 @@ If the transcript is empty or only filler, return exactly EMPTY."""
         language model to emit leading or trailing newlines.
         """
         core = text.strip()
-        leading, trailing = "", ""
-        while True:
+        # Every edge command is the same soft break, so only the count matters.
+        start = 0
+        leading_count = 0
+        while match := self._LEADING_BREAK.match(core, start):
+            start = match.end()
+            leading_count += 1
+        core = core[start:]
+        # Walk back from the end, casefolding only the few characters compared.
+        end = len(core)
+        trailing_count = 0
+        matched = True
+        while matched:
             matched = False
-            low = core.casefold()
-            for phrase, break_chars in self._EDGE_BREAKS:
-                if low.startswith(phrase):
-                    leading += break_chars
-                    core = core[len(phrase):].lstrip(" \t,.;:")
+            for phrase, _ in self._EDGE_BREAKS:
+                if core[max(0, end - len(phrase)):end].casefold() == phrase:
+                    end -= len(phrase)
+                    while end and core[end - 1] in " \t,.;:":
+                        end -= 1
+                    trailing_count += 1
                     matched = True
                     break
-            if not matched:
-                break
-        while True:
-            matched = False
-            low = core.casefold()
-            for phrase, break_chars in self._EDGE_BREAKS:
-                if low.endswith(phrase):
-                    trailing = break_chars + trailing
-                    core = core[: len(core) - len(phrase)].rstrip(" \t,.;:")
-                    matched = True
-                    break
-            if not matched:
-                break
-        return leading, core.strip(), trailing
+        core = core[:end]
+        return "\n" * leading_count, core.strip(), "\n" * trailing_count
 
     def _tighten_quote_spacing(self, text: str) -> str:
         """Remove spaces directly inside paired quotation marks.
@@ -477,23 +1181,13 @@ If the transcript is empty or only filler, return exactly EMPTY."""
         typography never has a space right inside a quote, so this is safe to
         fix deterministically; the space after a closing quote is untouched.
         """
-        chars = list(text)
-        is_opening = True
-        for index, char in enumerate(chars):
-            if char != '"':
-                continue
-            if is_opening:
-                cursor = index + 1
-                while cursor < len(chars) and chars[cursor] == " ":
-                    chars[cursor] = ""
-                    cursor += 1
-            else:
-                cursor = index - 1
-                while cursor >= 0 and chars[cursor] == " ":
-                    chars[cursor] = ""
-                    cursor -= 1
-            is_opening = not is_opening
-        return "".join(chars)
+        # Odd pieces lie between an opening and a closing quote; an unclosed
+        # final quote only loses the spaces after it.
+        pieces = text.split('"')
+        for index in range(1, len(pieces), 2):
+            closed = index + 1 < len(pieces)
+            pieces[index] = pieces[index].strip(" ") if closed else pieces[index].lstrip(" ")
+        return '"'.join(pieces)
 
     def _normalize_model_breaks(self, cleaned: str, core: str) -> str:
         """Collapse the model's newline clusters into single soft breaks.
@@ -502,22 +1196,19 @@ If the transcript is empty or only filler, return exactly EMPTY."""
         every spoken line-break command means the same soft break, so any run
         of newlines becomes exactly one.
         """
-        result = []
-        in_break = False
-        for char in cleaned:
-            if char == "\n":
-                if not in_break:
-                    result.append("\n")
-                in_break = True
-            else:
-                result.append(char)
-                in_break = False
-        return "".join(result)
+        return self._NEWLINE_RUN.sub("\n", cleaned)
 
     def clean(self, transcript: str) -> tuple[str, bool]:
         """Return (text, cleanup_used), falling back to raw text on failure."""
         raw = transcript.strip()
         self.last_error = None
+        if self.lexicon is not None and self.settings.get("lexicon_correction", True):
+            raw, corrections = self.lexicon.correct(raw)
+            if corrections:
+                METRICS.inc("moneypenny_lexicon_corrections_total", len(corrections))
+                logger.info("Lexicon corrections: %s", ", ".join(
+                    f"{heard!r} -> {term!r}" for heard, term in corrections
+                ))
         if not self.should_clean(raw):
             return raw, False
 
@@ -533,6 +1224,15 @@ If the transcript is empty or only filler, return exactly EMPTY."""
             return raw, False
 
         model = self.settings.get("cleanup_model", "llama-3.1-8b-instant")
+        limit_key = f"groq:{model}"
+        # Prompt plus a same-sized answer, at roughly four characters a token.
+        cost = {"requests": 1, "tokens": (len(self.SYSTEM_PROMPT) + 2 * len(core)) // 4}
+        if (self.settings.get("rate_limit_routing", True)
+                and RATE_LIMITS.wait_seconds(limit_key, "cleanup", cost) > 0):
+            self.last_error = "AI cleanup skipped to stay under Groq's rate limit; used raw transcript."
+            logger.info(self.last_error)
+            return raw, False
+        RATE_LIMITS.reserve(limit_key, cost)
         payload = {
             "model": model,
             "temperature": 0,
@@ -550,16 +1250,19 @@ If the transcript is empty or only filler, return exactly EMPTY."""
             ],
         }
         try:
-            response = requests.post(
-                "https://api.groq.com/openai/v1/chat/completions",
+            response = provider_io.run(provider_io.post(
+                f"{PROVIDER_API_URLS['groq']}/chat/completions",
                 headers={
                     "Authorization": f"Bearer {api_key}",
                     "Content-Type": "application/json",
                 },
                 json=payload,
                 timeout=8,
-            )
+            ))
+            RATE_LIMITS.observe(limit_key, response.headers)
             if response.status_code != 200:
+                METRICS.inc("moneypenny_provider_errors_total", provider="groq", request="cleanup",
+                            reason=f"http_{response.status_code}")
                 self.last_error = f"AI cleanup failed (Groq HTTP {response.status_code}); used raw transcript."
                 logger.warning("%s Response: %s", self.last_error, response.text[:300])
                 return raw, False
@@ -577,87 +1280,539 @@ If the transcript is empty or only filler, return exactly EMPTY."""
             cleaned = self._tighten_quote_spacing(cleaned)
             return leading + cleaned + trailing, True
         except Exception as exc:
+            # Unusable answers raise ValueError (including invalid JSON).
+            reason = "bad_output" if isinstance(exc, (ValueError, KeyError, IndexError)) else "connection"
+            METRICS.inc("moneypenny_provider_errors_total", provider="groq", request="cleanup", reason=reason)
             self.last_error = "AI cleanup unavailable; used raw transcript."
             logger.warning("%s (%s)", self.last_error, exc)
             return raw, False
 
 
+def _engine_authkey() -> bytes:
+    """Shared secret that lets only this user's MoneyPenny attach to its engine daemon."""
+    try:
+        return bytes.fromhex(ENGINE_KEY_FILE.read_text(encoding="utf-8").strip())
+    except (OSError, ValueError):
+        key = os.urandom(32)
+        ENGINE_KEY_FILE.write_text(key.hex(), encoding="utf-8")
+        return key
+
+
+def _create_engine(engine_mode: str) -> EngineProcess:
+    if engine_mode == "daemon":
+        return EngineDaemonClient(
+            engine_address(),
+            _engine_authkey(),
+            daemon_command(str(Path(__file__).resolve()), str(APP_DIR)),
+        )
+    return EngineProcess()
+
+
+class DecodePolicy:
+    """Choose local decoding options from the length and density of a clip.
+
+    A one-second "yes" and a ninety-second paragraph have different needs:
+    short clips are latency-bound, so they decode greedily and skip the VAD
+    pass when they are mostly speech; long clips are throughput-bound, so
+    VAD drops their pauses aggressively and the beam is capped.
+    """
+
+    SHORT_CLIP_SECONDS = 4.0
+    LONG_CLIP_SECONDS = 30.0
+    # Below this fraction of non-silent chunks a clip is "sparse" and the VAD
+    # pass pays for itself even on short clips.
+    SPARSE_SPEECH_RATIO = 0.5
+    LONG_CLIP_MAX_BEAM = 2
+    LONG_CLIP_VAD = {"min_silence_duration_ms": 500, "speech_pad_ms": 200}
+
+    def __init__(self, settings: Settings):
+        self.settings = settings
+
+    def choose(self, audio_seconds: float, speech_ratio: float) -> dict:
+        """Return the decode profile and faster-whisper options for one clip."""
+        beam_size = max(1, int(self.settings.get("beam_size", 1)))
+        if not self.settings.get("adaptive_decoding", True):
+            return {"profile": "fixed", "beam_size": beam_size, "vad_filter": True}
+
+        if audio_seconds < self.SHORT_CLIP_SECONDS:
+            return {
+                "profile": "short",
+                "beam_size": 1,
+                "vad_filter": speech_ratio < self.SPARSE_SPEECH_RATIO,
+            }
+        if audio_seconds >= self.LONG_CLIP_SECONDS:
+            return {
+                "profile": "long",
+                "beam_size": min(beam_size, self.LONG_CLIP_MAX_BEAM),
+                "vad_filter": True,
+                "vad_parameters": dict(self.LONG_CLIP_VAD),
+            }
+        return {"profile": "medium", "beam_size": beam_size, "vad_filter": True}
+
+
 class Transcriber:
     """Handles local Whisper and cloud transcription."""
 
+    # Long dictations are split into pieces of roughly this many seconds and
+    # transcribed concurrently (parallel requests or one batched decode).
+    SPLIT_TARGET_SECONDS = 12.0
+    SPLIT_MAX_SECONDS = 25.0
+    RETRY_DELAY_SECONDS = 0.8
+    # Assumed uplink (1 Mbit/s) until an upload has been timed.
+    DEFAULT_UPLOAD_BYTES_PER_SECOND = 125_000
+
     def __init__(self, settings: Settings, lexicon: Lexicon):
         self.settings = settings
         self.lexicon = lexicon
         self.model = None
         self.last_error = None
+        # Audio statistics and decoding options of the latest transcription,
+        # recorded in the history entry for later analysis.
+        self.last_decode = {}
+        self.decode_policy = DecodePolicy(settings)
+        self.engine = None
         # RLock (re-entrant) so transcribe_buffer's self-heal can call
         # load_model() while already holding the lock without deadlocking.
         self.model_lock = threading.RLock()
+        self.loading = threading.Event()  # a background load is under way
+        # Cloud upload throughput, shared with the per-clip copies of a batch.
+        self.uploads = UploadRate(self.DEFAULT_UPLOAD_BYTES_PER_SECOND)
         # Model is loaded explicitly via load_model() / load_model_async().
+        # last_used drives the idle unload; idle_unloaded marks a model the
+        # idle policy freed (not one that failed to load).
+        self.last_used = time.monotonic()
+        self.idle_unloaded = False
 
-    def load_model(self):
+    def load_model(self, cpu_threads: int = 0):
+        """Load the local model; cpu_threads=0 keeps CTranslate2's default."""
         model_size = self.settings.get("model_size", "tiny.en")
         logger.info("Loading Whisper model: '%s'...", model_size)
         try:
             with self.model_lock:
-                self.model = WhisperModel(model_size, device="cpu", compute_type="int8")
-            logger.info("Whisper model loaded.")
+                before = self._holder_memory()
+                engine_mode = self.settings.get("local_engine", "in-process")
+                # Downloads (resumable, verified) happen here, not inside
+                # WhisperModel, so a broken download never reaches the loader.
+                model_path = retry_over_ipv4(lambda session: MODEL_CACHE.ensure(model_size, session))
+                if engine_mode in ("subprocess", "daemon"):
+                    # The engine process owns the model so decoding never
+                    # holds this interpreter's GIL; self.model is its client.
+                    if self.engine is None:
+                        self.engine = _create_engine(engine_mode)
+                    self.engine.load(model_path)
+                    self.model = self.engine
+                else:
+                    self.model = WhisperModel(
+                        model_path, device="cpu", compute_type="int8", cpu_threads=cpu_threads
+                    )
+                self.last_used = time.monotonic()
+                self.idle_unloaded = False
+                after = self._holder_memory()
+            logger.info("Whisper model loaded (%s).", _memory_change(before, after))
             return True
         except Exception:
             logger.exception("Failed to load Whisper model")
             return False
 
+    def close(self):
+        """Stop the engine process, if one is running."""
+        if self.engine is not None:
+            self.engine.close()
+
     def reload_model(self):
         """Reload model after settings change."""
         return self.load_model()
 
+    def preload(self):
+        """Start loading an unloaded local model in the background.
+
+        Called when the hotkey is pressed, so after an idle unload the load
+        overlaps with the recording; the transcription then waits on
+        model_lock only for whatever part of the load is left.
+        """
+        if self.model is not None or self.settings.get("transcription_mode", "local") == "cloud":
+            return
+        self._load_in_background()
+
+    def _load_in_background(self):
+        if self.loading.is_set():
+            return
+        self.loading.set()
+
+        def _load():
+            try:
+                with self.model_lock:
+                    if self.model is None:
+                        self.load_model()
+            finally:
+                self.loading.clear()
+        threading.Thread(target=_load, name="model-preload", daemon=True).start()
+
+    def unload_if_idle(self, idle_seconds: float) -> bool:
+        """Free the local model if it has not been used for idle_seconds.
+
+        A small.en or medium.en model holds hundreds of MB to GBs; on a
+        shared machine that should not stay resident overnight. Skipped
+        while a transcription or load holds the model. Returns True if the
+        model was unloaded.
+        """
+        if self.model is None or time.monotonic() - self.last_used < idle_seconds:
+            return False
+        if not self.model_lock.acquire(blocking=False):
+            return False
+        try:
+            if self.model is None:
+                return False
+            before = self._holder_memory()
+            if self.engine is not None:
+                self.engine.unload()
+            self.model = None
+            self.idle_unloaded = True
+            gc.collect()
+            after = self._holder_memory()
+        except Exception:
+            logger.exception("Failed to unload the Whisper model")
+            return False
+        finally:
+            self.model_lock.release()
+        logger.info(
+            "Unloaded Whisper model after %.0f idle minutes (%s).",
+            idle_seconds / 60, _memory_change(before, after),
+        )
+        return True
+
+    def model_memory_bytes(self):
+        """Resident memory of the process holding the model; None if none is loaded.
+
+        An engine process or daemon reports its own working set. An
+        in-process model is counted as this process's working set, which
+        the model dominates.
+        """
+        if self.model is None:
+            return None
+        return self._holder_memory()
+
+    def _holder_memory(self):
+        if self.engine is not None:
+            return process_memory_bytes(self.engine.pid) if self.engine.pid else None
+        return process_memory_bytes()
+
+    @property
+    def spans(self) -> dict:
+        """Latency spans (ms) of the current transcription, kept in last_decode."""
+        return self.last_decode.setdefault("spans", {})
+
     def transcribe(self, audio_frames: list) -> str:
         """Transcribe audio frames using the configured backend (local or cloud)."""
-        self.last_error = None
-        if not audio_frames:
-            return ""
+        text, wav_buffers = self._begin(audio_frames)
+        if wav_buffers is None:
+            return text
+        return self._transcribe_cloud(wav_buffers)
 
-        wav_buffer = self._frames_to_wav(audio_frames)
+    def _begin(self, audio_frames: list) -> tuple:
+        """Reset the per-call state and do everything up to the cloud upload.
+
+        Returns (text, None) once a clip is finished here (no speech, Local
+        mode, or routed locally near the rate limit), else ("", wav_buffers)
+        to upload.
+        """
+        self.last_error = None
+        self.last_decode = {}
+        started = time.perf_counter()
+        segments = self._prepare_audio(audio_frames)
+        _add_span(self.spans, "prepare_ms", started)
+        if not segments:
+            return "", None
         mode = self.settings.get("transcription_mode", "local")
+        if mode == "cloud" and self._near_rate_limit(len(segments)):
+            logger.info("Cloud provider is near its rate limit; transcribing locally")
+            self.last_decode["routed"] = "local (rate limit)"
+            return self._transcribe_local(segments), None
         if mode == "cloud":
-            return self._transcribe_cloud(wav_buffer)
-        return self._transcribe_local(wav_buffer)
+            started = time.perf_counter()
+            wav_buffers = [self._frames_to_wav(seg) for seg in segments]
+            _add_span(self.spans, "encode_ms", started)
+            return "", wav_buffers
+        return self._transcribe_local(segments), None
+
+    def cloud_wait_seconds(self, priority: str = "background", requests_needed: int = 1) -> float:
+        """Seconds until the cloud provider has quota for this priority (0 = now)."""
+        if self.settings.get("transcription_mode", "local") != "cloud":
+            return 0.0
+        return RATE_LIMITS.wait_seconds(
+            self._cloud_limit_key(), priority, {"requests": requests_needed}
+        )
 
-    def _frames_to_wav(self, audio_frames: list) -> io.BytesIO:
-        """Package raw audio frames into an in-memory WAV buffer.
+    def _near_rate_limit(self, requests_needed: int) -> bool:
+        """True if this dictation should go to the local model to spare the quota.
+
+        Cloud mode never loads the local model, and loading it here (maybe a
+        full download) would stall the dictation, so routing waits until the
+        model is loaded. It starts loading in the background once the quota
+        dips into the background reserve, ahead of the dictation running out.
+        """
+        if not self.settings.get("rate_limit_routing", True):
+            return False
+        if self.model is None:
+            if self.cloud_wait_seconds("background", requests_needed) > 0:
+                self._load_in_background()
+            return False
+        return self.cloud_wait_seconds("dictation", requests_needed) > 0
+
+    def _cloud_limit_key(self) -> str:
+        if self.settings.get("cloud_provider", "openrouter") == "groq":
+            return f"groq:{self.settings.get('groq_model', 'whisper-large-v3-turbo')}"
+        return f"openrouter:{self.settings.get('cloud_model', 'openai/gpt-transcribe')}"
+
+    def transcribe_batch(self, clips: list) -> list:
+        """Transcribe several queued dictations at once.
+
+        Returns one (text, error, decode) tuple per clip, in order. In Local
+        mode, every clip that fits in a single piece is decoded in one batched
+        forward pass instead of one model call per dictation, and split long
+        dictations take their normal path. In Cloud mode every clip's pieces
+        are uploaded together on the provider I/O loop (up to
+        parallel_workers at a time).
+        """
+        local = self.settings.get("transcription_mode", "local") != "cloud"
+        if not local and len(clips) > 1:
+            return self._transcribe_cloud_batch(clips)
+
+        results = [None] * len(clips)
+        single_pieces = []
+        for index, clip in enumerate(clips):
+            self.last_error = None
+            self.last_decode = {}
+            if local:
+                started = time.perf_counter()
+                segments = self._prepare_audio(clip)
+                _add_span(self.spans, "prepare_ms", started)
+            else:
+                segments = None
+            if local and segments and len(segments) == 1:
+                single_pieces.append((index, segments[0], self.last_decode))
+                continue
+            if local:
+                text = self._transcribe_local(segments) if segments else ""
+            else:
+                text = self.transcribe(clip)
+            results[index] = (text, self.last_error, self.last_decode)
+
+        if len(single_pieces) == 1:
+            index, piece, self.last_decode = single_pieces[0]
+            self.last_error = None
+            text = self._transcribe_local([piece])
+            results[index] = (text, self.last_error, self.last_decode)
+        elif single_pieces:
+            self._transcribe_local_group(single_pieces, results)
+        return results
+
+    def _transcribe_cloud_batch(self, clips: list) -> list:
+        """Prepare each clip in turn, then gather all their uploads on provider_io.
+
+        Each clip runs on a shallow copy, so it keeps its own last_error and
+        last_decode while sharing settings, lexicon, model, and the upload
+        rate estimate; no thread is held per clip.
+        """
+        results = [None] * len(clips)
+        uploads = []
+        for index, clip in enumerate(clips):
+            worker = copy.copy(self)
+            text, wav_buffers = worker._begin(clip)
+            if wav_buffers is None:
+                results[index] = (text, worker.last_error, worker.last_decode)
+            else:
+                uploads.append((index, worker, wav_buffers))
+
+        async def _gather():
+            slots = asyncio.Semaphore(self._parallel_workers())
+            return await asyncio.gather(*(
+                worker._transcribe_cloud_async(wav_buffers, slots)
+                for _, worker, wav_buffers in uploads
+            ))
+
+        if uploads:
+            for (index, worker, _), text in zip(uploads, provider_io.run(_gather())):
+                results[index] = (text, worker.last_error, worker.last_decode)
+        return results
+
+    def _transcribe_local_group(self, pieces: list, results: list):
+        """Decode (index, frames, decode) pieces together into results."""
+        try:
+            waited = time.perf_counter()
+            with self.model_lock:
+                model_wait = _elapsed_ms(waited)
+                if not self._ensure_model():
+                    raise RuntimeError("Whisper model is not loaded")
+                # One batch shares one beam; the longest clip sets the profile.
+                longest = max(pieces, key=lambda piece: len(piece[1]))[2]
+                decode = self._choose_decode(longest)
+                started = time.perf_counter()
+                texts = self._decode_clips(
+                    [frames for _, frames, _ in pieces],
+                    self._local_kwargs(decode),
+                    batch_size=len(pieces),
+                )
+                self.last_used = time.monotonic()
+                decode_ms = _elapsed_ms(started)
+            logger.info("Batched %d queued dictations into one decode", len(pieces))
+            for (index, _, clip_decode), text in zip(pieces, texts):
+                clip_decode.update(decode, batched=len(pieces))
+                clip_decode.setdefault("spans", {}).update(
+                    model_wait_ms=model_wait, decode_ms=decode_ms
+                )
+                results[index] = (text, None, clip_decode)
+        except Exception:
+            logger.exception("Local transcription failed")
+            error = "Local transcription failed. Check the Status tab or log for details."
+            for index, _, clip_decode in pieces:
+                results[index] = ("", error, clip_decode)
+
+    def _prepare_audio(self, audio_frames: list):
+        """Gate, trim, and split captured audio; return pieces or None.
 
         Trailing silence is trimmed first: Whisper tends to hallucinate
         stock phrases like "Thank you." when a recording ends with dead
         air, and cutting that silence removes the trigger without ever
-        touching actual speech.
+        touching actual speech. Leading silence and long pauses are then
+        shortened so less audio is uploaded and decoded. Fills last_decode.
+        """
+        if not audio_frames:
+            return None
+        peaks = [_chunk_peak(chunk) for chunk in audio_frames]
+        if not self._has_speech(peaks):
+            return None
+        frames = self._trim_trailing_silence(audio_frames, peaks)
+        peaks = peaks[:len(frames)]
+        frames, peaks = self._compact_silence(frames, peaks)
+        speech_ratio = sum(peak >= SILENCE_PEAK for peak in peaks) / len(peaks)
+        self.last_decode = {
+            "captured_seconds": round(len(audio_frames) * CHUNK / RATE, 2),
+            "audio_seconds": round(len(frames) * CHUNK / RATE, 2),
+            "speech_ratio": round(speech_ratio, 2),
+        }
+
+        segments = self._split_at_silences(frames, peaks)
+        self.last_decode["segments"] = len(segments)
+        return segments
+
+    def _has_speech(self, peaks: list) -> bool:
+        """Cheap local voice-activity gate, run before any model or network call.
+
+        Accidental hotkey taps capture only the pre-roll and room noise.
+        Sending that to the backend costs a model pass or a full network
+        round trip and invites a hallucinated "Thank you.", so clips without
+        enough speech energy end here.
         """
-        frames = self._trim_trailing_silence(audio_frames)
+        if not self.settings.get("speech_gate", True):
+            return True
+        speech_chunks = sum(peak >= SILENCE_PEAK for peak in peaks)
+        if speech_chunks >= MIN_SPEECH_CHUNKS:
+            return True
+        logger.info(
+            "Speech gate: no speech in %.2fs of audio; skipped transcription",
+            len(peaks) * CHUNK / RATE,
+        )
+        return False
+
+    def _compact_silence(self, audio_frames: list, peaks: list) -> tuple[list, list]:
+        """Drop leading silence and shorten long pauses inside a dictation.
+
+        A slow start and mid-sentence thinking pauses are dead air that is
+        otherwise encoded, uploaded, and decoded. Returns the kept frames and
+        their matching peaks.
+        """
+        if not self.settings.get("compress_pauses", True):
+            return audio_frames, peaks
+        first_speech = next(
+            (index for index, peak in enumerate(peaks) if peak >= SILENCE_PEAK), None
+        )
+        if first_speech is None:
+            return audio_frames, peaks
+
+        start = max(0, first_speech - LEAD_PAD_CHUNKS)
+        kept_frames, kept_peaks = [], []
+        silent_run = 0
+        for chunk, peak in zip(audio_frames[start:], peaks[start:]):
+            if peak < SILENCE_PEAK:
+                silent_run += 1
+                if silent_run > MAX_PAUSE_CHUNKS:
+                    continue
+            else:
+                silent_run = 0
+            kept_frames.append(chunk)
+            kept_peaks.append(peak)
+
+        removed_pauses = len(audio_frames) - start - len(kept_frames)
+        METRICS.inc("moneypenny_silence_trimmed_seconds_total", start * CHUNK / RATE, position="leading")
+        METRICS.inc("moneypenny_silence_trimmed_seconds_total", removed_pauses * CHUNK / RATE, position="pause")
+        if start or removed_pauses:
+            logger.info(
+                "Removed %.2fs of leading silence and %.2fs of long pauses (%.2fs -> %.2fs)",
+                start * CHUNK / RATE,
+                removed_pauses * CHUNK / RATE,
+                len(audio_frames) * CHUNK / RATE,
+                len(kept_frames) * CHUNK / RATE,
+            )
+        return kept_frames, kept_peaks
+
+    def _split_at_silences(self, audio_frames: list, peaks: list) -> list:
+        """Split a long dictation into pieces that can be transcribed concurrently.
+
+        Each cut lands on the quietest chunk between SPLIT_TARGET_SECONDS and
+        SPLIT_MAX_SECONDS into the current piece, which after pause
+        compression is almost always a natural silence. Short dictations, and
+        a parallel_workers setting of 1, keep the single-request path.
+        """
+        target = int(self.SPLIT_TARGET_SECONDS * RATE / CHUNK)
+        limit = int(self.SPLIT_MAX_SECONDS * RATE / CHUNK)
+        if len(audio_frames) <= limit or self._parallel_workers() < 2:
+            return [audio_frames]
+
+        segments = []
+        start = 0
+        while len(audio_frames) - start > limit:
+            window = peaks[start + target:start + limit]
+            cut = start + target + window.index(min(window)) + 1
+            segments.append(audio_frames[start:cut])
+            start = cut
+        segments.append(audio_frames[start:])
+        logger.info(
+            "Split %.2fs dictation into %d pieces at silences",
+            len(audio_frames) * CHUNK / RATE,
+            len(segments),
+        )
+        return segments
+
+    def _parallel_workers(self) -> int:
+        return max(1, int(self.settings.get("parallel_workers", 4) or 1))
+
+    def _frames_to_wav(self, audio_frames: list) -> io.BytesIO:
+        """Package raw audio frames into an in-memory WAV buffer."""
         wav_buffer = io.BytesIO()
         with wave.open(wav_buffer, "wb") as wf:
             wf.setnchannels(CHANNELS)
             wf.setsampwidth(2)  # paInt16 = 2 bytes
             wf.setframerate(RATE)
-            wf.writeframes(b"".join(frames))
+            wf.writeframes(b"".join(audio_frames))
         wav_buffer.seek(0)
         return wav_buffer
 
-    def _trim_trailing_silence(self, audio_frames: list) -> list:
+    def _trim_trailing_silence(self, audio_frames: list, peaks: list = None) -> list:
         """Drop near-silent chunks from the END of the recording only."""
         if not audio_frames:
             return audio_frames
+        if peaks is None:
+            peaks = [_chunk_peak(chunk) for chunk in audio_frames]
 
-        from array import array
-        SILENCE_PEAK = 500   # int16 amplitude below this counts as silence
         MIN_CHUNKS = 5       # always keep at least ~0.3s of audio
 
         cut = len(audio_frames)
-        while cut > MIN_CHUNKS:
-            samples = array("h", audio_frames[cut - 1])
-            peak = max((abs(s) for s in samples), default=0)
-            if peak >= SILENCE_PEAK:
-                break
+        while cut > MIN_CHUNKS and peaks[cut - 1] < SILENCE_PEAK:
             cut -= 1
 
+        METRICS.inc("moneypenny_silence_trimmed_seconds_total",
+                    (len(audio_frames) - cut) * CHUNK / RATE, position="trailing")
         if cut < len(audio_frames):
             logger.info(
                 "Trimmed %.2fs of trailing silence",
@@ -665,54 +1820,142 @@ class Transcriber:
             )
         return audio_frames[:cut]
 
-    def _transcribe_local(self, wav_buffer: io.BytesIO) -> str:
-        """Transcribe locally with faster-whisper (CPU)."""
+    def _transcribe_local(self, segments: list) -> str:
+        """Transcribe locally with faster-whisper (CPU).
+
+        A single piece goes through WhisperModel.transcribe; the pieces of a
+        split long dictation are decoded together by faster-whisper's batched
+        pipeline, one clip per batch slot. Audio is passed as a waveform, so
+        no WAV is packed or decoded on this path.
+        """
         try:
+            waited = time.perf_counter()
             with self.model_lock:
-                if self.model is None:
-                    # Model failed to load earlier (e.g. download interrupted).
-                    # Try once more so the app can recover without a restart.
-                    logger.warning("Model not loaded; attempting reload...")
-                    if not self.load_model():
-                        return ""
-
-                beam_size = self.settings.get("beam_size", 1)
-                prompt = self.lexicon.get_prompt()
-
-                # Speed-oriented options for short dictation:
-                # - vad_filter skips silence so Whisper processes less audio
-                # - without_timestamps skips timestamp calculation
-                # - condition_on_previous_text=False avoids extra context passes
-                transcribe_kwargs = dict(
-                    beam_size=beam_size,
-                    language="en",
-                    vad_filter=True,
-                    without_timestamps=True,
-                    condition_on_previous_text=False,
-                )
-                if prompt:
-                    transcribe_kwargs["initial_prompt"] = prompt
+                _add_span(self.spans, "model_wait_ms", waited)
+                if not self._ensure_model():
+                    return ""
+
+                decode = self._choose_decode(self.last_decode)
+                self.last_decode.update(decode)
+                transcribe_kwargs = self._local_kwargs(decode)
 
-                segments, info = self.model.transcribe(wav_buffer, **transcribe_kwargs)
-                return "".join(segment.text for segment in segments).strip()
+                started = time.perf_counter()
+                texts = self._decode_clips(
+                    segments, transcribe_kwargs, batch_size=self._parallel_workers()
+                )
+                self.last_used = time.monotonic()
+                _add_span(self.spans, "decode_ms", started)
+                return " ".join(text for text in texts if text)
         except Exception:
-            self.last_error = "Local transcription failed. Check the Status tab or log for details."
+            self._fail("Local transcription failed. Check the Status tab or log for details.")
             logger.exception("Local transcription failed")
             return ""
 
-    def _transcribe_cloud(self, wav_buffer: io.BytesIO) -> str:
-        """Transcribe via the configured cloud provider (Groq or OpenRouter)."""
+    def _ensure_model(self) -> bool:
+        """Load the model if an earlier load failed. Call with model_lock held."""
+        if self.model is None:
+            if self.idle_unloaded:
+                logger.info("Reloading the Whisper model unloaded while idle...")
+            else:
+                # Model failed to load earlier (e.g. download interrupted).
+                # Try once more so the app can recover without a restart.
+                logger.warning("Model not loaded; attempting reload...")
+            return self.load_model()
+        return True
+
+    def _choose_decode(self, audio_stats: dict) -> dict:
+        decode = self.decode_policy.choose(
+            audio_stats.get("audio_seconds", 0.0),
+            audio_stats.get("speech_ratio", 1.0),
+        )
+        decode["model_size"] = self.settings.get("model_size", "tiny.en")
+        return decode
+
+    def _local_kwargs(self, decode: dict) -> dict:
+        """faster-whisper options for one decode profile."""
+        # Speed-oriented options for dictation:
+        # - beam_size and vad_filter come from the decode policy
+        # - without_timestamps skips timestamp calculation
+        # - condition_on_previous_text=False avoids extra context passes
+        transcribe_kwargs = dict(
+            beam_size=decode["beam_size"],
+            language="en",
+            vad_filter=decode["vad_filter"],
+            without_timestamps=True,
+            condition_on_previous_text=False,
+        )
+        if "vad_parameters" in decode:
+            transcribe_kwargs["vad_parameters"] = decode["vad_parameters"]
+        prompt = self.lexicon.get_prompt()
+        if prompt:
+            transcribe_kwargs["initial_prompt"] = prompt
+        return transcribe_kwargs
+
+    def _decode_clips(self, clips: list, transcribe_kwargs: dict, batch_size: int) -> list:
+        """Decode frame lists with the loaded model; return one text per clip.
+
+        Runs in the engine process when one owns the model. Call with
+        model_lock held.
+        """
+        pcm = b"".join(b"".join(clip) for clip in clips)
+        bounds = []
+        offset = 0
+        for clip in clips:
+            samples = sum(len(chunk) for chunk in clip) // 2
+            bounds.append((offset, offset + samples))
+            offset += samples
+        if isinstance(self.model, EngineProcess):
+            return self.model.decode(pcm, bounds, transcribe_kwargs, batch_size)
+        return decode_clips(
+            self.model, pcm_to_float32(pcm), bounds, transcribe_kwargs, batch_size
+        )
+
+    def _transcribe_cloud(self, wav_buffers: list) -> str:
+        """Transcribe via the configured cloud provider (Groq or OpenRouter).
+
+        The pieces of a split long dictation are sent as concurrent requests
+        and stitched back in order; any failed piece fails the dictation.
+        """
+        return provider_io.run(self._transcribe_cloud_async(wav_buffers))
+
+    async def _transcribe_cloud_async(self, wav_buffers: list, slots=None) -> str:
+        target = self._cloud_target()
+        if target is None:
+            return ""
+        RATE_LIMITS.reserve(self._cloud_limit_key(), {"requests": len(wav_buffers)})
+        started = time.perf_counter()
+        texts = await self._cloud_requests_async(wav_buffers, target, slots)
+        _add_span(self.spans, "upload_ms", started)
+        if self.last_error:
+            return ""
+        return " ".join(text for text in texts if text)
+
+    async def _cloud_requests_async(self, wav_buffers: list, target: dict, slots=None) -> list:
+        """Upload pieces concurrently on the I/O loop, parallel_workers at a time.
+
+        A batch passes one slots semaphore for all its clips' pieces.
+        """
+        if slots is None:
+            slots = asyncio.Semaphore(self._parallel_workers())
+
+        async def _one(buffer):
+            async with slots:
+                return await self._cloud_request_async(buffer, **target)
+
+        return await asyncio.gather(*(_one(buffer) for buffer in wav_buffers))
+
+    def _cloud_target(self):
+        """Return _cloud_request arguments for the configured provider, or None."""
         provider = self.settings.get("cloud_provider", "openrouter")
 
         if provider == "groq":
             api_key = (self.settings.get("groq_api_key") or "").strip()
             if not api_key:
-                self.last_error = "Add a Groq API key in Settings or switch to Local mode."
+                self._fail("Add a Groq API key in Settings or switch to Local mode.")
                 logger.error("Cloud mode is on (Groq) but no Groq API key is set.")
-                return ""
-            return self._cloud_request(
-                wav_buffer,
-                url="https://api.groq.com/openai/v1/audio/transcriptions",
+                return None
+            return dict(
+                url=f"{PROVIDER_API_URLS['groq']}/audio/transcriptions",
                 api_key=api_key,
                 model=self.settings.get("groq_model", "whisper-large-v3-turbo"),
                 extra_headers={},
@@ -722,12 +1965,11 @@ class Transcriber:
         # Default: OpenRouter
         api_key = (self.settings.get("openrouter_api_key") or "").strip()
         if not api_key:
-            self.last_error = "Add an OpenRouter API key in Settings or switch to Local mode."
+            self._fail("Add an OpenRouter API key in Settings or switch to Local mode.")
             logger.error("Cloud mode is on but no OpenRouter API key is set.")
-            return ""
-        return self._cloud_request(
-            wav_buffer,
-            url="https://openrouter.ai/api/v1/audio/transcriptions",
+            return None
+        return dict(
+            url=f"{PROVIDER_API_URLS['openrouter']}/audio/transcriptions",
             api_key=api_key,
             model=self.settings.get("cloud_model", "openai/gpt-transcribe"),
             extra_headers={
@@ -738,7 +1980,21 @@ class Transcriber:
             provider_name="OpenRouter",
         )
 
-    def _cloud_request(
+    def _fail(self, message: str, retryable: bool = False):
+        """Record why this transcription failed.
+
+        decode["retryable"] tells the caller whether the same audio could
+        succeed later (connection errors, timeouts, 429, 5xx) and is worth
+        keeping in the offline queue; a rejected key or request never will.
+        """
+        self.last_error = message
+        self.last_decode["retryable"] = retryable
+
+    def _cloud_request(self, wav_buffer: io.BytesIO, **target) -> str:
+        """Send audio to an OpenAI-compatible transcription endpoint."""
+        return provider_io.run(self._cloud_request_async(wav_buffer, **target))
+
+    async def _cloud_request_async(
         self,
         wav_buffer: io.BytesIO,
         url: str,
@@ -747,7 +2003,6 @@ class Transcriber:
         extra_headers: dict,
         provider_name: str,
     ) -> str:
-        """Send audio to an OpenAI-compatible transcription endpoint."""
         headers = {"Authorization": f"Bearer {api_key}"}
         headers.update(extra_headers)
         data = {
@@ -760,32 +2015,603 @@ class Transcriber:
         if prompt:
             data["prompt"] = prompt
 
+        audio = wav_buffer.getvalue()
+
+        def request(on_sent):
+            # Each send (retry or hedge) gets its own file object.
+            files = {"file": ("audio.wav", io.BytesIO(audio), "audio/wav")}
+            return provider_io.post(
+                url, headers=headers, files=files, data=data, timeout=30, on_sent=on_sent
+            )
+
         # Provider hiccups (5xx responses, dropped connections) are common
         # and brief, so try once more before failing the dictation.
         for attempt in (1, 2):
-            wav_buffer.seek(0)
-            files = {"file": ("audio.wav", wav_buffer, "audio/wav")}
             try:
-                resp = requests.post(url, headers=headers, files=files, data=data, timeout=30)
+                # Only the first attempt is hedged: at most three uploads a piece.
+                resp = await self._hedged(request, provider_name, len(audio), hedge=attempt == 1)
+                RATE_LIMITS.observe(self._cloud_limit_key(), resp.headers)
+                # Providers that report their processing time split upload
+                # from server time; concurrent pieces wait for the slowest.
+                server_ms = _header_number(resp.headers, "openai-processing-ms")
+                if server_ms is not None:
+                    self.spans["server_ms"] = max(self.spans.get("server_ms", 0.0), server_ms)
                 if resp.status_code == 200:
                     return resp.json().get("text", "").strip()
+                METRICS.inc("moneypenny_provider_errors_total", provider=provider_name.lower(),
+                            request="transcription", reason=f"http_{resp.status_code}")
                 if resp.status_code in (401, 403):
-                    self.last_error = f"{provider_name} rejected the API key. Check it in Settings."
+                    self._fail(f"{provider_name} rejected the API key. Check it in Settings.")
                     logger.error("%s API error %s: %s", provider_name, resp.status_code, resp.text[:300])
                     return ""
                 logger.error("%s API error %s: %s", provider_name, resp.status_code, resp.text[:300])
                 if resp.status_code < 500 or attempt == 2:
-                    self.last_error = f"{provider_name} transcription failed (HTTP {resp.status_code})."
+                    # Overload and rate limiting pass; other client errors never will.
+                    self._fail(
+                        f"{provider_name} transcription failed (HTTP {resp.status_code}).",
+                        retryable=resp.status_code >= 500 or resp.status_code == 429,
+                    )
                     return ""
             except Exception:
                 logger.exception("Cloud transcription request failed (%s)", provider_name)
+                METRICS.inc("moneypenny_provider_errors_total", provider=provider_name.lower(),
+                            request="transcription", reason="connection")
                 if attempt == 2:
-                    self.last_error = f"{provider_name} connection failed. Check your internet connection."
+                    self._fail(
+                        f"{provider_name} connection failed. Check your internet connection.",
+                        retryable=True,
+                    )
                     return ""
             logger.info("%s request failed; retrying once...", provider_name)
-            time.sleep(0.8)
+            METRICS.inc("moneypenny_provider_retries_total", provider=provider_name.lower())
+            await asyncio.sleep(self.RETRY_DELAY_SECONDS)
         return ""
 
+    async def _hedged(self, request, provider_name: str, size: int, hedge: bool = True):
+        """Await request(); if it stalls past its expected time, race a second copy.
+
+        Tail latency on hosted Whisper is dominated by the occasional stalled
+        upload, so a duplicate sent after the normal response time usually
+        returns first. The loser is cancelled. The expected time is
+        cloud_hedge_seconds plus size at the observed upload rate, so a
+        long piece on a slow uplink is not mistaken for a stall. Hedging
+        only happens while the rate-limit budget has background headroom
+        to spare.
+        """
+        started = time.perf_counter()
+        sent = []
+        first = asyncio.ensure_future(request(lambda: sent.append(time.perf_counter())))
+        hedge_after = self._hedge_after(size) if hedge else 0.0
+        if hedge_after <= 0:
+            return self._timed_upload(await first, size, started, sent)
+        done, _ = await asyncio.wait({first}, timeout=hedge_after)
+        if done or self.cloud_wait_seconds("background") > 0:
+            return self._timed_upload(await first, size, started, sent)
+
+        logger.info("%s slow after %.1fs; sending a hedged request", provider_name, hedge_after)
+        METRICS.inc("moneypenny_provider_hedges_total", provider=provider_name.lower())
+        RATE_LIMITS.reserve(self._cloud_limit_key(), {"requests": 1})
+        pending = {first, asyncio.ensure_future(request(lambda: None))}
+        try:
+            while True:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None or not pending:
+                        return task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def _hedge_after(self, size: int) -> float:
+        """Seconds to wait for an upload of size bytes before hedging it (0 = never)."""
+        slack = self.settings.get("cloud_hedge_seconds", 2.5)
+        if not isinstance(slack, (int, float)) or slack <= 0:
+            return 0.0
+        return slack + self.uploads.seconds_for(size)
+
+    def _timed_upload(self, response, size: int, started: float, sent: list):
+        """Fold an unhedged request's upload time, until its body was sent
+        (not its answer, which includes server time), into the estimate."""
+        if sent:
+            self.uploads.observe(size, sent[0] - started)
+        return response
+
+
+def load_audio_frames(data: bytes) -> list:
+    """Split an audio file's bytes into capture-sized 16 kHz mono int16 chunks.
+
+    WAV files already in the capture format are read directly; anything
+    else (FLAC, MP3, other rates) is decoded and resampled by PyAV through
+    faster-whisper.
+    """
+    pcm = None
+    try:
+        with wave.open(io.BytesIO(data), "rb") as wf:
+            if (wf.getnchannels(), wf.getsampwidth(), wf.getframerate()) == (CHANNELS, 2, RATE):
+                pcm = wf.readframes(wf.getnframes())
+    except (wave.Error, EOFError):
+        pass
+    if pcm is None:
+        pcm = float32_to_pcm(decode_audio(io.BytesIO(data), sampling_rate=RATE))
+    step = CHUNK * 2
+    return [pcm[offset:offset + step] for offset in range(0, len(pcm), step)]
+
+
+def frames_to_flac(audio_frames: list) -> bytes:
+    """Losslessly compress captured frames (about a quarter of the WAV size)."""
+    buffer = io.BytesIO()
+    samples = np.frombuffer(b"".join(audio_frames), dtype=np.int16).reshape(1, -1)
+    with av.open(buffer, "w", format="flac") as container:
+        stream = container.add_stream("flac", rate=RATE)
+        stream.layout = "mono"
+        frame = av.AudioFrame.from_ndarray(samples, format="s16", layout="mono")
+        frame.sample_rate = RATE
+        for packet in stream.encode(frame):
+            container.mux(packet)
+        for packet in stream.encode(None):
+            container.mux(packet)
+    return buffer.getvalue()
+
+
+class DictationProfiler:
+    """cProfile of the next N dictations' hot path, on request.
+
+    Transcription (on the batcher thread) and cleanup and typing (on the
+    dictation worker) run inside section(); their stats are merged. Once N
+    dictations have finished, the profile is written to the log folder as
+    a .prof file (open with pstats or snakeviz) and a .txt summary, and
+    profiling stops. Python 3.12+ allows one active cProfile per process,
+    so a section that overlaps another one runs unprofiled.
+    """
+
+    TOP_N = 15
+
+    def __init__(self, directory: Path = LOG_DIR):
+        self.directory = directory
+        self.lock = threading.Lock()
+        self.running = threading.Lock()
+        self.remaining = 0
+        self.stats = None
+        self.last_report = None
+
+    @property
+    def active(self) -> bool:
+        return self.remaining > 0
+
+    def start(self, dictations: int):
+        with self.lock:
+            self.remaining = max(0, dictations)
+            self.stats = None
+        logger.info("Profiling the next %d dictations", dictations)
+
+    @contextlib.contextmanager
+    def section(self):
+        """Profile the enclosed code while profiling is on."""
+        if not self.active or not self.running.acquire(blocking=False):
+            yield
+            return
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+            yield
+        finally:
+            profile.disable()
+            self.running.release()
+            with self.lock:
+                if self.stats is None:
+                    self.stats = pstats.Stats(profile)
+                else:
+                    self.stats.add(profile)
+
+    def dictation_done(self):
+        """Count a finished dictation; return the report when the last one ends."""
+        with self.lock:
+            if not self.remaining:
+                return None
+            self.remaining -= 1
+            if self.remaining:
+                return None
+            stats, self.stats = self.stats, None
+        if stats is None:
+            return None
+        return self._write_report(stats)
+
+    def _write_report(self, stats: pstats.Stats) -> dict:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.directory / f"profile-{datetime.now():%Y-%m-%d_%H-%M-%S}.prof"
+        stats.dump_stats(path)
+        summary = io.StringIO()
+        stats.stream = summary
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(40)
+        path.with_suffix(".txt").write_text(summary.getvalue(), encoding="utf-8")
+
+        rows = []
+        ranked = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)
+        for (filename, line, function), (_, calls, own, cumulative, _) in ranked[:self.TOP_N]:
+            location = f"{Path(filename).name}:{line}" if line else filename
+            rows.append({
+                "function": f"{function} ({location})",
+                "calls": calls,
+                "own_ms": round(own * 1000, 1),
+                "cumulative_ms": round(cumulative * 1000, 1),
+            })
+        self.last_report = {"path": path, "rows": rows}
+        logger.info("Profile saved to %s", path)
+        return self.last_report
+
+
+PROFILER = DictationProfiler()
+
+
+class TranscriptionBatcher:
+    """Queue dictations for transcription and decode bursts together.
+
+    One worker thread owns transcription. Each submitted clip gets a Future
+    resolving to (text, error, decode). When the worker picks up a clip it
+    also takes every clip already waiting, so dictations that queued behind
+    a slow decode share one batched forward pass. It only lingers for more
+    clips (up to max_wait seconds) while should_wait() says another
+    dictation is being recorded, so a lone dictation never waits.
+    """
+
+    MAX_BATCH = 8
+
+    def __init__(self, transcriber: Transcriber, max_wait: float = 0.1,
+                 should_wait=None):
+        self.transcriber = transcriber
+        self.max_wait = max_wait
+        self.should_wait = should_wait or (lambda: False)
+        self.jobs = queue.Queue()
+        self.worker = None
+        self.start_lock = threading.Lock()
+
+    def submit(self, audio_frames: list) -> Future:
+        future = Future()
+        self.jobs.put((audio_frames, future, time.perf_counter()))
+        with self.start_lock:
+            if self.worker is None:
+                self.worker = threading.Thread(target=self._run, daemon=True)
+                self.worker.start()
+        return future
+
+    def _collect(self) -> list:
+        batch = [self.jobs.get()]
+        deadline = time.monotonic() + (self.max_wait if self.should_wait() else 0)
+        while len(batch) < self.MAX_BATCH:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining > 0:
+                    batch.append(self.jobs.get(timeout=remaining))
+                else:
+                    batch.append(self.jobs.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            started = time.perf_counter()
+            try:
+                with PROFILER.section():
+                    results = self.transcriber.transcribe_batch([frames for frames, _, _ in batch])
+            except Exception as exc:
+                logger.exception("Batched transcription failed")
+                for _, future, _ in batch:
+                    future.set_exception(exc)
+                continue
+            for (_, future, submitted), result in zip(batch, results):
+                decode = result[2]
+                if isinstance(decode, dict):
+                    decode.setdefault("spans", {})["batch_wait_ms"] = _elapsed_ms(submitted, started)
+                future.set_result(result)
+
+
+class SpeechOnsetDetector:
+    """Cheap energy detector that drives hands-free recording.
+
+    Fed one chunk peak at a time from the warm microphone stream. Speech
+    starts after MIN_SPEECH_CHUNKS loud chunks in a row and ends after
+    silence_seconds of quiet chunks. "Loud" means above SILENCE_PEAK or
+    three times the running noise floor, whichever is higher, so a steady
+    fan or hum does not keep triggering recordings. Costs one max/min over
+    each 64 ms chunk, which the peak calculation already does in C.
+    """
+
+    NOISE_FLOOR_WEIGHT = 0.05
+
+    def __init__(self, silence_seconds: float = 1.0):
+        self.silence_chunks = max(1, int(silence_seconds * RATE / CHUNK))
+        self.noise_floor = 0.0
+        self.active = False
+        self.loud_run = 0
+        self.quiet_run = 0
+
+    def threshold(self) -> float:
+        return max(SILENCE_PEAK, 3 * self.noise_floor)
+
+    def update(self, peak: int):
+        """Return "start" on speech onset, "stop" after the silence, else None."""
+        loud = peak >= self.threshold()
+        if not self.active:
+            if loud:
+                self.loud_run += 1
+            else:
+                self.loud_run = 0
+                self.noise_floor += self.NOISE_FLOOR_WEIGHT * (peak - self.noise_floor)
+            if self.loud_run >= MIN_SPEECH_CHUNKS:
+                self.active = True
+                self.quiet_run = 0
+                return "start"
+            return None
+        self.quiet_run = 0 if loud else self.quiet_run + 1
+        if self.quiet_run >= self.silence_chunks:
+            self.active = False
+            self.loud_run = 0
+            return "stop"
+        return None
+
+
+class CaptureGapDetector:
+    """Spots microphone overflows: input the device captured but nobody read.
+
+    Reads pass exception_on_overflow=False so an overflow never costs the
+    chunk being read, which also means PyAudio does not report one. So the
+    stream's sample count is compared with the wall clock instead: once the
+    backlog is drained, a read returns about when its last sample was
+    captured, so if elapsed time runs more than GAP_SECONDS ahead of the
+    samples read (beyond the stream's fixed latency), input was dropped.
+    The reference is reset every RESYNC_SECONDS so device clock drift never
+    adds up to a false gap.
+    """
+
+    GAP_SECONDS = 0.2
+    RESYNC_SECONDS = 30.0
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self, now: float = None):
+        self.started = time.monotonic() if now is None else now
+        self.samples = 0
+        self.baseline = None  # the stream's latency, measured on the first check
+
+    def update(self, samples: int, backlog: int, now: float = None) -> float:
+        """Count one read; return the seconds of input lost (0.0 when none)."""
+        now = time.monotonic() if now is None else now
+        self.samples += samples
+        if backlog >= CHUNK:
+            return 0.0  # still catching up; buffered input is not lost
+        lag = (now - self.started) - self.samples / RATE
+        if self.baseline is None:
+            self.baseline = lag
+            return 0.0
+        lost = lag - self.baseline
+        if lost > self.GAP_SECONDS:
+            self.reset(now)
+            return lost
+        if now - self.started > self.RESYNC_SECONDS:
+            self.reset(now)
+        return 0.0
+
+
+class AudioSpool:
+    """Append-only raw audio store in a memory-mapped temporary file.
+
+    Long-form sessions write every chunk here instead of a Python list, so
+    an hour of audio costs disk space rather than process memory; the
+    operating system pages the mapping out as it sees fit. The file grows
+    a minute at a time and is deleted on close.
+    """
+
+    BLOCK_BYTES = RATE * 2 * 60
+
+    def __init__(self):
+        self.file = tempfile.TemporaryFile()
+        self.map = None
+        self.size = 0
+        self.length = 0
+        self._grow(self.BLOCK_BYTES)
+
+    def _grow(self, size: int):
+        if self.map is not None:
+            self.map.close()
+        self.file.truncate(size)
+        self.map = mmap.mmap(self.file.fileno(), size)
+        self.size = size
+
+    def append(self, data: bytes) -> int:
+        """Store data; return the byte offset where it ends."""
+        end = self.length + len(data)
+        if end > self.size:
+            self._grow(self.size + max(self.BLOCK_BYTES, len(data)))
+        self.map[self.length:end] = data
+        self.length = end
+        return end
+
+    def read_frames(self, start: int, end: int) -> list:
+        """Return bytes start..end as capture-sized chunks."""
+        step = CHUNK * 2
+        return [self.map[offset:min(offset + step, end)] for offset in range(start, end, step)]
+
+    def close(self):
+        self.map.close()
+        self.file.close()
+
+
+class LongFormSession:
+    """Toggle-to-record dictation that hands off finished segments as it goes.
+
+    Audio is spooled to disk and only the peaks of the segment in progress
+    stay in memory. Once a segment reaches the split target it is cut at
+    the next pause (or at its quietest chunk when it reaches the split
+    limit without one) and passed to on_segment, so transcription runs
+    while the speaker keeps talking and memory stays flat for any length.
+    """
+
+    def __init__(self, on_segment, seed_frames=(),
+                 target_seconds: float = Transcriber.SPLIT_TARGET_SECONDS,
+                 max_seconds: float = Transcriber.SPLIT_MAX_SECONDS):
+        self.on_segment = on_segment
+        self.target_chunks = int(target_seconds * RATE / CHUNK)
+        self.max_chunks = int(max_seconds * RATE / CHUNK)
+        self.spool = AudioSpool()
+        self.segment_start = 0
+        self.peaks = []
+        self.ends = []
+        self.segments = 0
+        for chunk in seed_frames:
+            self.append(chunk)
+
+    def append(self, chunk: bytes):
+        self.ends.append(self.spool.append(chunk))
+        self.peaks.append(_chunk_peak(chunk))
+        count = len(self.peaks)
+        if count < self.target_chunks:
+            return
+        if all(peak < SILENCE_PEAK for peak in self.peaks[-MAX_PAUSE_CHUNKS:]):
+            # Cut in the middle of the pause.
+            self._flush(count - MAX_PAUSE_CHUNKS // 2)
+        elif count >= self.max_chunks:
+            window = self.peaks[self.target_chunks:]
+            self._flush(self.target_chunks + window.index(min(window)))
+
+    def finish(self):
+        """Hand off the remaining audio and delete the spool."""
+        if self.peaks:
+            self._flush(len(self.peaks))
+        self.spool.close()
+
+    def _flush(self, cut: int):
+        end = self.ends[cut - 1]
+        frames = self.spool.read_frames(self.segment_start, end)
+        self.segment_start = end
+        self.peaks = self.peaks[cut:]
+        self.ends = self.ends[cut:]
+        self.segments += 1
+        self.on_segment(frames)
+
+
+class OfflineQueue:
+    """Failed cloud dictations kept on disk until they can be transcribed.
+
+    Each dictation is stored as a FLAC file named after the moment it was
+    recorded, so nothing is lost when the network or provider is down and
+    nothing waits for it to return. A background thread retries the oldest
+    file, backing off while it keeps failing; once one succeeds the rest
+    drain through the batcher a few at a time, so live dictations still get
+    their turn. Each recovered transcript is passed to on_result(text,
+    decode, recorded_at) and its file is deleted. A file that cannot be read
+    or delivered is moved to a failed/ subfolder instead of blocking the rest.
+    """
+
+    RETRY_SECONDS = 30
+    MAX_RETRY_SECONDS = 600
+    NAME_FORMAT = "%Y%m%d-%H%M%S-%f"
+
+    def __init__(self, batcher: TranscriptionBatcher, on_result,
+                 directory: Path = OFFLINE_QUEUE_DIR, group_size: int = 4):
+        self.batcher = batcher
+        self.on_result = on_result
+        self.directory = directory
+        self.group_size = max(1, group_size)
+        self.wake = threading.Event()
+        self.worker = None
+
+    def add(self, audio_frames: list) -> Path:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.directory / f"{datetime.now():{self.NAME_FORMAT}}.flac"
+        partial = path.with_suffix(".part")
+        partial.write_bytes(frames_to_flac(audio_frames))
+        partial.replace(path)
+        logger.info("Saved failed dictation for later: %s", path.name)
+        return path
+
+    def pending(self) -> list:
+        if not self.directory.exists():
+            return []
+        return sorted(self.directory.glob("*.flac"))
+
+    def start(self):
+        if self.worker is None:
+            self.worker = threading.Thread(target=self._run, daemon=True)
+            self.worker.start()
+
+    def notify_online(self):
+        """A cloud request just succeeded; retry now instead of after backoff."""
+        if self.pending():
+            self.wake.set()
+
+    def _run(self):
+        delay = self.RETRY_SECONDS
+        while True:
+            self.wake.wait(delay)
+            self.wake.clear()
+            try:
+                drained = self.drain()
+            except Exception:
+                logger.exception("Offline queue drain failed")
+                drained = False
+            delay = self.RETRY_SECONDS if drained else min(delay * 2, self.MAX_RETRY_SECONDS)
+
+    def drain(self) -> bool:
+        """Transcribe pending dictations; return False if the backend still fails."""
+        paths = self.pending()
+        if not paths:
+            return True
+        # Probe with the oldest before sending the rest.
+        if not self._finish([paths[0]]):
+            return False
+        logger.info("Offline queue: transcribing %d saved dictations", len(paths))
+        for start in range(1, len(paths), self.group_size):
+            group = paths[start:start + self.group_size]
+            # Background work yields to live dictation near the rate limit.
+            wait = self.batcher.transcriber.cloud_wait_seconds("background", len(group))
+            if wait > 0:
+                logger.info("Offline queue: waiting %.0fs for cloud quota", wait)
+                time.sleep(min(wait, self.MAX_RETRY_SECONDS))
+            if not self._finish(group):
+                return False
+        return True
+
+    def _finish(self, paths: list) -> bool:
+        submitted = []
+        for path in paths:
+            try:
+                recorded_at = datetime.strptime(path.stem, self.NAME_FORMAT).astimezone()
+                frames = load_audio_frames(path.read_bytes())
+            except Exception:
+                logger.warning("Offline queue: cannot read %s", path.name, exc_info=True)
+                self._set_aside(path)
+                continue
+            submitted.append((path, recorded_at, self.batcher.submit(frames)))
+        ok = True
+        for path, recorded_at, future in submitted:
+            text, error, decode = future.result()
+            if error:
+                logger.info("Offline queue: %s still failing (%s)", path.name, error)
+                ok = False
+                continue
+            try:
+                self.on_result(text, decode, recorded_at)
+            except Exception:
+                logger.exception("Offline queue: could not deliver %s", path.name)
+                self._set_aside(path)
+                continue
+            path.unlink()
+        return ok
+
+    def _set_aside(self, path: Path):
+        """Move a file that can never drain into failed/ so the rest still can."""
+        failed = self.directory / "failed"
+        try:
+            failed.mkdir(exist_ok=True)
+            path.replace(failed / path.name)
+        except OSError:
+            logger.exception("Offline queue: could not move %s aside", path.name)
+            return
+        logger.warning("Offline queue: moved %s to %s", path.name, failed)
+
 
 def type_text_with_breaks(controller, text: str):
     """Type dictation text, converting line breaks into key presses.
@@ -810,14 +2636,27 @@ class MoneyPennyApp:
     def __init__(self):
         self.settings = Settings()
         self.lexicon = Lexicon()
+        MODEL_CACHE.directory = Path(self.settings.get("model_cache_dir") or MODEL_DIR)
+        self.model_cache = MODEL_CACHE
         self.transcriber = Transcriber(self.settings, self.lexicon)
-        self.cleaner = TranscriptCleaner(self.settings)
+        self.cleaner = TranscriptCleaner(self.settings, self.lexicon)
         self.history = TranscriptHistory()
+        # Rank lexicon terms for the prompt by how recently they were dictated.
+        self.lexicon.learn(self.history.get_entries())
 
         # Audio state
         self.is_recording = False
         self.audio_frames = []
         self.frames_lock = threading.Lock()
+        # Active LongFormSession while toggle-to-record is on, else None.
+        self.long_form = None
+        self.long_form_file = None
+        self.long_form_key_down = False
+        # Hands-free mode: a detector watches the warm stream between
+        # dictations; hands_free_recording marks recordings it started.
+        self.hands_free = None
+        self.hands_free_recording = False
+        self.configure_hands_free()
         # Rolling pre-roll so a fast hotkey press still captures the first
         # instants of speech (roughly the last half second of audio).
         self.preroll = deque(maxlen=8)
@@ -829,6 +2668,40 @@ class MoneyPennyApp:
         # cleaned, and typed at a time so overlapping requests cannot paste
         # twice or out of order when the cloud provider stalls.
         self.dictation_lock = threading.Lock()
+        # Released clips start transcribing at once (bursts are batched in
+        # Local mode); a single worker then cleans and types them in order.
+        self.batcher = TranscriptionBatcher(
+            self.transcriber,
+            max_wait=self.settings.get("batch_max_wait_ms", 100) / 1000,
+            should_wait=lambda: self.is_recording,
+        )
+        self.dictations = queue.Queue()
+        threading.Thread(target=self._dictation_worker, daemon=True).start()
+        # Frees the local model after model_idle_unload_minutes without use.
+        threading.Thread(target=self._idle_unload_worker, name="model-idle", daemon=True).start()
+        # Failed cloud dictations wait on disk and are retried in the background.
+        self.offline_queue = OfflineQueue(
+            self.batcher,
+            self._on_recovered_dictation,
+            group_size=self.settings.get("parallel_workers", 4),
+        )
+        self.offline_queue.start()
+        provider_io.http2 = bool(self.settings.get("http2", False))
+        enable_json_log(self.settings.get("log_json", False))
+        # Support can ask for MONEYPENNY_PROFILE=5 to profile five dictations.
+        self.profiler = PROFILER
+        if os.environ.get("MONEYPENNY_PROFILE", "").isdigit():
+            self.profiler.start(int(os.environ["MONEYPENNY_PROFILE"]))
+        if (self.settings.get("transcription_mode", "local") == "cloud"
+                or self.settings.get("cleanup_mode", "commands") != "off"):
+            DNS_CACHE.prefetch(*PROVIDER_API_URLS.values())
+        if self.settings.get("prefetch_models"):
+            self.model_cache.prefetch(self.settings.get("prefetch_models"))
+        METRICS.gauge("moneypenny_model_memory_bytes",
+                      "Resident memory of the process holding the local model.",
+                      self.transcriber.model_memory_bytes)
+        self.metrics_exporter = None
+        self.start_metrics()
 
         # GUI state
         self.gui = None
@@ -838,6 +2711,29 @@ class MoneyPennyApp:
         self.status_callbacks = []
         self.history_callbacks = []
 
+    def configure_hands_free(self):
+        """Apply the hands-free settings (called again when they are saved)."""
+        if self.settings.get("hands_free", False):
+            self.hands_free = SpeechOnsetDetector(
+                self.settings.get("hands_free_silence_ms", 1000) / 1000
+            )
+        else:
+            self.hands_free = None
+
+    def start_metrics(self):
+        """Export METRICS if metrics_port or metrics_file is set (both opt-in)."""
+        port = self.settings.get("metrics_port", 0) or 0
+        path = self.settings.get("metrics_file", "") or ""
+        if not port and not path:
+            return
+        try:
+            self.metrics_exporter = MetricsExporter(
+                METRICS, port=port, path=APP_DIR / path if path else None,
+                interval=self.settings.get("metrics_flush_seconds", 15),
+            ).start()
+        except OSError:
+            logger.warning("Metrics endpoint could not listen on port %s", port, exc_info=True)
+
     def add_status_callback(self, callback):
         """Register a callback for status updates."""
         self.status_callbacks.append(callback)
@@ -898,77 +2794,242 @@ class MoneyPennyApp:
 
     def start_recording(self):
         """Begin recording when hotkey is pressed."""
-        if self.is_recording:
+        if self.is_recording or self.long_form is not None:
             return
         with self.frames_lock:
             # Seed with the pre-roll so very quick presses keep their audio.
             self.audio_frames = list(self.preroll)
         self.is_recording = True
+        # After an idle unload the model reloads while the user speaks.
+        self.transcriber.preload()
         self._notify_status("recording", "Hold hotkey, speak now...")
 
-    def stop_recording(self):
-        """Stop recording and transcribe."""
+    def stop_recording(self, released_at: float = None):
+        """Stop recording and transcribe.
+
+        released_at is the key event's time.time() stamp, so the delay
+        before the hook delivered the release counts toward latency.
+        """
+        released = time.perf_counter()
+        if released_at is not None:
+            released -= max(0.0, time.time() - released_at)
         if not self.is_recording:
             return
         self.is_recording = False
+        self.hands_free_recording = False
+        # Take this dictation's frames now so the next press cannot reset them
+        # while an earlier dictation is still being transcribed.
+        with self.frames_lock:
+            frames = self.audio_frames
+            self.audio_frames = []
         self._notify_status("transcribing", "Processing audio...")
-        threading.Thread(target=self._transcribe_and_type, daemon=True).start()
+        future = self.batcher.submit(frames) if frames else None
+        marks = {"released": released, "queued": time.perf_counter()}
+        self.dictations.put((frames, future, marks, None))
 
-    def _transcribe_and_type(self):
-        """Transcribe recorded audio and type it.
+    def toggle_long_form(self):
+        """Start or stop a long-form session (toggle hotkey)."""
+        with self.frames_lock:
+            session = self.long_form
+            if session is None:
+                if self.is_recording:
+                    return
+                save_to = None
+                if self.settings.get("long_form_output", "type") == "save":
+                    LONG_FORM_DIR.mkdir(parents=True, exist_ok=True)
+                    save_to = LONG_FORM_DIR / f"{datetime.now():%Y-%m-%d_%H-%M-%S}.txt"
+                self.long_form_file = save_to
+                self.long_form = LongFormSession(
+                    lambda frames: self._queue_long_form_segment(frames, save_to),
+                    seed_frames=list(self.preroll),
+                )
+            else:
+                self.long_form = None
+        if session is None:
+            self.transcriber.preload()
+            logger.info("Long-form recording started")
+            self._notify_status("recording", self._long_form_status())
+            return
+        session.finish()
+        logger.info("Long-form recording stopped after %d segments", session.segments)
+        if self.long_form_file is not None:
+            logger.info("Long-form transcript saved to %s", self.long_form_file)
+        self._notify_status("transcribing", "Finishing long-form recording...")
+
+    def _queue_long_form_segment(self, frames: list, save_to):
+        cut = time.perf_counter()
+        future = self.batcher.submit(frames)
+        self.dictations.put((frames, future, {"released": cut, "queued": time.perf_counter()}, save_to))
+
+    def _long_form_status(self) -> str:
+        hotkey = self.settings.get("long_form_hotkey", "off").upper()
+        return f"Long-form recording... press {hotkey} again to stop"
+
+    def _dictation_worker(self):
+        """Finish queued dictations one at a time, in the order they were spoken."""
+        while True:
+            frames, future, marks, save_to = self.dictations.get()
+            try:
+                self._transcribe_and_type(frames, future, marks, save_to)
+            except Exception:
+                logger.exception("Dictation failed")
+                self._notify_status("error", "Dictation failed. Check the log for details.")
+            finally:
+                self.dictations.task_done()
+            report = self.profiler.dictation_done()
+            if report is not None:
+                self._notify_status("idle", f"Profile saved: {report['path'].name}")
+                if self.gui is not None:
+                    self.gui.show_profile(report)
+            if self.long_form is not None:
+                self._notify_status("recording", self._long_form_status())
+
+    IDLE_CHECK_SECONDS = 30
+
+    def _idle_unload_worker(self):
+        """Unload the local model once it has sat unused for model_idle_unload_minutes."""
+        while not self.stop_event.wait(self.IDLE_CHECK_SECONDS):
+            minutes = self.settings.get("model_idle_unload_minutes", 0)
+            if not minutes or self.is_recording or self.long_form is not None:
+                continue
+            if self.transcriber.unload_if_idle(minutes * 60):
+                self._notify_status("idle", "Model unloaded while idle; it reloads on the next hotkey press")
+
+    def _transcribe_and_type(self, frames: list, future: Future, marks: dict,
+                             save_to: Path = None):
+        """Wait for a dictation's transcript, clean it, and type it.
 
         Runs under the dictation lock so concurrent dictations queue up and
-        type in order instead of pasting over each other.
+        type in order instead of pasting over each other. Long-form segments
+        with save_to are appended to that file instead of typed. marks holds
+        the perf_counter() times the dictation was released and queued.
         """
         with self.dictation_lock:
-            self._transcribe_and_type_locked()
-
-    def _transcribe_and_type_locked(self):
-        with self.frames_lock:
-            frames = list(self.audio_frames)
-            self.audio_frames = []
+            self._transcribe_and_type_locked(frames, future, marks, save_to)
 
+    def _transcribe_and_type_locked(self, frames: list, future: Future, marks: dict,
+                                    save_to: Path = None):
         if not frames:
+            METRICS.inc("moneypenny_dictations_total", outcome="no_audio")
             self._notify_status("idle", "No audio recorded")
             return
 
-        start_time = time.time()
-        text = self.transcriber.transcribe(frames)
-        elapsed = time.time() - start_time
+        spans = {
+            "release_ms": _elapsed_ms(marks["released"], marks["queued"]),
+            "queue_ms": _elapsed_ms(marks["queued"]),
+        }
+        step = time.perf_counter()
+        text, transcription_error, decode = future.result()
+        _add_span(spans, "transcribe_ms", step)
+        elapsed = time.perf_counter() - marks["released"]
+        cloud = self.settings.get("transcription_mode", "local") == "cloud"
+        if cloud and not transcription_error:
+            self.offline_queue.notify_online()
         raw_text = text
         cleanup_used = False
 
         if text:
             logger.info("Raw transcript (%.2fs): %s", elapsed, text)
-            if self.cleaner.should_clean(text):
+            step = time.perf_counter()
+            needs_cleanup = self.cleaner.should_clean(text)
+            if needs_cleanup:
                 self._notify_status("cleaning", "Applying context-aware cleanup...")
-            text, cleanup_used = self.cleaner.clean(text)
+            with self.profiler.section():
+                text, cleanup_used = self.cleaner.clean(text)
+            METRICS.inc("moneypenny_cleanup_total", result=(
+                "applied" if cleanup_used else "skipped" if needs_cleanup else "not_needed"
+            ))
             if self.cleaner.last_error:
                 logger.info(self.cleaner.last_error)
             text = self._strip_stock_phrases(text)
+            _add_span(spans, "cleanup_ms", step)
         if text:
-            total_elapsed = time.time() - start_time
+            total_elapsed = time.perf_counter() - marks["released"]
             logger.info("Final transcript (%.2fs): %s", total_elapsed, text)
             mode = self.settings.get("transcription_mode", "local")
             provider = self.settings.get("cloud_provider", "local") if mode == "cloud" else "local"
-            self.history.add(raw_text, text, mode, provider, total_elapsed, cleanup_used)
+            # Recorded before typing so History still has it if typing fails;
+            # the typing and total spans are filled in afterwards.
+            entry = self.history.add(
+                raw_text, text, mode, provider, total_elapsed, cleanup_used,
+                decode=decode, spans=spans,
+            )
+            self.lexicon.observe(raw_text, text)
             self._notify_history()
-            self._notify_status("typing", f"Typed: {text[:50]}...")
 
-            # Wait for modifier keys to release
-            self._wait_for_modifiers_release()
-
-            # Type the text (no leading space when cleanup starts a new line)
+            # No leading space when cleanup starts a new line
             prefix = "" if text.startswith("\n") else " "
-            type_text_with_breaks(self.keyboard_controller, prefix + text)
+            if save_to is not None:
+                step = time.perf_counter()
+                with open(save_to, "a", encoding="utf-8") as f:
+                    f.write(prefix + text)
+                _add_span(spans, "typing_ms", step)
+                self._notify_status("typing", f"Saved: {text[:50]}...")
+            else:
+                self._notify_status("typing", f"Typed: {text[:50]}...")
+
+                # Wait for modifier keys to release
+                step = time.perf_counter()
+                self._wait_for_modifiers_release()
+                _add_span(spans, "modifier_wait_ms", step)
+
+                step = time.perf_counter()
+                with self.profiler.section():
+                    type_text_with_breaks(self.keyboard_controller, prefix + text)
+                _add_span(spans, "typing_ms", step)
+
+            spans["total_ms"] = _elapsed_ms(marks["released"])
+            self.history.add_spans(entry, spans)
+            logger.info("Latency (ms): %s", ", ".join(
+                f"{stage[:-3]} {spans[stage]:.0f}" for stage in LATENCY_STAGES if stage in spans
+            ))
+            METRICS.inc("moneypenny_dictations_total", outcome="saved" if save_to is not None else "typed")
+            for stage, ms in {**decode.get("spans", {}), **spans}.items():
+                METRICS.observe("moneypenny_stage_seconds", ms / 1000, stage=stage[:-3])
         else:
-            if self.transcriber.last_error:
-                logger.warning("Transcription failed: %s", self.transcriber.last_error)
-                self._notify_status("error", self.transcriber.last_error)
+            if transcription_error:
+                METRICS.inc("moneypenny_dictations_total", outcome="failed")
+                logger.warning("Transcription failed: %s", transcription_error)
+                if (cloud and decode.get("retryable")
+                        and self.settings.get("offline_queue", True)):
+                    self.offline_queue.add(frames)
+                    transcription_error += " Saved; it will be transcribed when the connection returns."
+                self._notify_status("error", transcription_error)
             else:
+                METRICS.inc("moneypenny_dictations_total", outcome="no_speech")
                 logger.info("No speech detected (%.2fs)", elapsed)
                 self._notify_status("idle", "No speech detected")
 
+    def _on_recovered_dictation(self, text: str, decode: dict, recorded_at: datetime):
+        """Record a dictation transcribed late from the offline queue.
+
+        It is cleaned and added to History but never typed: the cursor has
+        long since moved on. It can also be copied to the clipboard.
+        """
+        raw_text = text
+        cleanup_used = False
+        if text:
+            # This runs on the offline-queue thread; a cleaner of its own
+            # keeps last_error apart from the live dictation's.
+            cleaner = TranscriptCleaner(self.settings, self.lexicon)
+            text, cleanup_used = cleaner.clean(text)
+            text = self._strip_stock_phrases(text)
+        if not text:
+            return
+        METRICS.inc("moneypenny_dictations_total", outcome="recovered")
+        mode = self.settings.get("transcription_mode", "local")
+        provider = self.settings.get("cloud_provider", "local") if mode == "cloud" else "local"
+        self.history.add(
+            raw_text, text, mode, provider,
+            (datetime.now().astimezone() - recorded_at).total_seconds(),
+            cleanup_used, decode=decode, recorded_at=recorded_at,
+        )
+        self.lexicon.observe(raw_text, text, recorded_at.timestamp())
+        self._notify_history()
+        if self.settings.get("offline_queue_clipboard", False) and self.gui is not None:
+            self.gui.copy_text(text)
+        self._notify_status("idle", f"Recovered offline dictation: {text[:50]}...")
+
     # Whisper was trained on huge amounts of subtitled video, so it loves
     # to append stock sign-off phrases ("Thank you.", "Thanks for watching.")
     # especially when the recording has trailing silence. Filter them out.
@@ -988,7 +3049,7 @@ class MoneyPennyApp:
         # content: there is no reliable way to tell a hallucinated "Thank
         # you." from one the user actually said, and deleting real words
         # is worse than the occasional phantom. (The trailing-silence
-        # trim in _frames_to_wav prevents most of these at the source.)
+        # trim in Transcriber.transcribe prevents most of these at the source.)
         return text
 
     def _wait_for_modifiers_release(self, max_wait_seconds: float = 0.5) -> bool:
@@ -1011,7 +3072,14 @@ class MoneyPennyApp:
         are never lost to device startup latency. While idle, the most recent
         chunks are kept in a small pre-roll buffer that seeds each recording,
         which keeps even very quick press-and-release captures usable.
+
+        In hands-free mode the same loop feeds each chunk's peak to the
+        speech detector, so listening costs no extra thread or stream; the
+        thread's CPU use is logged every few minutes, as a warning above
+        HANDS_FREE_CPU_WARN_PERCENT.
         """
+        cpu_window = (time.monotonic(), time.thread_time())
+        gaps = CaptureGapDetector()
         while not self.stop_event.is_set():
             if self.stream is None or not self.stream.is_active():
                 try:
@@ -1024,6 +3092,7 @@ class MoneyPennyApp:
                         frames_per_buffer=CHUNK,
                         input_device_index=mic_index,
                     )
+                    gaps.reset()
                 except Exception:
                     logger.exception("Failed to open audio stream")
                     time.sleep(0.5)
@@ -1031,26 +3100,82 @@ class MoneyPennyApp:
 
             try:
                 data = self.stream.read(CHUNK, exception_on_overflow=False)
-                if self.is_recording:
+                lost = gaps.update(CHUNK, self.stream.get_read_available())
+                if lost:
+                    METRICS.inc("moneypenny_audio_overflows_total")
+                    METRICS.inc("moneypenny_audio_dropped_seconds_total", lost)
+                    logger.warning("Microphone input overflowed; about %.2fs of audio was dropped", lost)
+                if self.long_form is not None:
+                    with self.frames_lock:
+                        if self.long_form is not None:
+                            self.long_form.append(data)
+                elif self.is_recording:
                     with self.frames_lock:
                         self.audio_frames.append(data)
                 else:
                     self.preroll.append(data)
+                detector = self.hands_free
+                if detector is not None and self.long_form is None:
+                    self._hands_free_step(detector, data)
+                    cpu_window = self._report_listener_cpu(cpu_window)
             except Exception:
+                METRICS.inc("moneypenny_audio_read_errors_total")
                 logger.warning("Audio read failed")
                 time.sleep(0.05)
 
+    def _hands_free_step(self, detector: SpeechOnsetDetector, chunk: bytes):
+        # A recording held by the hotkey is left to the hotkey.
+        if self.is_recording and not self.hands_free_recording:
+            return
+        event = detector.update(_chunk_peak(chunk))
+        if event == "start" and not self.is_recording:
+            # The onset chunks are already in the pre-roll that seeds the clip.
+            self.hands_free_recording = True
+            self.start_recording()
+        elif event == "stop" and self.hands_free_recording:
+            self.hands_free_recording = False
+            self.stop_recording()
+
+    CPU_REPORT_SECONDS = 300
+
+    def _report_listener_cpu(self, window: tuple) -> tuple:
+        """Log this thread's CPU share since window began; return the next window."""
+        started, cpu_started = window
+        elapsed = time.monotonic() - started
+        if elapsed < self.CPU_REPORT_SECONDS:
+            return window
+        percent = (time.thread_time() - cpu_started) / elapsed * 100
+        log = logger.warning if percent > HANDS_FREE_CPU_WARN_PERCENT else logger.info
+        log("Hands-free listening used %.2f%% of one CPU core (warns above %.1f%%)",
+            percent, HANDS_FREE_CPU_WARN_PERCENT)
+        return time.monotonic(), time.thread_time()
+
     def _setup_hotkeys(self):
         """Register keyboard hotkeys."""
         hotkey = self.settings.get("record_hotkey", "right ctrl")
         try:
             keyboard.on_press_key(hotkey, lambda e: self.start_recording(), suppress=False)
-            keyboard.on_release_key(hotkey, lambda e: self.stop_recording(), suppress=False)
+            keyboard.on_release_key(hotkey, lambda e: self.stop_recording(e.time), suppress=False)
             logger.info("Hotkey registered: %s", hotkey)
+            long_form_hotkey = self.settings.get("long_form_hotkey", "off")
+            if long_form_hotkey != "off":
+                keyboard.on_press_key(
+                    long_form_hotkey, lambda e: self._on_long_form_key(True), suppress=False
+                )
+                keyboard.on_release_key(
+                    long_form_hotkey, lambda e: self._on_long_form_key(False), suppress=False
+                )
+                logger.info("Long-form hotkey registered: %s", long_form_hotkey)
         except Exception:
             logger.exception("Failed to register hotkeys")
             raise
 
+    def _on_long_form_key(self, pressed: bool):
+        # Key auto-repeat sends many presses per hold; toggle once per press.
+        if pressed and not self.long_form_key_down:
+            self.toggle_long_form()
+        self.long_form_key_down = pressed
+
     def shutdown(self):
         """Gracefully shut down the application."""
         if self.stop_event.is_set():
@@ -1079,6 +3204,16 @@ class MoneyPennyApp:
         except Exception:
             pass
 
+        try:
+            if self.long_form is not None:
+                self.long_form.spool.close()
+            provider_io.close()
+            self.transcriber.close()
+            if self.metrics_exporter is not None:
+                self.metrics_exporter.stop()
+        except Exception:
+            pass
+
         # Stop tray icon
         if self.tray_icon:
             try:
@@ -1099,6 +3234,11 @@ class MoneyPennyApp:
         logger.info("--- MoneyPenny Voice Typing v3.1.1 ---")
         logger.info("Hold %s to dictate; release to transcribe.",
                    self.settings.get("record_hotkey", "right ctrl"))
+        if self.hands_free is not None:
+            logger.info("Hands-free: recording starts when you speak.")
+        if self.settings.get("long_form_hotkey", "off") != "off":
+            logger.info("Press %s to start or stop long-form recording.",
+                       self.settings.get("long_form_hotkey"))
         logger.info("Press ESC or CTRL+ALT+Q to exit.")
 
         record_thread = threading.Thread(target=self._record_thread_func, daemon=True)
@@ -1157,14 +3297,308 @@ class MoneyPennyApp:
             self.shutdown()
 
 
+def run_api_server(port: int, max_concurrent: int):
+    """Serve the pipeline to local tools over HTTP (see server.py)."""
+    from server import TranscriptionAPIServer
+
+    settings = Settings()
+    lexicon = Lexicon()
+    MODEL_CACHE.directory = Path(settings.get("model_cache_dir") or MODEL_DIR)
+    transcriber = Transcriber(settings, lexicon)
+    if settings.get("transcription_mode", "local") != "cloud":
+        transcriber.load_model()
+    provider_io.http2 = bool(settings.get("http2", False))
+    enable_json_log(settings.get("log_json", False))
+    api = None
+    batcher = TranscriptionBatcher(
+        transcriber,
+        max_wait=settings.get("batch_max_wait_ms", 100) / 1000,
+        should_wait=lambda: api is not None and api.is_preparing(),
+    )
+    api = TranscriptionAPIServer(
+        batcher,
+        make_cleaner=lambda: TranscriptCleaner(settings, lexicon),
+        load_frames=load_audio_frames,
+        port=port,
+        max_concurrent=max_concurrent,
+    )
+    try:
+        api.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        api.shutdown()
+        transcriber.close()
+
+
+BATCH_AUDIO_SUFFIXES = (".wav", ".flac")
+_batch_worker = threading.local()
+
+
+def _init_batch_worker(cpu_threads: int):
+    """Give this pool worker (process or thread) its own pipeline.
+
+    Transcriber and TranscriptCleaner keep per-call state (last_error,
+    last_decode), so workers never share them.
+    """
+    settings = Settings()
+    # A pool process already runs beside the app; it owns its model directly.
+    settings.set("local_engine", "in-process")
+    MODEL_CACHE.directory = Path(settings.get("model_cache_dir") or MODEL_DIR)
+    transcriber = Transcriber(settings, Lexicon())
+    if settings.get("transcription_mode", "local") != "cloud":
+        transcriber.load_model(cpu_threads=cpu_threads)
+    provider_io.http2 = bool(settings.get("http2", False))
+    _batch_worker.transcriber = transcriber
+    _batch_worker.cleaner = TranscriptCleaner(settings, transcriber.lexicon)
+
+
+def _read_batch_file(path: str) -> tuple:
+    """Read one audio file; return (record, timings, frames, started)."""
+    started = time.perf_counter()
+    record = {"file": path, "text": "", "error": None, "worker": os.getpid()}
+    timings = {}
+    try:
+        frames = load_audio_frames(Path(path).read_bytes())
+    except Exception as exc:
+        record["error"] = f"Could not read audio: {exc}"
+        frames = []
+    timings["load_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    record["audio_seconds"] = round(sum(len(chunk) for chunk in frames) / 2 / RATE, 2)
+    return record, timings, frames, started
+
+
+def _wait_for_background_quota(transcriber, timings: dict):
+    wait = transcriber.cloud_wait_seconds("background")
+    if wait > 0:
+        # Leave headroom for live dictation instead of running into 429s.
+        time.sleep(min(wait, OfflineQueue.MAX_RETRY_SECONDS))
+        timings["quota_wait_ms"] = round(wait * 1000, 1)
+
+
+def _finish_batch_file(record: dict, timings: dict, started: float, text: str,
+                       cleaner=None) -> dict:
+    """Add the (cleaned) text and the total time to a record and return it."""
+    record["text"] = text
+    if cleaner is not None and text:
+        step = time.perf_counter()
+        cleaned, used = cleaner.clean(text)
+        timings["cleanup_ms"] = round((time.perf_counter() - step) * 1000, 1)
+        record.update(text=cleaned, raw=text, cleanup_used=used)
+    timings["total_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    record["timings"] = timings
+    return record
+
+
+def _transcribe_file(path: str, cleanup: bool) -> dict:
+    """Run one audio file through the pipeline; return its JSONL record."""
+    record, timings, frames, started = _read_batch_file(path)
+    if not frames:
+        return _finish_batch_file(record, timings, started, "")
+    transcriber = _batch_worker.transcriber
+    _wait_for_background_quota(transcriber, timings)
+    step = time.perf_counter()
+    text = transcriber.transcribe(frames)
+    timings["transcribe_ms"] = round((time.perf_counter() - step) * 1000, 1)
+    record["error"] = transcriber.last_error
+    record["decode"] = transcriber.last_decode
+    cleaner = _batch_worker.cleaner if cleanup else None
+    return _finish_batch_file(record, timings, started, text, cleaner)
+
+
+def _transcribe_files_cloud(paths: list, cleanup: bool, workers: int, write):
+    """Cloud mode of transcribe_files: upload on provider_io, not a thread each.
+
+    Files are read and prepared on this thread, and up to workers uploads
+    run at once on the provider I/O loop through shallow copies of one
+    Transcriber (the same way _transcribe_cloud_batch does), so the upload
+    rate estimate and rate-limit routing are shared. Finished uploads are
+    cleaned up and written by a small pool, since cleanup is a blocking call.
+    """
+    _init_batch_worker(0)
+    transcriber = _batch_worker.transcriber
+    in_flight = threading.BoundedSemaphore(workers)
+
+    def finish(job, future):
+        record, timings, started, step, worker = job
+        try:
+            try:
+                text = future.result()
+                record["error"] = worker.last_error
+            except Exception as exc:
+                logger.exception("Cloud transcription failed for %s", record["file"])
+                text = ""
+                record["error"] = f"Transcription failed: {exc}"
+            timings["transcribe_ms"] = round((time.perf_counter() - step) * 1000, 1)
+            record["decode"] = worker.last_decode
+            # TranscriptCleaner keeps per-call state, so each file gets its own.
+            cleaner = None
+            if cleanup:
+                cleaner = TranscriptCleaner(transcriber.settings, transcriber.lexicon)
+            write(_finish_batch_file(record, timings, started, text, cleaner))
+        finally:
+            in_flight.release()
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="batch-finish") as finisher:
+        for path in paths:
+            in_flight.acquire()
+            record, timings, frames, started = _read_batch_file(path)
+            if not frames:
+                write(_finish_batch_file(record, timings, started, ""))
+                in_flight.release()
+                continue
+            _wait_for_background_quota(transcriber, timings)
+            step = time.perf_counter()
+            worker = copy.copy(transcriber)
+            job = (record, timings, started, step, worker)
+            try:
+                text, wav_buffers = worker._begin(frames)
+            except Exception as exc:
+                future = Future()
+                future.set_exception(exc)
+            else:
+                if wav_buffers is None:
+                    future = Future()
+                    future.set_result(text)
+                else:
+                    future = provider_io.submit(worker._transcribe_cloud_async(wav_buffers))
+            future.add_done_callback(
+                lambda done, job=job: finisher.submit(finish, job, done)
+            )
+        # Every upload has handed its file to the finisher once all slots are back.
+        for _ in range(workers):
+            in_flight.acquire()
+
+
+def _transcribe_files_local(paths: list, cleanup: bool, workers: int, cores: int, write):
+    """Local mode of transcribe_files: a process pool, one model per process.
+
+    If a worker process dies the pool breaks and every unfinished file fails
+    with it; those are written as failed records and the finished ones stand.
+    """
+    pool = ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_batch_worker,
+        initargs=(max(1, cores // workers),),
+    )
+    with pool:
+        futures = {pool.submit(_transcribe_file, path, cleanup): path for path in paths}
+        for future in as_completed(futures):
+            try:
+                record = future.result()
+            except BrokenProcessPool as exc:
+                record = {
+                    "file": futures[future],
+                    "text": "",
+                    "error": f"Batch worker crashed: {exc}",
+                    "audio_seconds": 0.0,
+                }
+            write(record)
+
+
+def transcribe_files(directory: Path, output: Path, cleanup: bool = False,
+                     workers: int = 0) -> dict:
+    """Transcribe every WAV/FLAC file under directory into a JSONL file.
+
+    Local mode runs a bounded process pool, one model per process, with the
+    CPU cores divided between them. Cloud mode keeps up to workers uploads
+    in flight on the provider I/O loop. Records are written as files finish,
+    so a partial run still leaves usable output. Returns the run summary
+    that is logged.
+    """
+    paths = sorted(
+        str(path) for path in Path(directory).rglob("*")
+        if path.is_file() and path.suffix.lower() in BATCH_AUDIO_SUFFIXES
+    )
+    settings = Settings()
+    enable_json_log(settings.get("log_json", False))
+    cores = os.cpu_count() or 1
+    cloud = settings.get("transcription_mode", "local") == "cloud"
+    workers = workers or (8 if cloud else min(4, cores))
+    logger.info("Transcribing %d files with %d workers", len(paths), workers)
+
+    started = time.perf_counter()
+    totals = {"failed": 0, "audio_seconds": 0.0}
+    write_lock = threading.Lock()
+    with open(output, "w", encoding="utf-8") as out:
+        def write(record):
+            with write_lock:
+                totals["failed"] += bool(record["error"])
+                totals["audio_seconds"] += record["audio_seconds"]
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                out.flush()
+
+        if cloud:
+            _transcribe_files_cloud(paths, cleanup, workers, write)
+        else:
+            _transcribe_files_local(paths, cleanup, workers, cores, write)
+    elapsed = time.perf_counter() - started
+    failed = totals["failed"]
+    audio_seconds = totals["audio_seconds"]
+
+    files_per_minute = len(paths) / elapsed * 60 if elapsed else 0.0
+    summary = {
+        "files": len(paths),
+        "failed": failed,
+        "workers": workers,
+        "seconds": round(elapsed, 2),
+        "audio_seconds": round(audio_seconds, 2),
+        "files_per_minute": round(files_per_minute, 2),
+        "files_per_minute_per_core": round(files_per_minute / cores, 2),
+    }
+    logger.info(
+        "Transcribed %d files (%d failed) in %.1fs: %.1f files/min, "
+        "%.2f files/min/core, %.1fx realtime; results in %s",
+        len(paths), failed, elapsed, files_per_minute, files_per_minute / cores,
+        audio_seconds / elapsed if elapsed else 0.0, output,
+    )
+    return summary
+
+
 def main():
     import argparse
     parser = argparse.ArgumentParser(description="MoneyPenny Voice Typing")
     parser.add_argument("--headless", action="store_true",
                        help="Run without the settings window or system tray")
     parser.add_argument("--app-dir", help=argparse.SUPPRESS)
+    parser.add_argument("--engine-daemon", action="store_true",
+                       help="Run the shared transcription engine that keeps models loaded "
+                            "(exits at once if one is already running)")
+    parser.add_argument("--serve", action="store_true",
+                       help="Serve transcription and cleanup to local tools over HTTP")
+    parser.add_argument("--port", type=int, default=8765,
+                       help="Port for --serve (localhost only; default 8765)")
+    parser.add_argument("--max-concurrent", type=int, default=4,
+                       help="Requests --serve processes at once; others queue")
+    commands = parser.add_subparsers(dest="command")
+    batch = commands.add_parser(
+        "transcribe-files", help="Transcribe every WAV/FLAC file in a folder to JSONL"
+    )
+    batch.add_argument("directory", type=Path)
+    batch.add_argument("--output", type=Path,
+                       help="JSONL results file (default: DIRECTORY/transcripts.jsonl)")
+    batch.add_argument("--cleanup", action="store_true",
+                       help="Run AI transcript cleanup according to cleanup_mode")
+    batch.add_argument("--workers", type=int, default=0,
+                       help="Parallel files (default: up to 4 local, 8 cloud)")
     args = parser.parse_args()
 
+    if args.engine_daemon:
+        run_engine_daemon(engine_address(), _engine_authkey())
+        return
+    if args.serve:
+        run_api_server(args.port, args.max_concurrent)
+        return
+    if args.command == "transcribe-files":
+        transcribe_files(
+            args.directory,
+            args.output or args.directory / "transcripts.jsonl",
+            cleanup=args.cleanup,
+            workers=args.workers,
+        )
+        return
+
     instance_lock = _acquire_single_instance_lock()
     if instance_lock is None:
         _notify_already_running()
@@ -1188,4 +3622,6 @@ def main():
 
 
 if __name__ == "__main__":
+    # Required for the engine subprocess in the frozen MoneyPenny.exe.
+    multiprocessing.freeze_support()
     main()